@@ -0,0 +1,53 @@
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import sys
+
+from starlette.responses import JSONResponse
+
+from benchmarks.micro import measure
+from benchmarks.synthetic import generate_task_sections
+from postfiat_wallet.server import encoding
+
+def build_encoders() -> Dict[str, Callable[[Any], bytes]]:
+    """Every format/coding combination the /api response layer can produce"""
+    formats: Dict[str, Callable[[Any], bytes]] = {"json": encoding.dumps_json}
+    if encoding.msgpack is not None:
+        formats["msgpack"] = encoding.dumps_msgpack
+    codings = [None, "gzip"] + (["br"] if encoding.brotli is not None else [])
+
+    encoders: Dict[str, Callable[[Any], bytes]] = {}
+    for format_name, dump in formats.items():
+        for coding in codings:
+            name = f"{format_name}+{coding}" if coding else format_name
+            if coding:
+                encoders[name] = lambda content, dump=dump, coding=coding: encoding.compress(dump(content), coding)
+            else:
+                encoders[name] = dump
+    return encoders
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare response sizes and encoding cost of /api/tasks payloads against FastAPI's default JSON"
+    )
+    parser.add_argument("--tasks", type=int, nargs="+", default=[50, 500, 2000], help="Payload sizes, in tasks")
+    args = parser.parse_args(argv)
+
+    print(f"json encoder: {'orjson' if encoding.orjson is not None else 'stdlib'}, "
+          f"msgpack: {'yes' if encoding.msgpack is not None else 'not installed'}, "
+          f"brotli: {'yes' if encoding.brotli is not None else 'not installed'}")
+
+    for tasks in args.tasks:
+        content = generate_task_sections(tasks)
+        baseline_bytes = len(JSONResponse(content).body)
+        baseline = measure(lambda: JSONResponse(content).body)
+        print(f"\n{tasks} tasks")
+        print(f"{'default JSONResponse':22} {baseline_bytes:>10} B  100.0%  {baseline['us_per_op']:>10} us   1.00x")
+        for name, encode in build_encoders().items():
+            size = len(encode(content))
+            stats = measure(lambda: encode(content))
+            print(f"{name:22} {size:>10} B  {size / baseline_bytes:6.1%}  {stats['us_per_op']:>10} us  "
+                  f"{stats['us_per_op'] / baseline['us_per_op']:5.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
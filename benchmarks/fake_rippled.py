@@ -0,0 +1,248 @@
+from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from fastapi import FastAPI, Request
+from xrpl.core.binarycodec import decode
+from xrpl.models.transactions.transaction import Transaction
+import threading
+import socket
+import uvicorn
+import time
+
+RIPPLE_EPOCH = 946684800
+
+class FakeLedger:
+    """
+    In-memory stand-in for the ledger state a rippled node would serve:
+    validated transactions per account, XRP balances, trust lines and a
+    ledger index that advances as transactions are submitted.
+    """
+
+    def __init__(self, ledger_index: int = 1_000_000):
+        self.ledger_index = ledger_index
+        self.transactions: List[Dict[str, Any]] = []
+        self.by_hash: Dict[str, Dict[str, Any]] = {}
+        self.by_account: Dict[str, List[Dict[str, Any]]] = {}
+        self.balances: Dict[str, int] = {}
+        self.sequences: Dict[str, int] = {}
+        self.trust_lines: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add_transaction(self, tx_json: Dict[str, Any], tx_hash: str, ledger_index: Optional[int] = None,
+                        result: str = "tesSUCCESS") -> Dict[str, Any]:
+        """Record a validated transaction affecting its sender and destination"""
+        with self._lock:
+            if ledger_index is None:
+                self.ledger_index += 1
+                ledger_index = self.ledger_index
+            else:
+                self.ledger_index = max(self.ledger_index, ledger_index)
+            entry = {
+                "hash": tx_hash,
+                "ledger_index": ledger_index,
+                "close_time": ledger_index * 4,
+                "tx_json": {**tx_json, "date": ledger_index * 4},
+                "meta": {"TransactionResult": result, "delivered_amount": tx_json.get("Amount")},
+            }
+            self.transactions.append(entry)
+            self.by_hash[tx_hash] = entry
+            for account in {tx_json.get("Account"), tx_json.get("Destination")}:
+                if account:
+                    self.by_account.setdefault(account, []).append(entry)
+            return entry
+
+    def account_tx(self, account: str, ledger_min: int, ledger_max: int, limit: int,
+                   forward: bool, marker: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        entries = self.by_account.get(account, [])
+        if ledger_min is not None and ledger_min > 0:
+            entries = [e for e in entries if e["ledger_index"] >= ledger_min]
+        if ledger_max is not None and ledger_max > 0:
+            entries = [e for e in entries if e["ledger_index"] <= ledger_max]
+        if not forward:
+            entries = list(reversed(entries))
+        start = marker.get("seq", 0) if marker else 0
+        page = entries[start:start + limit]
+        result: Dict[str, Any] = {
+            "account": account,
+            "ledger_index_min": ledger_min,
+            "ledger_index_max": self.ledger_index,
+            "limit": limit,
+            "transactions": [self.format_entry(e) for e in page],
+            "validated": True,
+        }
+        if start + limit < len(entries):
+            result["marker"] = {"ledger": page[-1]["ledger_index"], "seq": start + limit}
+        return result
+
+    @staticmethod
+    def format_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """account_tx entry carrying both the API v1 (tx) and v2 (tx_json) shapes"""
+        tx = {**entry["tx_json"], "hash": entry["hash"], "ledger_index": entry["ledger_index"]}
+        return {
+            "tx": tx,
+            "tx_json": entry["tx_json"],
+            "hash": entry["hash"],
+            "ledger_index": entry["ledger_index"],
+            "close_time_iso": time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(RIPPLE_EPOCH + entry["close_time"])
+            ),
+            "meta": entry["meta"],
+            "validated": True,
+        }
+
+def _error(name: str, message: str = "") -> Dict[str, Any]:
+    return {"result": {"status": "error", "error": name, "error_message": message}}
+
+def create_fake_rippled(ledger: FakeLedger, pft_issuer: str = "rnQUEEg8yyjrwk9FhyXpKavHyCRJM9BDMW") -> FastAPI:
+    """
+    JSON-RPC app answering the subset of rippled methods the wallet uses:
+    account_tx, account_info, account_lines, submit, tx, fee, ledger,
+    ledger_current and server_info.
+    """
+    app = FastAPI()
+
+    def handle(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if method == "account_tx":
+            return ledger.account_tx(
+                params["account"],
+                params.get("ledger_index_min", -1),
+                params.get("ledger_index_max", -1),
+                min(int(params.get("limit", 200)), 1000),
+                bool(params.get("forward", False)),
+                params.get("marker"),
+            )
+        if method == "account_info":
+            account = params["account"]
+            return {
+                "account_data": {
+                    "Account": account,
+                    "Balance": str(ledger.balances.get(account, 100_000_000)),
+                    "Sequence": ledger.sequences.get(account, 1),
+                    "Flags": 0,
+                    "OwnerCount": 1,
+                },
+                "ledger_current_index": ledger.ledger_index + 1,
+                "validated": True,
+            }
+        if method == "account_lines":
+            account = params["account"]
+            lines = ledger.trust_lines.get(account, [{
+                "account": pft_issuer,
+                "balance": "1000",
+                "currency": "PFT",
+                "limit": "100000000",
+                "limit_peer": "0",
+            }])
+            return {"account": account, "lines": lines, "validated": True}
+        if method == "fee":
+            return {
+                "current_ledger_size": "10",
+                "current_queue_size": "0",
+                "drops": {
+                    "base_fee": "10",
+                    "median_fee": "5000",
+                    "minimum_fee": "10",
+                    "open_ledger_fee": "10",
+                },
+                "expected_ledger_size": "1000",
+                "ledger_current_index": ledger.ledger_index + 1,
+                "levels": {
+                    "median_level": "128000",
+                    "minimum_level": "256",
+                    "open_ledger_level": "256",
+                    "reference_level": "256",
+                },
+                "max_queue_size": "2000",
+            }
+        if method == "ledger":
+            return {
+                "ledger_index": ledger.ledger_index,
+                "ledger_hash": f"{ledger.ledger_index:064X}",
+                "ledger": {
+                    "ledger_index": str(ledger.ledger_index),
+                    "close_time": ledger.ledger_index * 4,
+                    "closed": True,
+                },
+                "validated": True,
+            }
+        if method == "ledger_current":
+            return {"ledger_current_index": ledger.ledger_index + 1}
+        if method == "server_info":
+            return {
+                "info": {
+                    "build_version": "2.3.0",
+                    "complete_ledgers": f"1-{ledger.ledger_index}",
+                    "server_state": "full",
+                    "validated_ledger": {
+                        "seq": ledger.ledger_index,
+                        "base_fee_xrp": 0.00001,
+                        "reserve_base_xrp": 1,
+                        "reserve_inc_xrp": 0.2,
+                    },
+                },
+            }
+        if method == "submit":
+            blob = params["tx_blob"]
+            tx_json = decode(blob)
+            tx_hash = Transaction.from_blob(blob).get_hash()
+            account = tx_json.get("Account")
+            ledger.sequences[account] = ledger.sequences.get(account, 1) + 1
+            ledger.add_transaction(tx_json, tx_hash)
+            return {
+                "accepted": True,
+                "applied": True,
+                "engine_result": "tesSUCCESS",
+                "engine_result_code": 0,
+                "engine_result_message": "The transaction was applied.",
+                "tx_blob": blob,
+                "tx_json": {**tx_json, "hash": tx_hash},
+            }
+        if method == "tx":
+            entry = ledger.by_hash.get(params.get("transaction", ""))
+            if entry is None:
+                return None
+            return {
+                **entry["tx_json"],
+                "tx_json": entry["tx_json"],
+                "hash": entry["hash"],
+                "ledger_index": entry["ledger_index"],
+                "meta": entry["meta"],
+                "validated": True,
+            }
+        raise KeyError(method)
+
+    @app.post("/")
+    async def rpc(request: Request):
+        body = await request.json()
+        method = body.get("method", "")
+        params = (body.get("params") or [{}])[0]
+        try:
+            result = handle(method, params)
+        except KeyError:
+            return _error("unknownCmd", f"Unsupported method: {method}")
+        if result is None:
+            return _error("txnNotFound", "Transaction not found.")
+        return {"result": {**result, "status": "success"}}
+
+    return app
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@contextmanager
+def serve(app: FastAPI, port: Optional[int] = None):
+    """Run an ASGI app with uvicorn on a background thread, yielding its base URL"""
+    port = port or _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name=f"bench-server-{port}", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server on port {port} failed to start")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
@@ -0,0 +1,152 @@
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+from decimal import Decimal
+import tracemalloc
+import argparse
+import json
+import time
+import sys
+
+from benchmarks.synthetic import deterministic_wallet, REMEMBRANCER_PUBKEY
+
+DEFAULT_BASELINES = Path(__file__).parent / "micro_baselines.json"
+
+# Plaintext sizes (bytes) for the size-dependent benchmarks
+SIZES = (64, 1024, 16 * 1024)
+
+def _text(size: int) -> str:
+    return ("post fiat benchmark " * (size // 20 + 1))[:size]
+
+def measure(fn: Callable[[], Any], min_time: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """
+    Time fn like timeit: calibrate a loop count that runs for at least
+    min_time, take the best of `repeat` rounds, then measure allocations
+    of a single call separately so tracing doesn't skew the timings.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    return {
+        "ops_per_second": round(1 / best, 2),
+        "us_per_op": round(best * 1e6, 2),
+        "peak_alloc_bytes": peak,
+        "retained_blocks": blocks,
+    }
+
+def build_benchmarks() -> Dict[str, Callable[[], Any]]:
+    from postfiat_wallet.services import storage
+    from postfiat_wallet.services.blockchain import BlockchainService
+    from postfiat_wallet.services.transaction import TransactionBuilder, CHUNK_SIZE
+    from postfiat.nodes.task.models.messages import UserLogMessage, Direction
+    from postfiat.nodes.task.codecs.v0.remembrancer.encode import encode_account_msg
+    from postfiat.nodes.task.constants import REMEMBRANCER_ADDRESS
+
+    wallet = deterministic_wallet(0xBE7C4)
+    seed_bytes = BlockchainService()._get_raw_entropy(wallet.seed)
+    builder = TransactionBuilder()
+    encrypt_and_compress = builder._TransactionBuilder__encrypt_and_compress
+    chunkify = builder._TransactionBuilder__chunkify
+    shared_secret = BlockchainService._derive_shared_secret(REMEMBRANCER_PUBKEY, seed_bytes)
+
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        "pbkdf2.generate_key_from_password": lambda: storage.generate_key_from_password("correct horse battery"),
+        "ecdh.derive_shared_secret": lambda: BlockchainService._derive_shared_secret(REMEMBRANCER_PUBKEY, seed_bytes),
+    }
+    for size in SIZES:
+        text = _text(size)
+        compressed = encrypt_and_compress(text, shared_secret)
+        msg = UserLogMessage(
+            message_id="micro",
+            message=text,
+            user_wallet=wallet.classic_address,
+            node_wallet=REMEMBRANCER_ADDRESS,
+            amount_pft=Decimal(0),
+            direction=Direction.USER_TO_NODE,
+        )
+        benchmarks[f"memo.encrypt_and_compress[{size}]"] = (
+            lambda text=text: encrypt_and_compress(text, shared_secret)
+        )
+        benchmarks[f"memo.chunkify[{size}]"] = lambda data=compressed: chunkify(data, CHUNK_SIZE)
+        benchmarks[f"sdk.encode_account_msg[{size}]"] = (
+            lambda msg=msg: encode_account_msg(msg=msg, node_account=REMEMBRANCER_PUBKEY, user_account=wallet)
+        )
+    return benchmarks
+
+def compare(results: Dict[str, Dict[str, float]], baselines: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Return a description of every benchmark whose throughput or allocations regressed"""
+    regressions = []
+    for name, stats in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        if stats["ops_per_second"] < baseline["ops_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {stats['ops_per_second']} ops/s < baseline {baseline['ops_per_second']} ops/s (-{tolerance:.0%})"
+            )
+        if stats["peak_alloc_bytes"] > baseline["peak_alloc_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak {stats['peak_alloc_bytes']} B > baseline {baseline['peak_alloc_bytes']} B (+{tolerance:.0%})"
+            )
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the wallet's crypto and encoding hot paths")
+    parser.add_argument("--only", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baselines", type=Path, default=DEFAULT_BASELINES)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput/allocation regression")
+    parser.add_argument("--save-baselines", action="store_true", help="Store this run as the new baselines")
+    parser.add_argument("--check", action="store_true", help="Fail when a benchmark has no stored baseline")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for name, fn in build_benchmarks().items():
+        if args.only not in name:
+            continue
+        report[name] = stats = measure(fn)
+        print(f"{name:45} {stats['ops_per_second']:>12} ops/s {stats['us_per_op']:>12} us/op "
+              f"{stats['peak_alloc_bytes']:>10} B peak {stats['retained_blocks']:>6} blocks")
+
+    baselines = json.loads(args.baselines.read_text()) if args.baselines.exists() else {}
+    if args.save_baselines:
+        baselines.update(report)
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baselines to {args.baselines}")
+        return 0
+
+    missing = [name for name in report if name not in baselines]
+    if missing:
+        print(f"No baseline for {', '.join(missing)}; run with --save-baselines to record one")
+    regressions = compare(report, baselines, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    # Without baselines nothing was compared, which a regression gate must not pass
+    return 2 if missing and args.check else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
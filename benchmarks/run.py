@@ -0,0 +1,243 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pathlib import Path
+import statistics
+import tempfile
+import argparse
+import asyncio
+import json
+import time
+import sys
+import os
+
+from benchmarks.fake_rippled import FakeLedger, create_fake_rippled, serve
+from benchmarks.synthetic import generate_history, deterministic_wallet
+from postfiat_wallet.services.rpc_cassette import Cassette, CassetteTransport, create_cassette_app
+
+DEFAULT_BASELINES = Path(__file__).parent / "baselines.json"
+
+class BenchResult:
+    def __init__(self, name: str, samples: List[float]):
+        self.name = name
+        self.samples = sorted(samples)
+
+    def percentile(self, p: float) -> float:
+        index = min(int(round(p / 100 * (len(self.samples) - 1))), len(self.samples) - 1)
+        return self.samples[index]
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "p50": round(self.percentile(50), 6),
+            "p95": round(self.percentile(95), 6),
+            "mean": round(statistics.fmean(self.samples), 6),
+            "runs": len(self.samples),
+        }
+
+async def measure_async(name: str, fn: Callable[[int], Awaitable[Any]], repeat: int,
+                        setup: Optional[Callable[[int], Awaitable[Any]]] = None) -> BenchResult:
+    samples = []
+    for i in range(repeat):
+        if setup is not None:
+            await setup(i)
+        start = time.perf_counter()
+        await fn(i)
+        samples.append(time.perf_counter() - start)
+    return BenchResult(name, samples)
+
+def measure(name: str, fn: Callable[[], Any], repeat: int) -> BenchResult:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return BenchResult(name, samples)
+
+async def bench_ingestion(rpc_url: str, cache_root: Path, ledger: Optional[FakeLedger], wallet, repeat: int) -> List[BenchResult]:
+    from postfiat_wallet.services.task_storage import TaskStorage
+    from postfiat_wallet.services.rpc_client_wrapper import InstrumentedRpcClient
+    from postfiat_wallet.config import settings
+
+    account = wallet.classic_address
+    storage = TaskStorage()
+
+    async def fresh_cache(i: int):
+        storage.clear_user_state(account)
+        storage.client = InstrumentedRpcClient(endpoint=rpc_url, cache_dir=str(cache_root / f"cold-{i}"))
+
+    async def clear_state(i: int):
+        storage.clear_user_state(account)
+
+    async def initialize(i: int):
+        await storage.initialize_user_tasks(account, wallet)
+
+    async def append_transactions(i: int):
+        generate_history(ledger, wallet, 20, seed=1000 + i)
+
+    async def refresh(i: int):
+        await storage.refresh_once(account, wallet)
+
+    async def fresh_cache_sequential(i: int):
+        await fresh_cache(repeat + i)
+
+    results = [await measure_async("ingest.initialize_cold", initialize, repeat, setup=fresh_cache)]
+    # The same cold start without the parallel range backfill, for comparison
+    backfill_enabled = settings.BACKFILL.get("enabled", True)
+    settings.BACKFILL["enabled"] = False
+    try:
+        results.append(await measure_async(
+            "ingest.initialize_cold_sequential", initialize, repeat, setup=fresh_cache_sequential
+        ))
+    finally:
+        settings.BACKFILL["enabled"] = backfill_enabled
+    results.append(await measure_async("ingest.initialize_warm", initialize, repeat, setup=clear_state))
+    if ledger is not None:
+        await storage.initialize_user_tasks(account, wallet)
+        results.append(await measure_async("ingest.refresh_tick", refresh, repeat, setup=append_transactions))
+    storage.decode_pool.shutdown()
+    return results
+
+def bench_api(account: str, repeat: int) -> List[BenchResult]:
+    from postfiat_wallet.server.app import create_app
+    from postfiat_wallet.config import settings
+    import requests
+
+    # The benchmark reads the account without signing in, so let the
+    # server's TaskStorage (built on first request) scan any account
+    settings.PREFETCH["require_signin"] = False
+    results = []
+    with serve(create_app()) as base_url, requests.Session() as session:
+        for name, path in [
+            ("api.tasks", f"/api/tasks/{account}"),
+            ("api.payments", f"/api/payments/{account}"),
+            ("api.odv_messages", f"/api/odv/messages/{account}"),
+        ]:
+            # The first request initializes server-side state; only steady state is measured
+            session.get(base_url + path).raise_for_status()
+            results.append(measure(name, lambda: session.get(base_url + path).raise_for_status(), repeat))
+    return results
+
+async def bench_submission(wallet, repeat: int) -> List[BenchResult]:
+    from postfiat_wallet.services.blockchain import BlockchainService
+    from postfiat_wallet.services.transaction import TransactionBuilder
+    from postfiat.nodes.task.constants import REMEMBRANCER_ADDRESS
+    from benchmarks.synthetic import REMEMBRANCER_PUBKEY
+
+    blockchain = BlockchainService()
+    builder = TransactionBuilder()
+    destination = deterministic_wallet(7).classic_address
+
+    async def payment(i: int):
+        unsigned_tx = builder.build_payment_transaction(
+            account=wallet.classic_address, destination=destination,
+            amount="1", currency="PFT", memo_text=f"bench {i}"
+        )
+        await blockchain.sign_and_send_transaction(unsigned_tx, wallet)
+
+    async def remembrancer_message(i: int):
+        results = await blockchain.encode_and_send_user_message(
+            wallet, f"bench-submit-{i}", "benchmark message " * 40,
+            REMEMBRANCER_ADDRESS, REMEMBRANCER_PUBKEY, amount_pft=1
+        )
+        errors = [r for r in results if isinstance(r, dict) and ("error" in r or r.get("status") == "error")]
+        if errors:
+            raise RuntimeError(f"Message submission failed: {errors[0]}")
+
+    return [
+        await measure_async("submit.payment", payment, repeat),
+        await measure_async("submit.remembrancer_message", remembrancer_message, repeat),
+    ]
+
+def compare(results: Dict[str, Dict[str, float]], baselines: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Return a description of every benchmark whose p50 regressed past its baseline"""
+    regressions = []
+    for name, stats in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        limit = baseline["p50"] * (1 + tolerance)
+        if stats["p50"] > limit:
+            regressions.append(
+                f"{name}: p50 {stats['p50'] * 1000:.2f}ms > baseline {baseline['p50'] * 1000:.2f}ms (+{tolerance:.0%})"
+            )
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the wallet backend against a local fake XRPL node")
+    parser.add_argument("--size", type=int, default=1000, help="Transactions in the synthetic account history")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument("--only", choices=["ingest", "api", "submit"], help="Only run one group of benchmarks")
+    parser.add_argument("--baselines", type=Path, default=DEFAULT_BASELINES)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown before failing")
+    parser.add_argument("--save-baselines", action="store_true", help="Store this run as the new baselines")
+    parser.add_argument("--check", action="store_true", help="Fail when a benchmark has no stored baseline")
+    parser.add_argument("--cassette", type=Path, help="Replay a recorded cassette instead of a synthetic history")
+    parser.add_argument("--wallet-seed", default=os.environ.get("POSTFIAT_BENCH_SEED"),
+                        help="Seed of the wallet the cassette was recorded for (default: $POSTFIAT_BENCH_SEED)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean latency added to replayed responses")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Standard deviation of the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of replayed requests that fail")
+    args = parser.parse_args(argv)
+
+    ledger = FakeLedger()
+    wallet = deterministic_wallet(0xBE7C4)
+    if args.cassette:
+        if not args.wallet_seed:
+            parser.error("--cassette needs --wallet-seed to decrypt the recorded history")
+        from xrpl.wallet import Wallet
+        wallet = Wallet.from_seed(args.wallet_seed)
+        node = create_cassette_app(CassetteTransport(
+            Cassette(args.cassette), latency=args.latency, jitter=args.jitter, error_rate=args.error_rate
+        ))
+        # Recorded histories can't grow or accept submissions, so only read paths are measured
+        groups = {"ingest", "api"}
+    else:
+        node = create_fake_rippled(ledger)
+        groups = {"ingest", "api", "submit"}
+    if args.only:
+        groups &= {args.only}
+
+    with serve(node) as rpc_url, tempfile.TemporaryDirectory() as tmp:
+        # Point the wallet at the fake node and a throwaway data directory before importing it
+        os.environ["POSTFIAT_XRPL__RPC_URL"] = rpc_url
+        os.environ["POSTFIAT_PATHS__DATA_DIR"] = str(Path(tmp) / "data")
+        os.environ["POSTFIAT_PATHS__CACHE_DIR"] = str(Path(tmp) / "cache")
+
+        if not args.cassette:
+            counts = generate_history(ledger, wallet, args.size)
+            print(f"Synthetic history for {wallet.classic_address}: {counts}")
+
+        results: List[BenchResult] = []
+        if "ingest" in groups:
+            results += asyncio.run(bench_ingestion(
+                rpc_url, Path(tmp) / "bench-cache", None if args.cassette else ledger, wallet, args.repeat
+            ))
+        if "api" in groups:
+            results += bench_api(wallet.classic_address, args.repeat * 4)
+        if "submit" in groups:
+            results += asyncio.run(bench_submission(wallet, args.repeat))
+
+    # Baselines are per history size (or cassette), since most timings scale with it
+    label = args.cassette.name if args.cassette else args.size
+    report = {f"{r.name}[{label}]": r.to_dict() for r in results}
+    for name, stats in report.items():
+        print(f"{name:45} p50 {stats['p50'] * 1000:9.2f}ms  p95 {stats['p95'] * 1000:9.2f}ms  ({stats['runs']} runs)")
+
+    baselines = json.loads(args.baselines.read_text()) if args.baselines.exists() else {}
+    if args.save_baselines:
+        baselines.update(report)
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baselines to {args.baselines}")
+        return 0
+
+    missing = [name for name in report if name not in baselines]
+    if missing:
+        print(f"No baseline for {', '.join(missing)}; run with --save-baselines to record one")
+    regressions = compare(report, baselines, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    # Without baselines nothing was compared, which a regression gate must not pass
+    return 2 if missing and args.check else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
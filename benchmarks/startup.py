@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional
+from pathlib import Path
+import subprocess
+import tempfile
+import argparse
+import socket
+import time
+import sys
+import os
+
+import requests
+
+# Budgets in seconds. Importing the CLI must stay cheap because it runs for
+# every command, including --help; the server import and time to listening
+# cover everything `postfiat-wallet start` does before it can answer requests.
+BUDGETS: Dict[str, float] = {
+    "import.cli": 0.15,
+    "import.server": 2.0,
+    "start.listening": 4.0,
+}
+
+def _env(tmp: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["POSTFIAT_PATHS__DATA_DIR"] = str(Path(tmp) / "data")
+    env["POSTFIAT_PATHS__CACHE_DIR"] = str(Path(tmp) / "cache")
+    return env
+
+def import_time(module: str, env: Dict[str, str]) -> float:
+    """Cumulative import time of a module in a fresh interpreter, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"No import time reported for {module}")
+
+def time_to_listening(env: Dict[str, str], timeout: float = 60) -> float:
+    """Seconds from launching `postfiat-wallet start` until /api/health answers"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from postfiat_wallet.cli import main; main()",
+         "start", "--no-browser", "--no-updates", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if requests.get(f"http://localhost:{port}/api/health", timeout=0.5).ok:
+                    return time.perf_counter() - started
+            except requests.RequestException:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"Server did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check import and startup times against their budgets")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is kept")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(tmp)
+        results = {
+            "import.cli": min(import_time("postfiat_wallet.cli", env) for _ in range(args.repeat)),
+            "import.server": min(import_time("postfiat_wallet.server.app", env) for _ in range(args.repeat)),
+            "start.listening": min(time_to_listening(env) for _ in range(args.repeat)),
+        }
+
+    over = []
+    for name, seconds in results.items():
+        budget = BUDGETS[name]
+        status = "ok" if seconds <= budget else "OVER BUDGET"
+        print(f"{name:20} {seconds * 1000:9.1f}ms  budget {budget * 1000:7.0f}ms  {status}")
+        if seconds > budget:
+            over.append(name)
+    return 1 if over else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
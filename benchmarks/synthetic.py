@@ -0,0 +1,193 @@
+from typing import Any, Dict, List
+from decimal import Decimal
+from xrpl.wallet import Wallet
+from xrpl.core.keypairs import generate_seed
+from postfiat.nodes.task.models.messages import UserLogMessage, Direction
+from postfiat.nodes.task.codecs.v0.remembrancer.encode import encode_account_msg
+from postfiat.nodes.task.constants import TASK_NODE_ADDRESS, REMEMBRANCER_ADDRESS
+from postfiat.nodes.task.state import TaskStatus
+from benchmarks.fake_rippled import FakeLedger
+import datetime
+import binascii
+import hashlib
+import random
+
+REMEMBRANCER_PUBKEY = "ED5C677D5039D7412E2B978268F55C77937F9088C29028BEBFD0BCEA574DD7FF90"
+PFT_ISSUER = "rnQUEEg8yyjrwk9FhyXpKavHyCRJM9BDMW"
+
+# The task node's v0 memo conventions: MemoType is the task id, MemoData a
+# prefixed message, in the order a task moves through its life cycle
+TASK_LIFECYCLE = [
+    ("user", "REQUEST_POST_FIAT ___ "),
+    ("node", "PROPOSED PF ___ "),
+    ("user", "ACCEPTANCE REASON ___ "),
+    ("user", "COMPLETION JUSTIFICATION ___ "),
+    ("node", "VERIFICATION PROMPT ___ "),
+    ("user", "VERIFICATION RESPONSE ___ "),
+    ("node", "REWARD RESPONSE __ "),
+]
+
+WORDS = (
+    "ledger review draft model report deploy audit schedule metric budget "
+    "refactor research summary outline proposal release benchmark analysis"
+).split()
+
+def _hex(text: str) -> str:
+    return binascii.hexlify(text.encode()).decode().upper()
+
+def _fake_hash(*parts: Any) -> str:
+    return hashlib.sha512("|".join(map(str, parts)).encode()).hexdigest()[:64].upper()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def _pft(value: int) -> Dict[str, str]:
+    return {"currency": "PFT", "issuer": PFT_ISSUER, "value": str(value)}
+
+def _payment(account: str, destination: str, amount: Any, memos: List[Dict[str, Any]] = ()) -> Dict[str, Any]:
+    tx = {
+        "TransactionType": "Payment",
+        "Account": account,
+        "Destination": destination,
+        "Amount": amount,
+        "Fee": "12",
+        "Flags": 0,
+    }
+    if memos:
+        tx["Memos"] = list(memos)
+    return tx
+
+def _task_memo(task_id: str, text: str, username: str) -> Dict[str, Any]:
+    return {"Memo": {"MemoType": _hex(task_id), "MemoData": _hex(text), "MemoFormat": _hex(username)}}
+
+def deterministic_wallet(n: int) -> Wallet:
+    """A wallet derived from fixed entropy, the same on every run"""
+    return Wallet.from_seed(generate_seed(entropy=f"{n:032x}"))
+
+def generate_history(
+    ledger: FakeLedger,
+    user_wallet: Wallet,
+    transactions: int,
+    remembrancer_share: float = 0.2,
+    payment_share: float = 0.1,
+    seed: int = 0,
+) -> Dict[str, int]:
+    """
+    Fill the fake ledger with a synthetic history for one user account.
+
+    Task-node traffic follows the v0 task memo life cycle, remembrancer
+    messages are encrypted and chunked by the SDK's own encoder (so decoding
+    cost is realistic), and the rest are plain XRP/PFT payments to unrelated
+    accounts.
+
+    Args:
+        ledger: The ledger to append to
+        user_wallet: The wallet whose history is generated
+        transactions: Approximate number of transactions to generate
+        remembrancer_share: Fraction of transactions that are remembrancer messages
+        payment_share: Fraction that are unrelated payments
+        seed: Random seed, so the same arguments always produce the same history
+
+    Returns:
+        Counts of generated transactions per kind
+    """
+    rng = random.Random(seed)
+    user = user_wallet.classic_address
+    counterparties = [deterministic_wallet(seed * 100 + i + 1).classic_address for i in range(8)]
+    counts = {"task": 0, "remembrancer": 0, "payment": 0}
+    open_tasks: List[List[Any]] = []
+    generated = 0
+
+    while generated < transactions:
+        roll = rng.random()
+        ledger_index = ledger.ledger_index + rng.randint(1, 3)
+
+        if roll < remembrancer_share:
+            msg = UserLogMessage(
+                message_id=f"bench-{generated}",
+                message=_sentence(rng, rng.randint(10, 200)),
+                user_wallet=user,
+                node_wallet=REMEMBRANCER_ADDRESS,
+                amount_pft=Decimal(1),
+                direction=Direction.USER_TO_NODE,
+            )
+            for txn in encode_account_msg(msg=msg, node_account=REMEMBRANCER_PUBKEY, user_account=user_wallet):
+                tx_json = txn.to_xrpl() if hasattr(txn, "to_xrpl") else dict(txn)
+                ledger.add_transaction(tx_json, _fake_hash("r", generated), ledger_index)
+                generated += 1
+                counts["remembrancer"] += 1
+
+        elif roll < remembrancer_share + payment_share:
+            other = rng.choice(counterparties)
+            amount = _pft(rng.randint(1, 500)) if rng.random() < 0.5 else str(rng.randint(1, 10) * 1_000_000)
+            sender, receiver = (user, other) if rng.random() < 0.5 else (other, user)
+            ledger.add_transaction(_payment(sender, receiver, amount), _fake_hash("p", generated), ledger_index)
+            generated += 1
+            counts["payment"] += 1
+
+        else:
+            # Advance an open task by one step, or open a new one
+            if open_tasks and rng.random() < 0.8:
+                task = rng.choice(open_tasks)
+            else:
+                task = [f"2025-01-01_{generated:06d}__BN{rng.randint(10, 99)}", 0]
+                open_tasks.append(task)
+            task_id, step = task
+            side, prefix = TASK_LIFECYCLE[step]
+            memo = _task_memo(task_id, prefix + _sentence(rng, rng.randint(5, 60)), "bench")
+            if side == "user":
+                tx_json = _payment(user, TASK_NODE_ADDRESS, _pft(1), [memo])
+            else:
+                tx_json = _payment(TASK_NODE_ADDRESS, user, _pft(rng.randint(1, 900)), [memo])
+            ledger.add_transaction(tx_json, _fake_hash("t", generated), ledger_index)
+            generated += 1
+            counts["task"] += 1
+            task[1] += 1
+            if task[1] == len(TASK_LIFECYCLE):
+                open_tasks.remove(task)
+
+    return counts
+
+def generate_task_sections(tasks: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Build a /api/tasks response body: tasks grouped by status section, each
+    with the message history the task memo life cycle would have produced.
+
+    Args:
+        tasks: Number of tasks to generate
+        seed: Random seed, so the same arguments always produce the same payload
+
+    Returns:
+        Sections keyed by lowercase TaskStatus name, shaped like TaskStorage.get_tasks_by_ui_section
+    """
+    rng = random.Random(seed)
+    sections: Dict[str, List[Dict[str, Any]]] = {s.name.lower(): [] for s in TaskStatus}
+    started = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+    for n in range(tasks):
+        status = rng.choice(list(TaskStatus)).name.lower()
+        steps = rng.randint(1, len(TASK_LIFECYCLE))
+        timestamp = started + datetime.timedelta(minutes=n * 37)
+        history = []
+        for side, prefix in TASK_LIFECYCLE[:steps]:
+            timestamp += datetime.timedelta(minutes=rng.randint(1, 600))
+            history.append({
+                "timestamp": timestamp.isoformat(),
+                "direction": "user_to_node" if side == "user" else "node_to_user",
+                "data": prefix + _sentence(rng, rng.randint(5, 60)),
+            })
+        texts = [entry["data"] for entry in history]
+        sections[status].append({
+            "id": f"2025-01-01_{n:06d}__BN{rng.randint(10, 99)}",
+            "status": status,
+            "pft_offered": str(rng.randint(1, 900)) if steps > 1 else None,
+            "pft_rewarded": str(rng.randint(1, 900)) if steps == len(TASK_LIFECYCLE) else None,
+            "message_history": history,
+            "task_request": texts[0],
+            "task_statement": texts[1] if steps > 1 else None,
+            "completion_statement": texts[3] if steps > 3 else None,
+            "challenge_statement": texts[4] if steps > 4 else None,
+            "challenge_response": texts[5] if steps > 5 else None,
+            "timestamp": None,
+        })
+    return sections
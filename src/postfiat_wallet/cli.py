@@ -1,37 +1,29 @@
 #!/usr/bin/env python3
 import sys
 import click
-import uvicorn
-import requests
-import importlib.metadata
-from packaging import version
 from pathlib import Path
 import logging
 import socket
-from .server.app import create_app
-from .utils.browser import launch_browser
-from .utils.updater import UIUpdater
-from .config import settings
 import os
 
+# Heavy imports (uvicorn, the server stack, boto3 via the updater) happen
+# inside the commands that need them, so --help and reset stay fast
+
 logger = logging.getLogger(__name__)
 
 def check_package_updates():
     """Check PyPI for newer package versions"""
-    try:
-        current = importlib.metadata.version('postfiat-wallet')
-        pypi_response = requests.get('https://pypi.org/pypi/postfiat-wallet/json', timeout=2)
-        latest = version.parse(pypi_response.json()['info']['version'])
-        
-        if version.parse(current) < latest:
-            click.echo(f"New version {latest} available. Run 'pip install --upgrade postfiat-wallet' to update.")
-            return True
-    except Exception as e:
-        logger.debug(f"Failed to check for package updates: {e}")
+    from .utils.updater import newer_package_version
+
+    latest = newer_package_version()
+    if latest:
+        click.echo(f"New version {latest} available. Run 'pip install --upgrade postfiat-wallet' to update.")
+        return True
     return False
 
 def ensure_data_dir():
     """Ensure data directory exists"""
+    from .config import settings
     data_dir = Path(settings.PATHS["data_dir"])
     data_dir.mkdir(parents=True, exist_ok=True)
     return data_dir
@@ -62,9 +54,13 @@ def find_available_port(start_port):
 @click.option('--port', default=None, help='Port to run server on (defaults to 28080 if available)')
 @click.option('--no-browser', is_flag=True, help='Don\'t open browser window')
 @click.option('--no-updates', is_flag=True, help='Skip update checks')
+@click.option('--update-ui', is_flag=True, help='Install UI updates from S3 in the background instead of only reporting them')
 @click.option('--dev', is_flag=True, help='Run in development mode')
-def start(port, no_browser, no_updates, dev):
+def start(port, no_browser, no_updates, update_ui, dev):
     """Start the Post Fiat Wallet interface"""
+    import uvicorn
+    from .config import settings
+
     if dev:
         os.environ["POSTFIAT_DEV"] = "1"
         click.echo("Running in development mode")
@@ -86,10 +82,12 @@ def start(port, no_browser, no_updates, dev):
         sys.exit(1)
 
     # Create and configure FastAPI app
-    app = create_app()
+    from .server.app import create_app
+    app = create_app(check_updates=not (no_updates or dev), update_ui=update_ui)
     
     # Launch browser unless disabled
     if not no_browser and not dev:
+        from .utils.browser import launch_browser
         launch_browser(f"http://localhost:{port}")
     
     # Start server
@@ -99,6 +97,8 @@ def start(port, no_browser, no_updates, dev):
 @cli.command()
 def update():
     """Force update check for UI and package"""
+    from .utils.updater import UIUpdater
+
     click.echo("Checking for updates...")
     
     # Check package updates
@@ -115,10 +115,96 @@ def update():
     else:
         click.echo("UI is up to date")
 
+@cli.command()
+@click.argument('accounts', nargs=-1, required=True)
+@click.option('--url', default=None, help='Server to load (defaults to the configured local port)')
+@click.option('--sessions', default=10, help='Concurrent simulated UI sessions')
+@click.option('--duration', default=60.0, help='Seconds to run for')
+@click.option('--mix', multiple=True, metavar='ENDPOINT=SECONDS',
+              help='Override an endpoint\'s polling interval, 0 disables it (repeatable)')
+@click.option('--time-scale', default=1.0, help='Poll this many times faster than the real UI')
+@click.option('--session-token', default=None, help='Read ODV messages decrypted using this wallet session')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON')
+def bench(accounts, url, sessions, duration, mix, time_scale, session_token, as_json):
+    """
+    Load test a running wallet server with simulated UI sessions. The accounts
+    must have signed in on that server, or it must run with
+    POSTFIAT_PREFETCH__REQUIRE_SIGNIN=false.
+    """
+    import asyncio
+    import json
+    from .config import settings
+    from .utils.loadtest import LoadTest
+
+    try:
+        overrides = {}
+        for item in mix:
+            name, _, interval = item.partition("=")
+            overrides[name] = float(interval)
+        load_test = LoadTest(
+            base_url=url or f"http://localhost:{getattr(settings.SERVER, 'port', 28080)}",
+            accounts=list(accounts),
+            sessions=sessions,
+            duration=duration,
+            mix=overrides,
+            time_scale=time_scale,
+            session_token=session_token
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    click.echo(f"Running {sessions} sessions against {load_test.base_url} for {duration:.0f}s "
+               f"({', '.join(f'{n} every {i:g}s' for n, i in load_test.intervals.items())})")
+    report = asyncio.run(load_test.run())
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+    click.echo(f"{'endpoint':14} {'requests':>9} {'req/s':>8} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in report["endpoints"].items():
+        click.echo(
+            f"{name:14} {stats['requests']:>9} {stats['requests_per_second']:>8} {stats['error_rate']:>8.2%} "
+            f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}"
+        )
+    click.echo(f"Total: {report['requests']} requests, {report['requests_per_second']} req/s, "
+               f"{report['error_rate']:.2%} errors")
+
+@cli.command()
+@click.argument('mode', type=click.Choice(['record', 'replay']))
+@click.argument('cassette_file', type=click.Path(dir_okay=False))
+@click.option('--port', default=6008, help='Port to serve the JSON-RPC endpoint on')
+@click.option('--upstream', default=None, help='XRPL node to record from (defaults to the configured node)')
+@click.option('--latency', default=0.0, help='Mean seconds of latency added to replayed responses')
+@click.option('--jitter', default=0.0, help='Standard deviation of the added latency, in seconds')
+@click.option('--error-rate', default=0.0, help='Fraction of replayed requests that fail')
+@click.option('--error-kind', type=click.Choice(['http', 'rpc']), default='http', help='Fail with HTTP 503 or a rippled slowDown error')
+@click.option('--seed', default=0, help='Seed for latency and error draws')
+def cassette(mode, cassette_file, port, upstream, latency, jitter, error_rate, error_kind, seed):
+    """Record or replay XRPL JSON-RPC traffic for reproducible performance runs"""
+    import uvicorn
+    from .config import settings
+    from .services.rpc_cassette import Cassette, CassetteTransport, create_cassette_app
+
+    transport = CassetteTransport(
+        Cassette(cassette_file),
+        mode=mode,
+        upstream=upstream or settings.XRPL.rpc_url,
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        error_kind=error_kind,
+        seed=seed
+    )
+    click.echo(f"Serving {mode} cassette {cassette_file} on http://127.0.0.1:{port}")
+    click.echo(f"Start the wallet with POSTFIAT_XRPL__RPC_URL=http://127.0.0.1:{port} to use it")
+    uvicorn.run(create_cassette_app(transport), host="127.0.0.1", port=port)
+
 @cli.command()
 @click.option('--force', is_flag=True, help='Force reset without confirmation')
 def reset(force):
     """Reset wallet data directory"""
+    from .config import settings
+
     if not force:
         if not click.confirm('This will delete all local wallet data. Continue?'):
             return
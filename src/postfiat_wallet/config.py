@@ -10,11 +10,54 @@ DEFAULT_CONFIG = {
         "bucket": "postfiat-www",
         "region": "us-east-2",
         "base_url": "http://postfiat-www.s3-website.us-east-2.amazonaws.com",
-        "ui_prefix": "wallet-ui"  # Where the UI files will live in the bucket
+        "ui_prefix": "wallet-ui",  # Where the UI files will live in the bucket
+        "endpoint_url": "",  # Optional S3-compatible endpoint, e.g. a local MinIO for testing
+        "max_concurrency": 8  # Parallel downloads when updating the UI
+    },
+    "XRPL": {
+        "rpc_url": "https://xrpl.postfiat.org:6007"
     },
     "PATHS": {
         "data_dir": "~/.postfiat-wallet",
         "cache_dir": "~/.postfiat-wallet/cache"
+    },
+    "DECODE": {
+        "max_workers": 0,  # Decodes running at once; 0 means one per CPU core
+        "window": 64  # Decoded messages a worker may run ahead of the reader
+    },
+    "BACKFILL": {
+        "enabled": True,  # Fetch a first-time account history in parallel ledger ranges
+        "parallelism": 4,  # Ranges fetched at once
+        "partitions": 16,  # Ranges the history is split into
+        "buffer_size": 2000,  # Transactions buffered per range ahead of the decoders
+        "min_ledgers": 100000  # Shorter histories are fetched sequentially
+    },
+    "PROGRESSIVE_SYNC": {
+        "enabled": True,  # Replay a recent window first and the full history in the background
+        "recent_ledgers": 100000  # Size of the recent window (about 4-5 days of ledgers)
+    },
+    "SESSION": {
+        "idle_timeout": 900  # Seconds an unlocked wallet session stays valid without use
+    },
+    "PREFETCH": {
+        "enabled": True,  # Warm balances and task state in the background at sign-in
+        "require_signin": True,  # Only accounts signed in since startup may scan their history
+        "balance_max_age": 15  # Seconds the dashboard may reuse balances fetched by the warm-up
+    },
+    "LOOP_MONITOR": {
+        "enabled": True,
+        "interval": 0.1,  # Seconds between event loop lag samples
+        "threshold": 0.25  # Lag (seconds) above which the loop counts as blocked
+    },
+    "DEBUG_TOOLS": {
+        "profiling": False,  # Enables /api/debug/profile and /api/debug/memory
+        "tracemalloc_frames": 25  # Traceback depth kept per allocation for memory snapshots
+    },
+    "API_ENCODING": {
+        "msgpack": True,  # Answer with MessagePack when the Accept header prefers it
+        "compress_min_size": 1024,  # Smaller responses are sent uncompressed
+        "gzip_level": 6,
+        "brotli_quality": 4
     }
 }
 
@@ -41,3 +84,21 @@ if not settings.get("SERVER"):
     settings.set("SERVER", DEFAULT_CONFIG["SERVER"])
 if not settings.get("S3"):
     settings.set("S3", DEFAULT_CONFIG["S3"])
+if not settings.get("XRPL"):
+    settings.set("XRPL", DEFAULT_CONFIG["XRPL"])
+if not settings.get("DECODE"):
+    settings.set("DECODE", DEFAULT_CONFIG["DECODE"])
+if not settings.get("BACKFILL"):
+    settings.set("BACKFILL", DEFAULT_CONFIG["BACKFILL"])
+if not settings.get("PROGRESSIVE_SYNC"):
+    settings.set("PROGRESSIVE_SYNC", DEFAULT_CONFIG["PROGRESSIVE_SYNC"])
+if not settings.get("SESSION"):
+    settings.set("SESSION", DEFAULT_CONFIG["SESSION"])
+if not settings.get("PREFETCH"):
+    settings.set("PREFETCH", DEFAULT_CONFIG["PREFETCH"])
+if not settings.get("LOOP_MONITOR"):
+    settings.set("LOOP_MONITOR", DEFAULT_CONFIG["LOOP_MONITOR"])
+if not settings.get("DEBUG_TOOLS"):
+    settings.set("DEBUG_TOOLS", DEFAULT_CONFIG["DEBUG_TOOLS"])
+if not settings.get("API_ENCODING"):
+    settings.set("API_ENCODING", DEFAULT_CONFIG["API_ENCODING"])
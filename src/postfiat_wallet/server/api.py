@@ -1,18 +1,26 @@
-from fastapi import APIRouter, HTTPException, FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import APIRouter, HTTPException, Request, Header
+from fastapi.responses import StreamingResponse, Response
 from fastapi.routing import APIRoute
 from pydantic import BaseModel
-from postfiat_wallet.services.blockchain import BlockchainService
 from postfiat_wallet.services import storage
 import logging
-from postfiat_wallet.services.task_storage import TaskStorage
+import asyncio
 from enum import Enum
 from postfiat.nodes.task.state import TaskStatus
-from typing import Optional, Dict, Any
-from postfiat_wallet.services.transaction import TransactionBuilder
+from typing import Optional, Dict, Any, AsyncIterator, AbstractSet, List
 from xrpl.models.transactions import TrustSet
 import json
 from postfiat_wallet.services.odv_service import ODVService
+from postfiat_wallet.services.wallet_sessions import WalletSessionManager
+from postfiat_wallet.utils.lazy import LazyService
+from postfiat_wallet.utils.shared_calls import shared_calls
+from postfiat_wallet.server.batch import run_batch
+from postfiat_wallet.utils.projection import TASK_FIELDS, PAYMENT_FIELDS, MESSAGE_FIELDS, parse_fields, project
+from postfiat_wallet.server.encoding import NegotiatedResponse, NegotiatedRoute
+from postfiat_wallet.utils.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, RPC_REQUEST_SECONDS
+from postfiat_wallet.utils.loop_monitor import loop_monitor
+from postfiat_wallet.utils.profiler import SamplingProfiler, MemoryProfiler
+from postfiat_wallet.config import settings
 from xrpl.wallet import Wallet
 import uuid
 from postfiat.nodes.task.codecs.v0.serialization.cipher import decrypt_memo, encrypt_memo
@@ -32,28 +40,38 @@ REMEMBRANCER_ADDRESS = "rJ1mBMhEBKack5uTQvM8vWoAntbufyG9Yn"
 TASK_NODE_PUBKEY = "ED81962C730DDDA7AD72936142ABCCE0F2E3F7C562D6F38D8C50B74CB4EA0BE0A9"
 TASK_NODE_ADDRESS = "r4yc85M1hwsegVGZ1pawpZPwj65SVs8PzD"
 
-app = FastAPI()
-
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Add CORS middleware with more specific configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# JSON or MessagePack per Accept, compressed per Accept-Encoding
+router = APIRouter(route_class=NegotiatedRoute, default_response_class=NegotiatedResponse)
+
+def _create_blockchain_service():
+    from postfiat_wallet.services.blockchain import BlockchainService
+    return BlockchainService()
+
+def _create_task_storage():
+    from postfiat_wallet.services.task_storage import TaskStorage
+    return TaskStorage()
+
+def _create_transaction_builder():
+    from postfiat_wallet.services.transaction import TransactionBuilder
+    return TransactionBuilder()
 
-router = APIRouter()
-blockchain = BlockchainService()
+# Services are built on first use so importing the API (and starting the
+# server) doesn't pay for XRPL clients, RPC caches or SDK imports up front
+blockchain = LazyService(_create_blockchain_service, "BlockchainService")
 
 # Create one global TaskStorage instance
-task_storage = TaskStorage()
+task_storage = LazyService(_create_task_storage, "TaskStorage")
 
-# Add this near other service instantiations
-transaction_builder = TransactionBuilder()
+transaction_builder = LazyService(_create_transaction_builder, "TransactionBuilder")
+
+# Unlocked wallets for signed-in users, keyed by opaque session token
+wallet_sessions = WalletSessionManager()
+
+# Background warm-ups started at sign-in, keyed by account
+warmups: Dict[str, asyncio.Task] = {}
 
 # Create ODVService instance (will be initialized per user when needed)
 odv_services = {}  # Map of user address -> ODVService instance
@@ -162,6 +180,94 @@ class HandshakeRequest(BaseModel):
     password: str
     ecdh_public_key: str
 
+class BatchSubRequest(BaseModel):
+    """One read-only sub-request of a batch"""
+    path: str  # e.g. "/api/balance/r..." including any query string
+    id: Optional[str] = None  # Echoed back so callers can match responses
+
+class BatchRequest(BaseModel):
+    """Request model for /batch"""
+    requests: List[BatchSubRequest]
+
+def unlock_wallet(account: str, password: str, session_token: Optional[str] = None) -> Wallet:
+    """
+    Return the unlocked Wallet for an account. A live wallet session for
+    session_token is reused once the password matches the one it was
+    unlocked with; otherwise the stored seed is decrypted with the password.
+    """
+    session = wallet_sessions.get(session_token, account)
+    if session:
+        if not session.check_password(password):
+            logger.error(f"Wrong password for wallet session of account {account}")
+            raise HTTPException(status_code=401, detail="Invalid password")
+        return session.wallet
+
+    wallet_info = storage.get_wallet(account)
+    try:
+        seed = storage.decrypt_private_key(wallet_info["encrypted_key"], password)
+    except ValueError as e:
+        logger.error(f"Failed to decrypt key for account {account}")
+        raise HTTPException(
+            status_code=401, 
+            detail=f"Invalid password: {str(e)}"
+        )
+    return blockchain.create_wallet_from_seed(seed)
+
+class ODVMessageFormatter:
+    """
+    Formats remembrancer messages for the frontend, skipping duplicates.
+    Keeps its deduplication state across calls so it can be fed one message
+    at a time from a stream.
+    """
+
+    def __init__(self, account: str):
+        self.account = account
+        self.seen_keys = set()  # Track message combinations we've already processed
+        self.count = 0
+
+    def format(self, msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Determine direction based on message type
+        is_from_user = msg.get("direction") == "USER_TO_NODE"
+        
+        # Create a more robust deduplication key that combines multiple fields
+        content = msg.get("message", "")
+        timestamp = msg.get("timestamp", 0)
+        
+        # Create a deduplication key that includes content, direction and approximate timestamp
+        # Round timestamp to nearest minute to handle small differences in timestamps
+        minute_timestamp = int(timestamp / 60) * 60 if timestamp else 0
+        dedup_key = f"{content}|{is_from_user}|{minute_timestamp}"
+        
+        # Skip this message if we've already seen an identical one
+        if dedup_key in self.seen_keys:
+            logger.debug(f"Skipping duplicate message: {content[:30]}...")
+            return None
+        self.seen_keys.add(dedup_key)
+        
+        formatted = {
+            "id": msg.get("message_id", "") or f"msg_{self.count}",
+            "from": self.account if is_from_user else REMEMBRANCER_ADDRESS,
+            "to": REMEMBRANCER_ADDRESS if is_from_user else self.account,
+            "content": content,
+            "timestamp": timestamp,
+            "amount_pft": msg.get("amount_pft", 0)
+        }
+        self.count += 1
+        return formatted
+
+async def ndjson_stream(items: AsyncIterator[Any], label: str) -> AsyncIterator[bytes]:
+    """
+    Serialize an async iterator as newline-delimited JSON. Items are pulled from
+    the source only as fast as the client reads the response. Errors after the
+    response has started are reported as a final {"error": ...} line.
+    """
+    try:
+        async for item in items:
+            yield (json.dumps(item, default=str) + "\n").encode()
+    except Exception as e:
+        logger.error(f"Error streaming {label}: {str(e)}", exc_info=True)
+        yield (json.dumps({"error": str(e)}) + "\n").encode()
+
 # Add this function outside of any endpoint
 def generate_custom_id():
     """
@@ -180,11 +286,25 @@ def generate_custom_id():
 def health_check():
     return {"status": "ok"}
 
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Expose server metrics (HTTP and RPC latency, cache hit ratios, refresh lag,
+    in-memory state sizes) in the Prometheus text format.
+    """
+    try:
+        # Nothing is refreshing until TaskStorage has been used
+        if task_storage.initialized:
+            validated_ledger = await blockchain.get_validated_ledger_index()
+            task_storage.record_refresh_lag(validated_ledger)
+    except Exception as e:
+        logger.debug(f"Could not determine refresh lag: {str(e)}")
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @router.get("/balance/{account}")
 async def get_balance(account: str):
     try:
-        xrp_balance = await blockchain.get_xrp_balance(account)
-        pft_balance = await blockchain.get_pft_balance(account)
+        xrp_balance, pft_balance = await blockchain.get_balances(account)
         return {
             "xrp": str(xrp_balance),  # Convert to string for consistent API response
             "pft": str(pft_balance),
@@ -199,6 +319,43 @@ async def get_balance(account: str):
             "status": "unactivated"
         }
 
+async def _warm_up(account: str, user_wallet: Wallet) -> None:
+    """
+    Load what the first screens after sign-in need before the UI asks for it:
+    balances and the task state (recent ledgers first, with remembrancer
+    messages decrypted), then keep the state current with the refresh loop.
+    The task sync also fills the RPC cache that payments and node messages
+    are read from.
+    """
+    results = await asyncio.gather(
+        blockchain.get_balances(account),
+        task_storage.initialize_user_tasks(account, user_wallet),
+        return_exceptions=True
+    )
+    for name, result in zip(("balances", "tasks"), results):
+        if isinstance(result, Exception):
+            logger.warning(f"Sign-in warm-up of {name} failed for {account}: {str(result)}")
+    await task_storage.start_refresh_loop(account, user_wallet)
+    logger.debug(f"Sign-in warm-up finished for {account}")
+
+def _start_warm_up(account: str, user_wallet: Wallet) -> None:
+    _cancel_warm_up(account)
+    task = asyncio.create_task(_warm_up(account, user_wallet), name=f"warm_up:{account}")
+    warmups[account] = task
+
+    def done(t: asyncio.Task) -> None:
+        if warmups.get(account) is t:
+            del warmups[account]
+        if not t.cancelled() and t.exception() is not None:
+            logger.error(f"Sign-in warm-up failed for {account}: {t.exception()}")
+
+    task.add_done_callback(done)
+
+def _cancel_warm_up(account: str) -> None:
+    task = warmups.pop(account, None)
+    if task is not None:
+        task.cancel()
+
 @router.post("/auth/signin")
 async def signin(auth: WalletAuth):
     """
@@ -223,18 +380,46 @@ async def signin(auth: WalletAuth):
         private_key = storage.decrypt_private_key(wallet_data["encrypted_key"], auth.password)
         
         # Verify the private key is valid (will raise if invalid)
-        wallet_info = blockchain.create_wallet_from_secret(private_key)
+        user_wallet = blockchain.create_wallet_from_seed(private_key)
+
+        # Keep the unlocked wallet for subsequent signed requests
+        session_token = wallet_sessions.create(wallet_address, user_wallet, auth.password)
+
+        # Let the account's history be scanned, and start loading it now
+        task_storage.authorize_account(wallet_address)
+        if settings.PREFETCH.get("enabled", True):
+            _start_warm_up(wallet_address, user_wallet)
         
         logger.info(f"User '{auth.username}' signed in with address '{wallet_address}'.")
         return {
             "status": "success", 
             "address": wallet_address,
-            "username": auth.username
+            "username": auth.username,
+            "session_token": session_token
         }
     except ValueError as e:
         logger.warning(f"Sign-in failed for user '{auth.username}': {str(e)}")
         raise HTTPException(status_code=401, detail=str(e))
 
+@router.post("/auth/signout/{account}")
+async def signout(account: str):
+    """
+    Sign an account out: stop loading its data, drop its state, cached keys and
+    unlocked wallet sessions, and require a new sign-in before it's scanned again.
+    """
+    try:
+        _cancel_warm_up(account)
+        task_storage.clear_user_state(account)
+        task_storage.deauthorize_account(account)
+        blockchain.clear_account_keys(account)
+        wallet_sessions.revoke_account(account)
+        odv_services.pop(account, None)
+        logger.info(f"Account '{account}' signed out.")
+        return {"status": "success"}
+    except Exception as e:
+        logger.error(f"Error signing out {account}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/auth/create")
 async def create_account(auth: WalletAuth):
     """
@@ -288,7 +473,9 @@ async def initialize_tasks(account: str):
     try:
         await task_storage.initialize_user_tasks(account)
         logger.info(f"Successfully initialized tasks for account: {account}")
-        return {"status": "success"}
+        return {"status": "success", "history": task_storage.get_sync_status(account)}
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         logger.error(f"Error initializing tasks for {account}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -323,23 +510,47 @@ async def stop_task_refresh(account: str):
         logger.error(f"Error stopping refresh for {account}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _history_headers(account: str) -> Dict[str, str]:
+    """
+    Headers telling the UI how much of the account's history task data covers,
+    so it can show partial results while a progressive sync backfills
+    """
+    sync = task_storage.get_sync_status(account)
+    headers = {"X-History-Complete": "true" if sync["complete"] else "false"}
+    if sync["complete_up_to_ledger"] is not None:
+        headers["X-History-Complete-Up-To-Ledger"] = str(sync["complete_up_to_ledger"])
+    return headers
+
+def _task_fields(fields: Optional[str], include_history: bool):
+    return parse_fields(fields, TASK_FIELDS, exclude=() if include_history else ("message_history",))
+
 @router.get("/tasks/{account}")
-async def get_tasks(account: str, status: Optional[TaskStatusAPI] = None):
+async def get_tasks(
+    account: str,
+    response: Response,
+    status: Optional[TaskStatusAPI] = None,
+    fields: Optional[str] = None,
+    include_history: bool = True
+):
     """
     Get all tasks for an account, optionally filtered by status.
+    fields (comma-separated) and include_history=false limit what is returned per task.
     """
-    logger.debug(f"Received tasks request for account: {account}, status filter: {status}")
+    logger.debug(f"Received tasks request for account: {account}, status filter: {status}, fields: {fields}")
     try:
+        selected = _task_fields(fields, include_history)
+
         # First ensure tasks are initialized
-        if not task_storage._state.node_account:
+        if not task_storage.has_account_state(account):
             logger.debug(f"Account {account} not initialized, initializing now...")
             await task_storage.initialize_user_tasks(account)
         
         # Convert API enum to internal enum if status is provided
         internal_status = TaskStatus[status.name] if status else None
+        response.headers.update(_history_headers(account))
         
         if status:
-            tasks = await task_storage.get_tasks_by_state(account, internal_status)
+            tasks = await task_storage.get_tasks_by_state(account, internal_status, selected)
             
             # Log task structure for the first task to help debug
             if tasks and len(tasks) > 0:
@@ -353,7 +564,7 @@ async def get_tasks(account: str, status: Optional[TaskStatusAPI] = None):
             
             return tasks
         else:
-            sections = await task_storage.get_tasks_by_ui_section(account)
+            sections = await task_storage.get_tasks_by_ui_section(account, selected)
             
             # Log a sample task from each section if available
             for section, section_tasks in sections.items():
@@ -365,10 +576,45 @@ async def get_tasks(account: str, status: Optional[TaskStatusAPI] = None):
             
             return sections
             
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting tasks for {account}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/tasks/{account}/stream")
+async def stream_tasks(
+    account: str,
+    status: Optional[TaskStatusAPI] = None,
+    fields: Optional[str] = None,
+    include_history: bool = True
+):
+    """
+    Stream tasks for an account as NDJSON (one task per line), optionally
+    filtered by status and projected like /tasks/{account}.
+    """
+    logger.debug(f"Received tasks stream request for account: {account}, status filter: {status}")
+    try:
+        selected = _task_fields(fields, include_history)
+        if not task_storage.has_account_state(account):
+            await task_storage.initialize_user_tasks(account)
+        internal_status = TaskStatus[status.name] if status else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error preparing task stream for {account}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        ndjson_stream(task_storage.iter_tasks_by_state(account, internal_status, selected), "tasks"),
+        media_type="application/x-ndjson",
+        headers=_history_headers(account)
+    )
+
 @router.get("/tasks/statuses")
 async def get_task_statuses():
     """
@@ -401,6 +647,76 @@ async def get_account_summary(account: str):
             "account_status": "unactivated"
         }
 
+async def _dashboard_part(name: str, coro, default: Any, errors: Dict[str, str]) -> Any:
+    """Await one part of the dashboard, recording a failure instead of failing the whole response"""
+    try:
+        return await coro
+    except Exception as e:
+        logger.error(f"Error getting dashboard {name}: {str(e)}")
+        errors[name] = str(e)
+        return default
+
+async def _dashboard_account_state(account: str, refresh: bool) -> Dict[str, Any]:
+    """Initialization rite status and task counts, read from one view of the task state"""
+    if refresh or not task_storage.has_account_state(account):
+        await task_storage.initialize_user_tasks(account)
+    # Only the status is needed to count tasks, so skip materializing the rest
+    task_counts = {s.name.lower(): 0 for s in TaskStatus}
+    async for task in task_storage.iter_tasks_by_state(account, fields={"status"}):
+        task_counts[task["status"]] += 1
+    return {
+        "account_status": await task_storage.get_account_status(account),
+        "task_counts": task_counts
+    }
+
+async def _recent_payments(account: str, limit: int) -> List[Dict[str, Any]]:
+    """The latest Payment transactions, excluding those to/from the node address"""
+    if limit <= 0:
+        return []
+    history = await blockchain.get_transaction_history(account, limit=min(limit * 4, 400))
+    payments = [
+        tx for tx in history
+        if tx["type"] == "Payment" and TASK_NODE_ADDRESS not in (tx["sender"], tx["receiver"])
+    ]
+    return payments[:limit]
+
+@router.get("/account/{account}/dashboard")
+async def get_account_dashboard(account: str, payments: int = 10, refresh: bool = False):
+    """
+    Everything the summary page needs in one round trip: balances (in both the
+    /balance and /account/{account}/summary shapes), initiation rite status,
+    task counts per section and recent payments. The parts are fetched
+    concurrently and each balance is fetched once. A part that fails falls
+    back to its default and is reported under "errors".
+
+    Parameters:
+    - payments: Number of recent payments to include (at most 100)
+    - refresh: Re-initialize the task state from the ledger first (default: only if not yet loaded)
+    """
+    logger.debug(f"Received dashboard request for account: {account}")
+    errors: Dict[str, str] = {}
+    # Balances fetched moments ago by the sign-in warm-up are reused
+    balance_max_age = 0 if refresh else settings.PREFETCH.get("balance_max_age", 15)
+    (xrp_balance, pft_balance), account_state, recent_payments = await asyncio.gather(
+        _dashboard_part("balances", blockchain.get_balances(account, balance_max_age), (0.0, 0.0), errors),
+        _dashboard_part(
+            "account_state",
+            _dashboard_account_state(account, refresh),
+            {"account_status": None, "task_counts": {}},
+            errors
+        ),
+        _dashboard_part("recent_payments", _recent_payments(account, min(payments, 100)), [], errors)
+    )
+    activation = "unactivated" if xrp_balance == 0 else "active"
+    return {
+        "account": account,
+        "balance": {"xrp": str(xrp_balance), "pft": str(pft_balance), "status": activation},
+        "summary": {"xrp_balance": float(xrp_balance), "pft_balance": float(pft_balance), "account_status": activation},
+        **account_state,
+        "recent_payments": recent_payments,
+        "errors": errors
+    }
+
 @router.post("/tasks/clear-state/{account}")
 async def clear_user_state(account: str):
     """
@@ -409,30 +725,19 @@ async def clear_user_state(account: str):
     try:
         logger.debug(f"Clearing state for account: {account}")
         task_storage.clear_user_state(account)
+        blockchain.clear_account_keys(account)
         return {"status": "success", "message": f"State cleared for {account}"}
     except Exception as e:
         logger.error(f"Error clearing state for {account}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/transaction/send")
-async def send_user_transaction(request: UserTransactionRequest):
+async def send_user_transaction(request: UserTransactionRequest, x_session_token: Optional[str] = Header(None)):
     logger.debug(f"Received transaction request: {request.tx_type} from {request.account}")
     
     try:
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(request.account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                request.password
-            )
-        except ValueError as e:
-            logger.error(f"Failed to decrypt key for account {request.account}")
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(request.account, request.password, x_session_token)
 
         unsigned_tx = transaction_builder.build_transaction(
             account=request.account,
@@ -442,7 +747,7 @@ async def send_user_transaction(request: UserTransactionRequest):
         
         result = await blockchain.sign_and_send_transaction(
             unsigned_tx=unsigned_tx,
-            seed=seed
+            seed=user_wallet
         )
         
         logger.debug("Transaction sent successfully")
@@ -459,38 +764,57 @@ async def send_user_transaction(request: UserTransactionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/payments/{account}")
-async def get_user_payments_endpoint(account: str):
+async def get_user_payments_endpoint(account: str, fields: Optional[str] = None):
     """
     Fetch all XRP/PFT Payment transactions for an account,
-    excluding those to/from the node address.
+    excluding those to/from the node address. fields (comma-separated)
+    limits what is returned per payment.
     """
     logger.debug(f"Received user payments request for account: {account}")
     try:
-        payments = await task_storage.get_user_payments(account)
+        selected = parse_fields(fields, PAYMENT_FIELDS)
+        payments = await task_storage.get_user_payments(account, fields=selected)
         return {"payments": payments}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting user payments for {account}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/payments/{account}/stream")
+async def stream_user_payments(
+    account: str,
+    start_ledger: Optional[int] = None,
+    end_ledger: Optional[int] = None,
+    fields: Optional[str] = None
+):
+    """
+    Stream XRP/PFT Payment transactions for an account as NDJSON, straight
+    from the transaction stream and excluding those to/from the node address.
+    """
+    logger.debug(f"Received user payments stream request for account: {account}")
+    try:
+        selected = parse_fields(fields, PAYMENT_FIELDS)
+        task_storage.require_authorized(account)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    return StreamingResponse(
+        ndjson_stream(task_storage.iter_user_payments(account, start_ledger, end_ledger, selected), "payments"),
+        media_type="application/x-ndjson"
+    )
+
 @router.post("/transaction/payment")
-async def send_payment(request: PaymentRequest):
+async def send_payment(request: PaymentRequest, x_session_token: Optional[str] = Header(None)):
     """Send a payment transaction (XRP or PFT)"""
     logger.debug(f"Received payment request from {request.from_account} to {request.to_address}")
     
     try:
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(request.from_account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                request.password
-            )
-        except ValueError as e:
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(request.from_account, request.password, x_session_token)
 
         # Build the payment transaction
         unsigned_tx = transaction_builder.build_payment_transaction(
@@ -505,7 +829,7 @@ async def send_payment(request: PaymentRequest):
         # Sign and send the transaction
         result = await blockchain.sign_and_send_transaction(
             unsigned_tx=unsigned_tx,
-            seed=seed
+            seed=user_wallet
         )
         
         return {
@@ -541,12 +865,14 @@ async def get_account_status(account: str, refresh: bool = True):
         # Now get the status with fresh data
         status = await task_storage.get_account_status(account)
         return status
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting account status for {account}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/initiation/full-sequence")
-async def perform_full_initiation_sequence(req: FullSequenceRequest):
+async def perform_full_initiation_sequence(req: FullSequenceRequest, x_session_token: Optional[str] = Header(None)):
     """
     Perform a multi-step on-chain initialization sequence:
     1) Create a trustline for PFT.
@@ -558,15 +884,14 @@ async def perform_full_initiation_sequence(req: FullSequenceRequest):
     try:
         # Decrypt the user's secret key from local storage
         logger.info(f"Fetching wallet info for account: {req.account}")
-        wallet_info = storage.get_wallet(req.account)
-        seed = storage.decrypt_private_key(wallet_info["encrypted_key"], req.password)
+        user_wallet = unlock_wallet(req.account, req.password, x_session_token)
 
         # 1) Build and send the PFT trustline transaction
         logger.info("Building trust line transaction...")
         trust_line_dict = transaction_builder.build_trust_line_transaction(req.account)
         trust_line_tx = TrustSet.from_dict(trust_line_dict)
         logger.info("Signing and sending trust line transaction...")
-        trust_line_result = await blockchain.sign_and_send_trust_set(trust_line_tx, seed)
+        trust_line_result = await blockchain.sign_and_send_trust_set(trust_line_tx, user_wallet)
 
         # 2) Build and send the initiation rite transaction
         logger.info("Building initiation rite transaction...")
@@ -576,7 +901,7 @@ async def perform_full_initiation_sequence(req: FullSequenceRequest):
             username=req.username
         )
         logger.info("Signing and sending initiation rite transaction...")
-        init_rite_result = await blockchain.sign_and_send_transaction(init_rite_tx, seed)
+        init_rite_result = await blockchain.sign_and_send_transaction(init_rite_tx, user_wallet)
 
         # 3) Build and send the handshake transaction to the node
         logger.info("Building handshake to node transaction...")
@@ -586,7 +911,7 @@ async def perform_full_initiation_sequence(req: FullSequenceRequest):
             ecdh_public_key=req.ecdh_public_key
         )
         logger.info("Signing and sending handshake to node transaction...")
-        handshake_node_result = await blockchain.sign_and_send_transaction(handshake_node_tx, seed)
+        handshake_node_result = await blockchain.sign_and_send_transaction(handshake_node_tx, user_wallet)
 
         # 4) Build and send the handshake transaction to the remembrancer
         logger.info("Building handshake to remembrancer transaction...")
@@ -596,13 +921,10 @@ async def perform_full_initiation_sequence(req: FullSequenceRequest):
             ecdh_public_key=req.ecdh_public_key
         )
         logger.info("Signing and sending handshake to remembrancer transaction...")
-        handshake_remembrancer_result = await blockchain.sign_and_send_transaction(handshake_remembrancer_tx, seed)
+        handshake_remembrancer_result = await blockchain.sign_and_send_transaction(handshake_remembrancer_tx, user_wallet)
 
         # 5) Encrypt the Google Doc link and then build and send the transaction
         logger.info("Encrypting and building google doc transaction...")
-        # Create user wallet from seed for encryption
-        user_wallet = blockchain.create_wallet_from_seed(seed)
-        
         # Encrypt the Google Doc link using the node's public key
         encrypted_link = encrypt_memo(
             req.google_doc_link,
@@ -617,7 +939,7 @@ async def perform_full_initiation_sequence(req: FullSequenceRequest):
             use_pft=req.use_pft_for_doc
         )
         logger.info("Signing and sending google doc transaction...")
-        google_doc_result = await blockchain.sign_and_send_transaction(google_doc_tx, seed)
+        google_doc_result = await blockchain.sign_and_send_transaction(google_doc_tx, user_wallet)
 
         # Return the results of all the transactions
         return {
@@ -628,6 +950,8 @@ async def perform_full_initiation_sequence(req: FullSequenceRequest):
             "google_doc_result": google_doc_result
         }
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Invalid request in full initiation sequence: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -636,22 +960,24 @@ async def perform_full_initiation_sequence(req: FullSequenceRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/wallet/ecdhkey")
-async def get_ecdh_key(req: ECDHRequest):
+async def get_ecdh_key(req: ECDHRequest, x_session_token: Optional[str] = Header(None)):
     """
     Retrieve an Ed25519-based ECDH public key from the user's wallet seed.
     """
     try:
         logger.info(f"Retrieving ECDH public key for account: {req.account}")
 
-        # 1) Load and decrypt the wallet's seed from storage
-        wallet_info = storage.get_wallet(req.account)
-        seed = storage.decrypt_private_key(wallet_info["encrypted_key"], req.password)
+        # 1) Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(req.account, req.password, x_session_token)
+        seed = user_wallet.seed
 
         # 2) Call the blockchain method to derive the ECDH public key
-        ecdh_pub_key = blockchain.get_ecdh_public_key_from_seed(seed)
+        ecdh_pub_key = blockchain.get_ecdh_public_key_from_seed(seed, account=req.account)
 
         logger.info(f"Successfully retrieved ECDH public key for {req.account}")
         return {"ecdh_public_key": ecdh_pub_key}
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Error deriving ECDH key for {req.account}: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -663,16 +989,16 @@ async def get_ecdh_key(req: ECDHRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/transaction/pf_log")
-async def send_pf_log_chunked(req: PFLogRequest):
+async def send_pf_log_chunked(req: PFLogRequest, x_session_token: Optional[str] = Header(None)):
     """
     Send a PF log that is encrypted, compressed, and chunked (if necessary),
     using the build_pf_log_chunked_transactions method in transaction.py.
     Then each chunked transaction is signed and submitted via blockchain.py.
     """
     try:
-        # 1) Retrieve and decrypt the user's seed
-        wallet_info = storage.get_wallet(req.account)
-        seed = storage.decrypt_private_key(wallet_info["encrypted_key"], req.password)
+        # 1) Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(req.account, req.password, x_session_token)
+        seed = user_wallet.seed
 
         # 2) Build all chunked transaction dictionaries
         tx_dicts = transaction_builder.build_pf_log_chunked_transactions(
@@ -689,7 +1015,7 @@ async def send_pf_log_chunked(req: PFLogRequest):
         # 3) Sign & send each transaction
         results = []
         for unsigned_tx in tx_dicts:
-            result = await blockchain.sign_and_send_transaction(unsigned_tx, seed)
+            result = await blockchain.sign_and_send_transaction(unsigned_tx, user_wallet)
             results.append(result)
 
         return {
@@ -733,28 +1059,13 @@ async def get_wallet_seed(req: SeedRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/odv/send_message")
-async def send_odv_message(request: ODVMessageRequest):
+async def send_odv_message(request: ODVMessageRequest, x_session_token: Optional[str] = Header(None)):
     """
     Send a message to the ODV node using the SDK's encoding and encryption
     """
     try:
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(request.account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                request.password
-            )
-        except ValueError as e:
-            logger.error(f"Failed to decrypt key for account {request.account}")
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
-            
-        # Create user wallet from seed
-        user_wallet = blockchain.create_wallet_from_seed(seed)
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(request.account, request.password, x_session_token)
         logger.debug(f"Created wallet for {request.account}, address: {user_wallet.classic_address}")
         
         # Generate a custom message ID if not provided
@@ -790,7 +1101,8 @@ async def send_odv_message(request: ODVMessageRequest):
         # Use RpcSender to submit each transaction
         results = []
         for tx in encoded_txns:
-            result = await blockchain.rpc_sender.submit_and_wait(tx, user_wallet)
+            with RPC_REQUEST_SECONDS.time(client="rpc_sender", method="submit_and_wait"):
+                result = await blockchain.rpc_sender.submit_and_wait(tx, user_wallet)
             results.append(result.result)
             
         return {
@@ -804,28 +1116,21 @@ async def send_odv_message(request: ODVMessageRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/odv/messages/{account}")
-async def decrypt_odv_messages(account: str, request: DecryptMessagesRequest):
+async def decrypt_odv_messages(
+    account: str,
+    request: DecryptMessagesRequest,
+    fields: Optional[str] = None,
+    x_session_token: Optional[str] = Header(None)
+):
     """
-    Get all messages between the user and ODV node, with decryption support
+    Get all messages between the user and ODV node, with decryption support.
+    fields (comma-separated) limits what is returned per message.
     """
     try:
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                request.password
-            )
-        except ValueError as e:
-            logger.error(f"Failed to decrypt key for account {account}")
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
-            
-        # Create user wallet from seed
-        user_wallet = blockchain.create_wallet_from_seed(seed)
+        selected = parse_fields(fields, MESSAGE_FIELDS)
+
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(account, request.password, x_session_token)
         logger.debug(f"Created wallet for {account}, will use for message decryption")
         
         # Force refresh of blockchain data if requested in the request
@@ -842,39 +1147,8 @@ async def decrypt_odv_messages(account: str, request: DecryptMessagesRequest):
         logger.debug(f"Retrieved {len(messages)} raw messages before deduplication")
         
         # Format the messages for the frontend
-        formatted_messages = []
-        seen_keys = set()  # Track message combinations we've already processed
-        
-        for msg in messages:
-            # Determine direction based on message type
-            is_from_user = msg.get("direction") == "USER_TO_NODE"
-            
-            # Create a more robust deduplication key that combines multiple fields
-            msg_id = msg.get("message_id", "")
-            content = msg.get("message", "")
-            timestamp = msg.get("timestamp", 0)
-            
-            # Create a deduplication key that includes content, direction and approximate timestamp
-            # Round timestamp to nearest minute to handle small differences in timestamps
-            minute_timestamp = int(timestamp / 60) * 60 if timestamp else 0
-            dedup_key = f"{content}|{is_from_user}|{minute_timestamp}"
-            
-            # Skip this message if we've already seen an identical one
-            if dedup_key in seen_keys:
-                logger.debug(f"Skipping duplicate message: {content[:30]}...")
-                continue
-                
-            # Add key to seen set
-            seen_keys.add(dedup_key)
-            
-            formatted_messages.append({
-                "id": msg_id or f"msg_{len(formatted_messages)}",
-                "from": account if is_from_user else REMEMBRANCER_ADDRESS,
-                "to": REMEMBRANCER_ADDRESS if is_from_user else account,
-                "content": content,
-                "timestamp": timestamp,
-                "amount_pft": msg.get("amount_pft", 0)
-            })
+        formatter = ODVMessageFormatter(account)
+        formatted_messages = [m for m in map(formatter.format, messages) if m is not None]
         
         logger.debug(f"After deduplication: {len(formatted_messages)} messages")
         
@@ -883,58 +1157,36 @@ async def decrypt_odv_messages(account: str, request: DecryptMessagesRequest):
         
         return {
             "status": "success",
-            "messages": formatted_messages
+            "messages": [project(m, selected) for m in formatted_messages]
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting ODV messages: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-# Apply the same improved deduplication logic to the GET endpoint
 @router.get("/odv/messages/{account}")
-async def get_odv_messages(account: str):
+async def get_odv_messages(account: str, fields: Optional[str] = None):
     """
-    Get all messages between the user and ODV node (without decryption)
+    Get all messages between the user and ODV node (without decryption).
+    fields (comma-separated) limits what is returned per message.
     """
     try:
+        selected = parse_fields(fields, MESSAGE_FIELDS)
+
         # Get messages from task storage - these are already decoded
         messages = await task_storage.get_user_node_messages(account, REMEMBRANCER_ADDRESS)
         
         logger.debug(f"Retrieved {len(messages)} raw messages before deduplication")
         
         # Format the messages for the frontend with improved deduplication
-        formatted_messages = []
-        seen_keys = set()  # Track message combinations we've already processed
-        
-        for msg in messages:
-            # Determine direction based on message type
-            is_from_user = msg.get("direction") == "USER_TO_NODE"
-            
-            # Create a more robust deduplication key that combines multiple fields
-            content = msg.get("message", "")
-            timestamp = msg.get("timestamp", 0)
-            
-            # Create a deduplication key that includes content, direction and approximate timestamp
-            # Round timestamp to nearest minute to handle small differences in timestamps
-            minute_timestamp = int(timestamp / 60) * 60 if timestamp else 0
-            dedup_key = f"{content}|{is_from_user}|{minute_timestamp}"
-            
-            # Skip this message if we've already seen an identical one
-            if dedup_key in seen_keys:
-                logger.debug(f"Skipping duplicate message: {content[:30]}...")
-                continue
-                
-            # Add key to seen set
-            seen_keys.add(dedup_key)
-            
-            formatted_messages.append({
-                "id": msg.get("message_id", "") or f"msg_{len(formatted_messages)}",
-                "from": account if is_from_user else REMEMBRANCER_ADDRESS,
-                "to": REMEMBRANCER_ADDRESS if is_from_user else account,
-                "content": content,
-                "timestamp": timestamp,
-                "amount_pft": msg.get("amount_pft", 0)
-            })
+        formatter = ODVMessageFormatter(account)
+        formatted_messages = [m for m in map(formatter.format, messages) if m is not None]
         
         logger.debug(f"After deduplication: {len(formatted_messages)} messages")
         
@@ -943,37 +1195,92 @@ async def get_odv_messages(account: str):
         
         return {
             "status": "success",
-            "messages": formatted_messages
+            "messages": [project(m, selected) for m in formatted_messages]
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting ODV messages: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _formatted_odv_stream(
+    account: str,
+    user_wallet: Optional[Wallet] = None,
+    fields: Optional[AbstractSet[str]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield deduplicated, frontend-formatted ODV messages in ledger order"""
+    formatter = ODVMessageFormatter(account)
+    async for msg in task_storage.iter_user_node_messages(
+        user_account=account,
+        node_account=REMEMBRANCER_ADDRESS,
+        user_wallet=user_wallet
+    ):
+        formatted = formatter.format(msg)
+        if formatted is not None:
+            yield project(formatted, fields)
+
+@router.get("/odv/messages/{account}/stream")
+async def stream_odv_messages(account: str, fields: Optional[str] = None):
+    """
+    Stream messages between the user and ODV node as NDJSON (without decryption)
+    """
+    try:
+        selected = parse_fields(fields, MESSAGE_FIELDS)
+        task_storage.require_authorized(account)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    return StreamingResponse(
+        ndjson_stream(_formatted_odv_stream(account, fields=selected), "ODV messages"),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/odv/messages/{account}/stream")
+async def stream_decrypted_odv_messages(
+    account: str,
+    request: DecryptMessagesRequest,
+    fields: Optional[str] = None,
+    x_session_token: Optional[str] = Header(None)
+):
+    """
+    Stream messages between the user and ODV node as NDJSON, with decryption support
+    """
+    try:
+        selected = parse_fields(fields, MESSAGE_FIELDS)
+        task_storage.require_authorized(account)
+        user_wallet = unlock_wallet(account, request.password, x_session_token)
+        if request.refresh:
+            await task_storage.initialize_user_tasks(account, user_wallet)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error preparing ODV message stream: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        ndjson_stream(_formatted_odv_stream(account, user_wallet, selected), "ODV messages"),
+        media_type="application/x-ndjson"
+    )
+
 @router.post("/odv/send_log")
-async def send_log_entry(request: LoggingRequest):
+async def send_log_entry(request: LoggingRequest, x_session_token: Optional[str] = Header(None)):
     """
     Send a logging entry to the Remembrancer node using the SDK's encoding and encryption.
     This is a one-way message that doesn't expect a response.
     """
     try:
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(request.account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                request.password
-            )
-        except ValueError as e:
-            logger.error(f"Failed to decrypt key for account {request.account}")
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
-            
-        # Create user wallet from seed
-        user_wallet = blockchain.create_wallet_from_seed(seed)
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(request.account, request.password, x_session_token)
         logger.debug(f"Created wallet for {request.account}, address: {user_wallet.classic_address}")
         
         # Create a log ID if not provided
@@ -1005,7 +1312,7 @@ async def send_log_entry(request: LoggingRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/decrypt/doc_link")
-async def decrypt_document_link(request: DecryptDocLinkRequest):
+async def decrypt_document_link(request: DecryptDocLinkRequest, x_session_token: Optional[str] = Header(None)):
     """
     Decrypt a document link that starts with WHISPER__
     """
@@ -1020,23 +1327,8 @@ async def decrypt_document_link(request: DecryptDocLinkRequest):
         if not encrypted_link.startswith('WHISPER__'):
             return {"status": "success", "link": request.encrypted_link}
             
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(request.account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                request.password
-            )
-        except ValueError as e:
-            logger.error(f"Failed to decrypt key for account {request.account}")
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
-            
-        # Create user wallet from seed
-        user_wallet = blockchain.create_wallet_from_seed(seed)
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(request.account, request.password, x_session_token)
         
         # Use the actual node pubkey for decryption
         node_pubkey = TASK_NODE_PUBKEY
@@ -1058,29 +1350,18 @@ async def decrypt_document_link(request: DecryptDocLinkRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/transaction/handshake_node")
-async def send_handshake_to_node(req: HandshakeRequest):
+async def send_handshake_to_node(req: HandshakeRequest, x_session_token: Optional[str] = Header(None)):
     """
     Send a handshake transaction to the node.
     This establishes encrypted communication with the task node.
     """
     try:
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(req.account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                req.password
-            )
-        except ValueError as e:
-            logger.error(f"Failed to decrypt key for account {req.account}")
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(req.account, req.password, x_session_token)
+        seed = user_wallet.seed
 
         # Derive ECDH public key from seed instead of using the one from request
-        ecdh_pub_key = blockchain.get_ecdh_public_key_from_seed(seed)
+        ecdh_pub_key = blockchain.get_ecdh_public_key_from_seed(seed, account=req.account)
 
         # Build the handshake transaction to the node
         handshake_tx = transaction_builder.build_handshake_transaction(
@@ -1090,7 +1371,7 @@ async def send_handshake_to_node(req: HandshakeRequest):
         )
         
         # Sign and send the transaction
-        result = await blockchain.sign_and_send_transaction(handshake_tx, seed)
+        result = await blockchain.sign_and_send_transaction(handshake_tx, user_wallet)
         
         return {
             "status": "success",
@@ -1105,29 +1386,18 @@ async def send_handshake_to_node(req: HandshakeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/transaction/handshake_remembrancer")
-async def send_handshake_to_remembrancer(req: HandshakeRequest):
+async def send_handshake_to_remembrancer(req: HandshakeRequest, x_session_token: Optional[str] = Header(None)):
     """
     Send a handshake transaction to the remembrancer.
     This establishes encrypted communication with the remembrancer node.
     """
     try:
-        # Get wallet info and decrypt the seed
-        wallet_info = storage.get_wallet(req.account)
-        
-        try:
-            seed = storage.decrypt_private_key(
-                wallet_info["encrypted_key"], 
-                req.password
-            )
-        except ValueError as e:
-            logger.error(f"Failed to decrypt key for account {req.account}")
-            raise HTTPException(
-                status_code=401, 
-                detail=f"Invalid password: {str(e)}"
-            )
+        # Unlock the wallet, reusing the wallet session when possible
+        user_wallet = unlock_wallet(req.account, req.password, x_session_token)
+        seed = user_wallet.seed
 
         # Derive ECDH public key from seed instead of using the one from request
-        ecdh_pub_key = blockchain.get_ecdh_public_key_from_seed(seed)
+        ecdh_pub_key = blockchain.get_ecdh_public_key_from_seed(seed, account=req.account)
 
         # Build the handshake transaction to the remembrancer
         handshake_tx = transaction_builder.build_handshake_transaction(
@@ -1137,7 +1407,7 @@ async def send_handshake_to_remembrancer(req: HandshakeRequest):
         )
         
         # Sign and send the transaction
-        result = await blockchain.sign_and_send_transaction(handshake_tx, seed)
+        result = await blockchain.sign_and_send_transaction(handshake_tx, user_wallet)
         
         return {
             "status": "success",
@@ -1151,26 +1421,133 @@ async def send_handshake_to_remembrancer(req: HandshakeRequest):
         logger.error(f"Error sending handshake to remembrancer: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-# Mount the router under /api
-logger.info("Registering API routes...")
-app.include_router(router, prefix="/api")
-logger.info("API routes registered")
+MAX_BATCH_REQUESTS = 50
+
+# Routes that load the account's task state on first use; a batch loads it
+# once up front instead of letting each sub-request race to do it
+TASK_STATE_ROUTES = {
+    "/api/tasks/{account}",
+    "/api/account/{account}/dashboard",
+}
+
+def _preload_task_state(template: str, path_params: Dict[str, Any]):
+    account = path_params.get("account")
+    if template in TASK_STATE_ROUTES and account and not task_storage.has_account_state(account):
+        return ("task_state", account), lambda: task_storage.initialize_user_tasks(account)
+    return None
+
+@router.post("/batch")
+async def batch(request: Request, body: BatchRequest):
+    """
+    Run several read-only GET requests against this API in one round trip.
+    Sub-requests run concurrently and share balance lookups and task state
+    loads; identical paths run once. Responses come back in request order as
+    {"id", "path", "status", "body"}; a failing sub-request does not fail
+    the batch.
+    """
+    try:
+        if len(body.requests) > MAX_BATCH_REQUESTS:
+            raise ValueError(f"At most {MAX_BATCH_REQUESTS} requests per batch")
+        for sub in body.requests:
+            path = sub.path.split("?", 1)[0]
+            if not path.startswith("/api/") or path.rstrip("/") == "/api/batch" or path.endswith("/stream"):
+                raise ValueError(f"Unsupported batch path: {sub.path}")
+
+        with shared_calls():
+            results = await run_batch(
+                request.app,
+                request.scope,
+                [sub.path for sub in body.requests],
+                preload=_preload_task_state
+            )
+        return {
+            "responses": [
+                {"id": sub.id, "path": sub.path, "status": status, "body": result}
+                for sub, (status, result) in zip(body.requests, results)
+            ]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running batch: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/debug/ingestion")
+async def get_ingestion_stats(account: Optional[str] = None):
+    """
+    Per-stage timings (wall/CPU time, throughput, queue depth) of the most recent
+    ingestion runs: initialization, refresh ticks and message history reads.
+    Optionally limited to a single account.
+    """
+    runs = task_storage.ingestion_stats.runs(account)
+    return {
+        "status": "success",
+        "runs": [run.to_dict() for run in runs]
+    }
 
-@app.on_event("startup")
-async def startup_event():
+@router.get("/debug/loop")
+async def get_loop_stalls():
     """
-    On startup, log the routes for debugging.
+    Recent event loop stalls: how long the loop was blocked, the route or
+    background task that was running and the loop thread's stack at the time.
     """
-    routes = [{"path": route.path, "name": route.name, "methods": list(route.methods)} 
-              for route in app.routes]
-    logger.info(f"Registered routes: {routes}")
+    return {
+        "status": "success",
+        **loop_monitor.snapshot()
+    }
+
+sampling_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
 
-@app.options("/{full_path:path}")
-async def options_handler():
+def require_profiling() -> None:
+    """Profiling endpoints are hidden unless DEBUG_TOOLS.profiling is enabled"""
+    if not settings.DEBUG_TOOLS.get("profiling", False):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@router.post("/debug/profile/start")
+async def start_profile(interval: float = 0.005, max_seconds: float = 300):
     """
-    Handle OPTIONS requests for all routes (CORS preflight).
+    Start the sampling profiler. It stops on its own after max_seconds;
+    fetch the result with /debug/profile/stop.
     """
-    return {"detail": "OK"}
+    require_profiling()
+    try:
+        sampling_profiler.start(interval=max(interval, 0.001), max_seconds=max_seconds)
+        return {"status": "success", **sampling_profiler.status()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/debug/profile/stop")
+async def stop_profile():
+    """Stop the sampling profiler and return its collapsed stacks (flamegraph.pl / speedscope input)"""
+    require_profiling()
+    try:
+        if sampling_profiler.running:
+            collapsed = sampling_profiler.stop()
+        else:
+            collapsed = sampling_profiler.collapsed()
+        return Response(content=collapsed, media_type="text/plain; charset=utf-8")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/debug/profile")
+async def get_profile_status():
+    require_profiling()
+    return {"status": "success", **sampling_profiler.status()}
+
+@router.get("/debug/memory")
+async def get_memory_snapshot(top: int = 20, compare: bool = False):
+    """
+    tracemalloc snapshot of live allocations, grouped by subsystem (caches,
+    user_state, message_logs, xrpl, web, other), with the largest allocation
+    sites. With compare=true, also reports growth since the previous call.
+    """
+    require_profiling()
+    try:
+        memory_profiler.start(settings.DEBUG_TOOLS.get("tracemalloc_frames", 25))
+        return {"status": "success", **memory_profiler.snapshot(top=top, compare=compare)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/debug/reset")
 async def reset_server_state():
@@ -1191,6 +1568,10 @@ async def reset_server_state():
                     await asyncio.shield(task)
                 except asyncio.CancelledError:
                     pass  # Expected when cancelling
+        for address in list(task_storage._history_tasks):
+            task_storage.stop_history_backfill(address)
+        for address in list(warmups):
+            _cancel_warm_up(address)
         
         # 2. Clear all data structures
         logger.info("Clearing all server-side state")
@@ -1209,14 +1590,16 @@ async def reset_server_state():
         # 4. Clear ODV services
         global odv_services
         odv_services = {}
+
+        # 5. Drop cached key material and unlocked wallet sessions, and
+        # require a new sign-in before any account is scanned again
+        blockchain.key_cache.clear()
+        wallet_sessions.clear()
+        for address in set(task_storage.authorized_accounts) | set(storage.load_signed_in_accounts()):
+            task_storage.deauthorize_account(address)
         
         logger.info("Server state reset complete")
         return {"status": "success", "message": "Complete server state reset successful"}
     except Exception as e:
         logger.error(f"Error during server reset: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-
-# Mount the router under /api
-logger.info("Registering API routes...")
-app.include_router(router, prefix="/api")
-logger.info("API routes registered")
\ No newline at end of file
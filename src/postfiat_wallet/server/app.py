@@ -1,13 +1,55 @@
 import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from importlib import resources
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from postfiat_wallet.server.api import router as api_router  # Adjust the import if your API router is defined elsewhere
+from postfiat_wallet.server.static import PrecompressedStaticFiles, prepare_static_files
+from postfiat_wallet.server.api import router as api_router, memory_profiler, task_storage  # Adjust the import if your API router is defined elsewhere
 from postfiat_wallet.services.storage import init_storage
+from postfiat_wallet.utils.metrics import HTTP_REQUEST_SECONDS
+from postfiat_wallet.utils.loop_monitor import loop_monitor, CURRENT_ACTIVITY
+from postfiat_wallet.utils.updater import background_update_check
+from postfiat_wallet.config import settings
 
-def create_app():
-    app = FastAPI(title="Post Fiat Wallet API")
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background monitors on startup; stop them and any services that were used on shutdown"""
+    if settings.LOOP_MONITOR.get("enabled", True):
+        loop_monitor.start()
+    logger.debug(f"Registered routes: {[getattr(r, 'path', r) for r in app.routes]}")
+    background = []
+    static_files = app.state.static_files
+    if static_files is not None:
+        background.append(asyncio.create_task(prepare_static_files(static_files)))
+    # Update checks run in the background so they never delay startup
+    if app.state.check_updates:
+        on_ui_update = static_files.refresh if static_files is not None else None
+        background.append(asyncio.create_task(background_update_check(
+            install_ui=app.state.update_ui, on_ui_update=on_ui_update
+        )))
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        loop_monitor.stop()
+        if task_storage.initialized:
+            for wallet_address in list(task_storage._refresh_tasks):
+                task_storage.stop_refresh_loop(wallet_address)
+            for wallet_address in list(task_storage._history_tasks):
+                task_storage.stop_history_backfill(wallet_address)
+            task_storage.decode_pool.shutdown()
+
+def create_app(check_updates: bool = False, update_ui: bool = False):
+    app = FastAPI(title="Post Fiat Wallet API", lifespan=lifespan)
+    app.state.check_updates = check_updates
+    app.state.update_ui = update_ui
+    app.state.static_files = None
     
     # Configure CORS for development
     origins = [
@@ -21,15 +63,42 @@ def create_app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-History-Complete", "X-History-Complete-Up-To-Ledger"],
     )
     
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        # Label by route template rather than raw path to keep label cardinality bounded
+        start = time.perf_counter()
+        status_code = 500
+        # The loop monitor reads the scope to attribute stalls to this route
+        CURRENT_ACTIVITY.set(request.scope)
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code)
+            )
+    
     app.include_router(api_router, prefix="/api")
+
+    if settings.DEBUG_TOOLS.get("profiling", False):
+        # Trace allocations from startup so /api/debug/memory sees long-lived state
+        memory_profiler.start(settings.DEBUG_TOOLS.get("tracemalloc_frames", 25))
     
     # Only serve static files when not in development mode
     if not os.getenv("POSTFIAT_DEV"):
         static_dir = resources.files('postfiat_wallet').joinpath('static')
         if static_dir.exists():
-            app.mount("/", StaticFiles(directory=static_dir, html=True), name="static")
+            # Serves precompressed variants with long-lived caching for hashed assets
+            app.state.static_files = PrecompressedStaticFiles(directory=static_dir, html=True)
+            app.mount("/", app.state.static_files, name="static")
         else:
             print(f"Static directory '{static_dir}' not found. UI will not be available.")
 
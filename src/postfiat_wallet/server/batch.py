@@ -0,0 +1,138 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlsplit
+from starlette.applications import Starlette
+from starlette.routing import Match
+from starlette.types import Message, Scope
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SubResponse:
+    """The collected response to one in-process sub-request"""
+
+    def __init__(self):
+        self.status = 500
+        self.content_type = ""
+        self.body = bytearray()
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    self.content_type = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            self.body.extend(message.get("body", b""))
+
+    def decoded_body(self) -> Any:
+        if "json" in self.content_type:
+            try:
+                return json.loads(self.body)
+            except ValueError:
+                pass
+        return self.body.decode("utf-8", errors="replace")
+
+def sub_request_scope(parent: Scope, path: str) -> Scope:
+    """
+    Build the scope for a GET against this app, carrying over the parent's
+    connection details and session token. Sub-responses are always plain,
+    uncompressed JSON; the batch response as a whole is negotiated.
+    """
+    url = urlsplit(path)
+    headers = [(b"accept", b"application/json")]
+    headers += [(k, v) for k, v in parent.get("headers", []) if k.lower() in (b"host", b"x-session-token")]
+    return {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": parent.get("scheme", "http"),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "root_path": parent.get("root_path", ""),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "client": parent.get("client"),
+        "server": parent.get("server"),
+        "state": dict(parent.get("state", {})),
+    }
+
+def match_route(app: Starlette, scope: Scope) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Return the route template and path parameters the scope would be dispatched to"""
+    for route in app.router.routes:
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None), child_scope.get("path_params", {})
+    return None, {}
+
+Preload = Callable[[str, Dict[str, Any]], Optional[Tuple[Hashable, Callable[[], Awaitable[Any]]]]]
+
+async def run_batch(
+    app: Starlette,
+    parent: Scope,
+    paths: List[str],
+    preload: Optional[Preload] = None,
+) -> List[Tuple[int, Any]]:
+    """
+    Dispatch GET sub-requests to the app concurrently, in-process, and return
+    (status, body) for each, in order.
+
+    Identical paths are dispatched once and share a response. Before the
+    fan-out, preload is called with each sub-request's route template and
+    path parameters and may return a (key, factory) pair; one factory per
+    distinct key is awaited first, e.g. to load an account's task state once
+    for several routes that would each load it.
+
+    Args:
+        app: The FastAPI app the sub-requests are dispatched to
+        parent: Scope of the batch request
+        paths: Sub-request paths, including the /api prefix and any query string
+        preload: Optional hook naming shared work to finish before dispatching
+
+    Returns:
+        (status code, decoded body) per path
+    """
+    scopes: Dict[str, Scope] = {path: sub_request_scope(parent, path) for path in paths}
+
+    if preload is not None:
+        loads: Dict[Hashable, Callable[[], Awaitable[Any]]] = {}
+        for scope in scopes.values():
+            template, path_params = match_route(app, scope)
+            load = preload(template, path_params) if template else None
+            if load is not None:
+                loads.setdefault(*load)
+        results = await asyncio.gather(*(factory() for factory in loads.values()), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                # The sub-requests themselves will retry and report it
+                logger.debug(f"Batch preload failed: {result}")
+
+    async def dispatch(scope: Scope) -> SubResponse:
+        response = SubResponse()
+        requested = False
+
+        async def receive() -> Message:
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Like a client that stays connected until the response is sent
+            await asyncio.Event().wait()
+
+        await app(scope, receive, response.send)
+        return response
+
+    unique = {path: asyncio.ensure_future(dispatch(scope)) for path, scope in scopes.items()}
+    await asyncio.gather(*unique.values(), return_exceptions=True)
+
+    results = []
+    for path in paths:
+        future = unique[path]
+        if future.exception() is not None:
+            logger.error(f"Batch sub-request {path} failed: {future.exception()}")
+            results.append((500, {"detail": str(future.exception())}))
+        else:
+            results.append((future.result().status, future.result().decoded_body()))
+    return results
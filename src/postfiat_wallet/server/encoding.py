@@ -0,0 +1,126 @@
+import gzip
+import json
+import logging
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Mapping, Optional
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from postfiat_wallet.server.static import parse_qvalues
+from postfiat_wallet.config import settings
+
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is then never offered
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # gzip is still used without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/vnd.msgpack", "application/x-msgpack")
+
+# Headers of the request being answered, set by NegotiatedRoute so the
+# response class can negotiate without access to the request
+_REQUEST_HEADERS: ContextVar[Optional[Headers]] = ContextVar("postfiat_request_headers", default=None)
+
+def dumps_json(content: Any) -> bytes:
+    """Compact JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+def dumps_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, use_bin_type=True, default=str)
+
+def choose_media_type(accept: str) -> str:
+    """Return the MessagePack type the client prefers over JSON, if any, else JSON"""
+    if msgpack is None or not accept or not settings.API_ENCODING.get("msgpack", True):
+        return JSON_MEDIA_TYPE
+    accepted = parse_qvalues(accept)
+    best = max(MSGPACK_MEDIA_TYPES, key=lambda t: accepted.get(t, 0))
+    if accepted.get(best, 0) > 0 and accepted.get(best, 0) >= accepted.get(JSON_MEDIA_TYPE, 0):
+        return best
+    return JSON_MEDIA_TYPE
+
+def choose_coding(accept_encoding: str) -> Optional[str]:
+    """Pick brotli, then gzip, from an Accept-Encoding header"""
+    accepted = parse_qvalues(accept_encoding)
+    wildcard = accepted.get("*", 0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+def compress(body: bytes, coding: str) -> bytes:
+    # Levels favour speed: responses are compressed per request on the event loop
+    if coding == "br":
+        return brotli.compress(body, quality=settings.API_ENCODING.get("brotli_quality", 4))
+    return gzip.compress(body, compresslevel=settings.API_ENCODING.get("gzip_level", 6), mtime=0)
+
+class NegotiatedResponse(Response):
+    """
+    Default response class for the /api router. Renders JSON, or MessagePack
+    when the Accept header prefers it, and compresses bodies of at least
+    API_ENCODING.compress_min_size bytes with brotli or gzip per
+    Accept-Encoding.
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        request_headers = _REQUEST_HEADERS.get()
+        if media_type is None and request_headers is not None:
+            media_type = choose_media_type(request_headers.get("accept", ""))
+        super().__init__(content, status_code, headers, media_type, background)
+        if request_headers is None:
+            return
+
+        self.headers["vary"] = "Accept, Accept-Encoding"
+        if len(self.body) < settings.API_ENCODING.get("compress_min_size", 1024):
+            return
+        coding = choose_coding(request_headers.get("accept-encoding", ""))
+        if coding is not None:
+            self.body = compress(self.body, coding)
+            self.headers["content-encoding"] = coding
+            self.headers["content-length"] = str(len(self.body))
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type in MSGPACK_MEDIA_TYPES:
+            return dumps_msgpack(content)
+        return dumps_json(content)
+
+class NegotiatedRoute(APIRoute):
+    """APIRoute that makes the request headers visible to NegotiatedResponse"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request: Request) -> Response:
+            token = _REQUEST_HEADERS.set(request.headers)
+            try:
+                return await handler(request)
+            finally:
+                _REQUEST_HEADERS.reset(token)
+
+        return negotiated_handler
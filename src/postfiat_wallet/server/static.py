@@ -0,0 +1,188 @@
+import os
+import re
+import hashlib
+import logging
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from postfiat_wallet.utils.precompress import VARIANT_SUFFIXES, precompress_directory
+
+logger = logging.getLogger(__name__)
+
+# Next.js content-hashes everything under _next/static, and other bundlers put
+# a hex hash in the file name; these never change in place
+HASHED_NAME = re.compile(r"[.-][0-9a-f]{8,}(?:-s)?(?:\.p)?\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+class _Variant(NamedTuple):
+    path: str
+    stat: os.stat_result
+    etag: str
+
+class _StaticEntry(NamedTuple):
+    media_type: str
+    immutable: bool
+    variants: Dict[Optional[str], _Variant]  # keyed by content coding, None = identity
+
+def _etag(stat: os.stat_result, coding: Optional[str]) -> str:
+    tag = hashlib.md5(f"{stat.st_mtime_ns}-{stat.st_size}".encode()).hexdigest()
+    return f'"{tag}-{coding}"' if coding else f'"{tag}"'
+
+def parse_qvalues(header: str) -> Dict[str, float]:
+    """Parse an Accept or Accept-Encoding header into {value: q}"""
+    codings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            codings[name.lower()] = q
+    return codings
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves build-time .br/.gz variants chosen by
+    Accept-Encoding, marks content-hashed assets immutable, and revalidates
+    everything else with ETags.
+
+    File metadata is read once into memory instead of stat'ing on every
+    request; call refresh() after the files on disk change.
+    """
+
+    def __init__(self, *, directory: str | os.PathLike, html: bool = False):
+        super().__init__(directory=directory, html=html)
+        self.root = Path(directory)
+        self._entries: Dict[str, _StaticEntry] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Rescan the directory and rebuild the metadata cache"""
+        entries: Dict[str, _StaticEntry] = {}
+        for path in self.root.rglob("*"):
+            if not path.is_file():
+                continue
+            coding = next((c for c, s in VARIANT_SUFFIXES.items() if path.name.endswith(s)), None)
+            original = path.with_name(path.name[:-len(VARIANT_SUFFIXES[coding])]) if coding else path
+            relative = original.relative_to(self.root).as_posix()
+            if coding and not original.is_file():
+                # A plain .gz/.br asset rather than a variant of one
+                coding, original, relative = None, path, path.relative_to(self.root).as_posix()
+
+            stat = path.stat()
+            entry = entries.get(relative)
+            if entry is None:
+                media_type = mimetypes.guess_type(original.name)[0] or "application/octet-stream"
+                immutable = relative.startswith("_next/static/") or bool(HASHED_NAME.search(original.name))
+                entry = entries[relative] = _StaticEntry(media_type, immutable, {})
+            entry.variants[coding] = _Variant(str(path), stat, _etag(stat, coding))
+
+        # A variant older than its file was built from a previous version of it
+        for relative, entry in entries.items():
+            identity = entry.variants.get(None)
+            if identity is None:
+                continue
+            for coding, variant in list(entry.variants.items()):
+                if coding and variant.stat.st_mtime_ns < identity.stat.st_mtime_ns:
+                    logger.debug(f"Not serving stale {coding} variant of {relative}")
+                    del entry.variants[coding]
+
+        with self._lock:
+            self._entries = entries
+        logger.debug(f"Indexed {len(entries)} static files in {self.root}")
+
+    def _lookup(self, path: str) -> Tuple[Optional[str], Optional[_StaticEntry]]:
+        # get_path() hands us an OS-normalized path, "." for the mount root
+        path = path.replace(os.sep, "/").strip("/")
+        if path == ".":
+            path = ""
+        candidates: List[str] = [path] if path else []
+        if self.html:
+            candidates.append(f"{path}/index.html" if path else "index.html")
+        for candidate in candidates:
+            entry = self._entries.get(candidate)
+            if entry is not None:
+                return candidate, entry
+        return None, None
+
+    def _response(self, entry: _StaticEntry, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        accepted = parse_qvalues(request_headers.get("accept-encoding", ""))
+
+        coding = None
+        for candidate in ("br", "gzip"):
+            if candidate in entry.variants and accepted.get(candidate, 0) > 0:
+                coding = candidate
+                break
+        variant = entry.variants.get(coding) or entry.variants.get(None)
+        if variant is None:
+            raise HTTPException(status_code=404)
+
+        headers = {
+            "etag": variant.etag,
+            "cache-control": IMMUTABLE_CACHE_CONTROL if entry.immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if len(entry.variants) > 1:
+            headers["vary"] = "Accept-Encoding"
+        if coding:
+            headers["content-encoding"] = coding
+
+        if status_code == 200:
+            if_none_match = request_headers.get("if-none-match")
+            if if_none_match and variant.etag in [t.strip() for t in if_none_match.split(",")]:
+                return Response(status_code=304, headers=headers)
+
+        return FileResponse(
+            variant.path,
+            status_code=status_code,
+            headers=headers,
+            media_type=entry.media_type,
+            stat_result=variant.stat,
+        )
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        _, entry = self._lookup(path)
+        if entry is not None:
+            return self._response(entry, scope)
+
+        if self.html:
+            not_found = self._entries.get("404.html")
+            if not_found is not None:
+                return self._response(not_found, scope, status_code=404)
+        raise HTTPException(status_code=404)
+
+async def prepare_static_files(static_files: PrecompressedStaticFiles) -> None:
+    """
+    Create any compressed variants the build didn't ship (e.g. after a UI
+    update) off the event loop, then reindex. An installed package directory
+    is usually read-only; its files are then served as built, uncompressed
+    where no variant exists.
+    """
+    import asyncio
+    if not os.access(static_files.root, os.W_OK):
+        logger.debug(f"{static_files.root} is not writable; serving static files without new compressed variants")
+        return
+    try:
+        written = await asyncio.to_thread(precompress_directory, static_files.root)
+    except OSError as e:
+        logger.debug(f"Could not precompress static files in {static_files.root}: {e}")
+        return
+    if written:
+        logger.debug(f"Wrote {written} compressed static variants")
+        await asyncio.to_thread(static_files.refresh)
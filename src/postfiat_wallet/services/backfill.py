@@ -0,0 +1,107 @@
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Optional, Tuple
+import logging
+import asyncio
+
+if TYPE_CHECKING:
+    from postfiat.rpc import CachingRpcClient
+
+logger = logging.getLogger(__name__)
+
+class _Done:
+    """End-of-partition marker, optionally carrying the error that ended it"""
+
+    def __init__(self, error: Optional[Exception] = None):
+        self.error = error
+
+async def validated_ledger_index(rpc_url: str) -> int:
+    """Index of the latest validated ledger on the given node"""
+    from xrpl.asyncio.clients import AsyncJsonRpcClient
+    from xrpl.models.requests import Ledger
+
+    response = await AsyncJsonRpcClient(rpc_url).request(Ledger(ledger_index="validated"))
+    if not response.is_successful():
+        raise ValueError(f"ledger request failed: {response.result}")
+    return int(response.result["ledger_index"])
+
+def ledger_partitions(start_ledger: int, tip_ledger: int, partitions: int) -> List[Tuple[int, int]]:
+    """
+    Split [start_ledger, tip_ledger] into up to `partitions` contiguous,
+    non-overlapping inclusive ranges of near-equal length.
+    """
+    span = tip_ledger - start_ledger + 1
+    partitions = max(1, min(partitions, span))
+    bounds = [start_ledger + span * i // partitions for i in range(partitions + 1)]
+    return [(bounds[i], bounds[i + 1] - 1) for i in range(partitions)]
+
+async def partitioned_account_txns(
+    client: "CachingRpcClient",
+    account: str,
+    start_ledger: int,
+    end_ledger: int,
+    tip_ledger: int,
+    partitions: int = 16,
+    parallelism: int = 4,
+    buffer_size: int = 2000,
+) -> AsyncIterator[Any]:
+    """
+    Yield an account's transactions from start_ledger to end_ledger in ledger
+    order, like client.get_account_txns, but fetch ledger range partitions
+    concurrently.
+
+    Each partition is read by its own producer into a bounded queue; at most
+    `parallelism` producers run at once, and they start in partition order.
+    The consumer drains the queues in partition order, which puts the
+    transactions back in sequence. A producer whose queue is full waits for
+    the consumer, so memory stays bounded by partitions * buffer_size.
+
+    Args:
+        client: The RPC client to read account transactions from
+        account: The account address
+        start_ledger: First ledger to include
+        end_ledger: Last ledger to include (-1 for the latest)
+        tip_ledger: Latest validated ledger, used to size the partitions; the
+            last partition runs to end_ledger so nothing after it is missed
+        partitions: Number of ledger ranges to split into
+        parallelism: Maximum number of ranges fetched at once
+        buffer_size: Transactions buffered per partition ahead of the consumer
+    """
+    last_ledger = tip_ledger if end_ledger == -1 else min(end_ledger, tip_ledger)
+    ranges = ledger_partitions(start_ledger, last_ledger, partitions)
+    ranges[-1] = (ranges[-1][0], end_ledger)
+    logger.debug(
+        f"Backfilling {account} ledgers {start_ledger}..{end_ledger} in {len(ranges)} partitions, "
+        f"{parallelism} at a time"
+    )
+
+    semaphore = asyncio.Semaphore(parallelism)
+    queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=buffer_size) for _ in ranges]
+
+    async def produce(queue: asyncio.Queue, low: int, high: int) -> None:
+        async with semaphore:
+            try:
+                async for txn in client.get_account_txns(account, low, high):
+                    await queue.put(txn)
+            except Exception as e:
+                await queue.put(_Done(e))
+            else:
+                await queue.put(_Done())
+
+    # Tasks are created in partition order, and asyncio.Semaphore wakes waiters
+    # in FIFO order, so the partition being consumed always holds a slot
+    producers = [
+        asyncio.create_task(produce(queue, low, high), name=f"backfill:{account}:{low}")
+        for queue, (low, high) in zip(queues, ranges)
+    ]
+    try:
+        for queue in queues:
+            while True:
+                item = await queue.get()
+                if isinstance(item, _Done):
+                    if item.error is not None:
+                        raise item.error
+                    break
+                yield item
+    finally:
+        for producer in producers:
+            producer.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
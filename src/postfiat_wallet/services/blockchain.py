@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from xrpl.asyncio.clients import AsyncJsonRpcClient
 from xrpl.constants import CryptoAlgorithm
 from xrpl.models.requests import AccountInfo, AccountTx, AccountLines, Fee, Ledger
@@ -11,24 +11,53 @@ from xrpl.core import addresscodec
 from xrpl.core.keypairs.ed25519 import ED25519
 import logging
 import asyncio
+import time
 import nacl.bindings
 from decimal import Decimal
+from contextlib import aclosing
 
 # Import SDK components for message encoding
 from postfiat.nodes.task.models.messages import UserLogMessage, Direction
 from postfiat.nodes.task.codecs.v0.remembrancer.encode import encode_account_msg
 from postfiat.rpc import RpcSender
+from postfiat_wallet.services.key_cache import KeyCache
+from postfiat_wallet.config import settings
+from postfiat_wallet.utils.metrics import RPC_REQUEST_SECONDS, RPC_ERRORS
+from postfiat_wallet.utils.shared_calls import shared
 
 logger = logging.getLogger(__name__)
 
 class BlockchainService:
-    def __init__(self, node_url: str = "https://xrpl.postfiat.org:6007"):
+    def __init__(self, node_url: Optional[str] = None):
         """Initialize blockchain service with XRPL async client"""
+        node_url = node_url or settings.XRPL.rpc_url
         self.client = AsyncJsonRpcClient(node_url)
         self.pft_currency = "PFT"
         self.pft_issuer = "rnQUEEg8yyjrwk9FhyXpKavHyCRJM9BDMW"  # Replace with actual PFT issuer address
         # Initialize RpcSender for SDK transaction submission
         self.rpc_sender = RpcSender(node_url)
+        # Session-scoped cache of derived keypairs
+        self.key_cache = KeyCache()
+        # Last balances fetched per account, with when they were fetched
+        self._balances: Dict[str, Tuple[float, Tuple[float, float]]] = {}
+
+    async def _request(self, request):
+        """Send a request through the XRPL client, recording its latency and errors"""
+        method = getattr(request.method, "value", str(request.method))
+        try:
+            with RPC_REQUEST_SECONDS.time(client="blockchain", method=method):
+                response = await self.client.request(request)
+        except Exception:
+            RPC_ERRORS.inc(client="blockchain", method=method)
+            raise
+        if not response.is_successful():
+            RPC_ERRORS.inc(client="blockchain", method=method)
+        return response
+
+    async def get_validated_ledger_index(self) -> int:
+        """Get the index of the latest validated ledger"""
+        response = await self._request(Ledger(ledger_index="validated"))
+        return int(response.result["ledger_index"])
 
     def create_wallet_from_secret(self, secret: str) -> dict:
         """Create a wallet from a secret key"""
@@ -56,7 +85,7 @@ class BlockchainService:
                 account=account,
                 ledger_index="validated"
             )
-            response = await self.client.request(request)
+            response = await self._request(request)
             balance_drops = response.result["account_data"]["Balance"]
             return drops_to_xrp(balance_drops)
         except Exception as e:
@@ -70,35 +99,162 @@ class BlockchainService:
             account=account,
             ledger_index="validated"
         )
-        response = await self.client.request(request)
+        response = await self._request(request)
         
         for line in response.result["lines"]:
             if line["currency"] == self.pft_currency and line["account"] == self.pft_issuer:
                 return float(line["balance"])
         return 0.0
 
-    async def get_transaction_history(self, account: str, limit: int = 20) -> List[Dict[Any, Any]]:
-        """Get recent transaction history for the account"""
+    async def get_balances(self, account: str, max_age: float = 0) -> Tuple[float, float]:
+        """
+        Get the XRP and PFT balances for the given account, fetched concurrently.
+        Callers within one /api/batch request share a single lookup.
+
+        Args:
+            account: The account address
+            max_age: Seconds old a previously fetched result (e.g. from the
+                sign-in warm-up) may be and still be returned without a request
+        """
+        cached = self._balances.get(account)
+        if cached is not None and time.monotonic() - cached[0] <= max_age:
+            return cached[1]
+
+        async def fetch() -> Tuple[float, float]:
+            xrp_balance, pft_balance = await asyncio.gather(
+                self.get_xrp_balance(account),
+                self.get_pft_balance(account)
+            )
+            self._balances[account] = (time.monotonic(), (xrp_balance, pft_balance))
+            return xrp_balance, pft_balance
+
+        return await shared(("balances", account), fetch)
+
+    @staticmethod
+    def _format_history_entry(tx: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw account_tx entry into the wallet's transaction summary"""
+        # API v1 nests the transaction under "tx", API v2 under "tx_json"
+        tx_data = tx.get("tx_json") or tx.get("tx", {})
+        amount = tx_data.get("Amount", tx_data.get("DeliverMax"))
+        return {
+            "type": tx_data["TransactionType"],
+            "date": tx_data.get("date"),
+            "hash": tx_data.get("hash") or tx.get("hash"),
+            "ledger_index": tx_data.get("ledger_index") or tx.get("ledger_index"),
+            "amount": drops_to_xrp(amount) if isinstance(amount, str) else None,
+            "fee": drops_to_xrp(tx_data["Fee"]),
+            "sender": tx_data["Account"],
+            "receiver": tx_data.get("Destination"),
+            "status": "success" if tx["meta"]["TransactionResult"] == "tesSUCCESS" else "failed"
+        }
+
+    async def _fetch_transaction_page(
+        self,
+        account: str,
+        page_size: int,
+        ledger_index_min: int,
+        ledger_index_max: int,
+        forward: bool,
+        marker: Optional[Any]
+    ) -> Dict[str, Any]:
+        """Fetch a single account_tx page"""
         request = AccountTx(
             account=account,
-            limit=limit
+            ledger_index_min=ledger_index_min,
+            ledger_index_max=ledger_index_max,
+            forward=forward,
+            limit=page_size,
+            marker=marker
         )
-        response = await self.client.request(request)
-        
+        response = await self._request(request)
+        if not response.is_successful():
+            raise ValueError(f"account_tx failed for {account}: {response.result}")
+        return response.result
+
+    async def iter_transaction_pages(
+        self,
+        account: str,
+        page_size: int = 200,
+        ledger_index_min: int = -1,
+        ledger_index_max: int = -1,
+        forward: bool = False,
+        marker: Optional[Any] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over an account's transaction history one account_tx page at a time,
+        following the server's marker until the history is exhausted.
+
+        The next page is requested as soon as the current one arrives, so network
+        time overlaps with however long the caller spends on the current page.
+        A page still being prefetched when the iterator is closed is cancelled.
+
+        Args:
+            account: The account address
+            page_size: Transactions requested per page
+            ledger_index_min: Earliest ledger to include (-1 for the earliest available)
+            ledger_index_max: Latest ledger to include (-1 for the latest validated)
+            forward: True for oldest-first, False for newest-first
+            marker: Optional marker to resume from a previous page
+            limit: Optional number of transactions the caller will read; no page
+                is prefetched once the pages yielded already hold that many
+
+        Yields:
+            Dicts with "transactions" (formatted, as in get_transaction_history) and
+            "marker" (the marker for the following page, or None on the last page)
+        """
+        if limit is not None and limit <= 0:
+            return
+        pending = asyncio.create_task(self._fetch_transaction_page(
+            account, page_size, ledger_index_min, ledger_index_max, forward, marker
+        ))
+        fetched = 0
+        try:
+            while pending is not None:
+                result = await pending
+                next_marker = result.get("marker")
+                fetched += len(result.get("transactions", []))
+
+                # Prefetch the next page before handing this one to the caller,
+                # unless the caller won't read that far
+                pending = None
+                if next_marker is not None and (limit is None or fetched < limit):
+                    pending = asyncio.create_task(self._fetch_transaction_page(
+                        account, page_size, ledger_index_min, ledger_index_max, forward, next_marker
+                    ))
+
+                yield {
+                    "transactions": [self._format_history_entry(tx) for tx in result.get("transactions", [])],
+                    "marker": next_marker
+                }
+        finally:
+            if pending is not None:
+                pending.cancel()
+                # Retrieve a failure of a page nobody will read, so it isn't
+                # reported as a never-retrieved task exception
+                pending.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def iter_transaction_history(self, account: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over an account's transactions one at a time across all pages.
+        Accepts the same keyword arguments as iter_transaction_pages.
+        """
+        async with aclosing(self.iter_transaction_pages(account, **kwargs)) as pages:
+            async for page in pages:
+                for transaction in page["transactions"]:
+                    yield transaction
+
+    async def get_transaction_history(self, account: str, limit: int = 20) -> List[Dict[Any, Any]]:
+        """Get recent transaction history for the account"""
         transactions = []
-        for tx in response.result["transactions"]:
-            tx_data = tx["tx"]
-            transaction = {
-                "type": tx_data["TransactionType"],
-                "date": tx_data["date"],
-                "hash": tx_data["hash"],
-                "amount": drops_to_xrp(tx_data["Amount"]) if "Amount" in tx_data else None,
-                "fee": drops_to_xrp(tx_data["Fee"]),
-                "sender": tx_data["Account"],
-                "receiver": tx_data.get("Destination"),
-                "status": "success" if tx["meta"]["TransactionResult"] == "tesSUCCESS" else "failed"
-            }
-            transactions.append(transaction)
+        if limit <= 0:
+            return transactions
+        history = self.iter_transaction_history(account, page_size=min(limit, 400), limit=limit)
+        async with aclosing(history):
+            async for transaction in history:
+                transactions.append(transaction)
+                if len(transactions) >= limit:
+                    break
             
         return transactions
 
@@ -106,8 +262,7 @@ class BlockchainService:
         """Get a summary of account information including XRP and PFT balances"""
         try:
             logger.info(f"Fetching summary for account: {account}")
-            xrp_balance = await self.get_xrp_balance(account)
-            pft_balance = await self.get_pft_balance(account)
+            xrp_balance, pft_balance = await self.get_balances(account)
             
             summary = {
                 "xrp_balance": float(xrp_balance),
@@ -120,19 +275,26 @@ class BlockchainService:
             logger.error(f"Error in get_account_summary: {str(e)}")
             raise
 
-    def _sign_and_send_transaction_sync(self, unsigned_tx: dict, seed: str) -> dict:
+    @staticmethod
+    def _as_wallet(seed: str | Wallet) -> Wallet:
+        """Return seed unchanged if it is already an unlocked Wallet, otherwise derive one"""
+        if isinstance(seed, Wallet):
+            return seed
+        return Wallet.from_seed(seed)
+
+    def _sign_and_send_transaction_sync(self, unsigned_tx: dict, seed: str | Wallet) -> dict:
         """
         Synchronous method to sign and send a transaction.
         
         Args:
             unsigned_tx: The unsigned transaction dictionary
-            seed: The user's secret key/seed
+            seed: The user's secret key/seed, or an already unlocked Wallet
             
         Returns:
             The transaction submission result
         """
         try:
-            wallet = Wallet.from_seed(seed)
+            wallet = self._as_wallet(seed)
             payment = Payment.from_dict(unsigned_tx)
             logger.debug(f"Signing and submitting transaction for account: {wallet.classic_address}")
             
@@ -149,37 +311,38 @@ class BlockchainService:
             logger.error(f"Error in _sign_and_send_transaction_sync: {str(e)}")
             raise
 
-    async def sign_and_send_transaction(self, unsigned_tx: dict, seed: str) -> dict:
+    async def sign_and_send_transaction(self, unsigned_tx: dict, seed: str | Wallet) -> dict:
         """
         Asynchronous wrapper to sign and send a transaction.
         
         Args:
             unsigned_tx: The unsigned transaction dictionary
-            seed: The user's secret key/seed
+            seed: The user's secret key/seed, or an already unlocked Wallet
             
         Returns:
             The transaction submission result
         """
         try:
-            result = await asyncio.to_thread(self._sign_and_send_transaction_sync, unsigned_tx, seed)
+            with RPC_REQUEST_SECONDS.time(client="blockchain", method="sign_and_submit"):
+                result = await asyncio.to_thread(self._sign_and_send_transaction_sync, unsigned_tx, seed)
             return result
         except Exception as e:
             logger.error(f"Error in sign_and_send_transaction: {str(e)}")
             raise
 
-    def _sign_and_send_trust_set_sync(self, trust_set_tx: TrustSet, seed: str) -> dict:
+    def _sign_and_send_trust_set_sync(self, trust_set_tx: TrustSet, seed: str | Wallet) -> dict:
         """
         Synchronous method to sign and send a trust set transaction.
         
         Args:
             trust_set_tx: The TrustSet transaction object
-            seed: The user's secret key/seed
+            seed: The user's secret key/seed, or an already unlocked Wallet
             
         Returns:
             The transaction submission result
         """
         try:
-            wallet = Wallet.from_seed(seed)
+            wallet = self._as_wallet(seed)
             logger.debug(f"Signing trust set for account: {wallet.classic_address}")
             logger.debug(f"Trust set object: {trust_set_tx.to_dict()}")
             
@@ -196,19 +359,20 @@ class BlockchainService:
             logger.error(f"Error in _sign_and_send_trust_set_sync: {str(e)}")
             raise
 
-    async def sign_and_send_trust_set(self, trust_set_tx: TrustSet, seed: str) -> dict:
+    async def sign_and_send_trust_set(self, trust_set_tx: TrustSet, seed: str | Wallet) -> dict:
         """
         Asynchronous wrapper to sign and send a trust set transaction.
         
         Args:
             trust_set_tx: The TrustSet transaction object
-            seed: The user's secret key/seed
+            seed: The user's secret key/seed, or an already unlocked Wallet
             
         Returns:
             The transaction submission result
         """
         try:
-            result = await asyncio.to_thread(self._sign_and_send_trust_set_sync, trust_set_tx, seed)
+            with RPC_REQUEST_SECONDS.time(client="blockchain", method="sign_and_submit"):
+                result = await asyncio.to_thread(self._sign_and_send_trust_set_sync, trust_set_tx, seed)
             return result
         except Exception as e:
             logger.error(f"Error in sign_and_send_trust_set: {str(e)}")
@@ -219,12 +383,14 @@ class BlockchainService:
         decoded_seed = addresscodec.decode_seed(wallet_seed)
         return decoded_seed[0]
 
-    def get_ecdh_public_key_from_seed(self, wallet_seed: str) -> str:
+    def get_ecdh_public_key_from_seed(self, wallet_seed: str, account: Optional[str] = None) -> str:
         """
         Get ECDH public key directly from a wallet seed
         
         Args:
             wallet_seed: The wallet seed to derive the key from
+            account: Optional account address the seed belongs to, used to
+                evict the cached keypair when the account logs out
             
         Returns:
             str: The ECDH public key in hex format
@@ -234,7 +400,14 @@ class BlockchainService:
         """
         try:
             raw_entropy = self._get_raw_entropy(wallet_seed)
-            public_key, _ = ED25519.derive_keypair(raw_entropy, is_validator=False)
+            fingerprint = self.key_cache.fingerprint(raw_entropy)
+            self.key_cache.bind_account(account, fingerprint)
+
+            keypair = self.key_cache.get_keypair(fingerprint)
+            if keypair is None:
+                keypair = ED25519.derive_keypair(raw_entropy, is_validator=False)
+                self.key_cache.put_keypair(fingerprint, keypair)
+            public_key, _ = keypair
             return public_key
         except Exception as e:
             logger.error(f"Failed to derive ECDH public key: {e}")
@@ -261,6 +434,10 @@ class BlockchainService:
             logger.error(f"Failed to derive shared secret: {e}")
             raise ValueError(f"Failed to derive shared secret: {e}") from e
 
+    def clear_account_keys(self, account: str) -> None:
+        """Evict all cached key material derived for an account (e.g. on logout)"""
+        self.key_cache.evict_account(account)
+
     @staticmethod
     def _derive_shared_secret(public_key_hex: str, seed_bytes: bytes) -> bytes:
         """
@@ -358,9 +535,11 @@ class BlockchainService:
             for i, tx in enumerate(encoded_txns):
                 logger.debug(f"Submitting transaction {i+1}/{len(encoded_txns)}")
                 try:
-                    submit_result = await self.rpc_sender.submit_and_wait(tx, user_wallet)
+                    with RPC_REQUEST_SECONDS.time(client="rpc_sender", method="submit_and_wait"):
+                        submit_result = await self.rpc_sender.submit_and_wait(tx, user_wallet)
                     results.append(submit_result)
                 except Exception as tx_error:
+                    RPC_ERRORS.inc(client="rpc_sender", method="submit_and_wait")
                     logger.error(f"Failed to submit transaction {i+1}: {str(tx_error)}")
                     # Add error info but continue with other transactions
                     results.append({"error": str(tx_error), "index": i})
@@ -0,0 +1,216 @@
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from postfiat_wallet.config import settings
+from postfiat_wallet.services.decoder_registry import DecodeStream
+from postfiat_wallet.services.ingestion_stats import IngestionRun
+import threading
+import logging
+import asyncio
+import time
+import os
+
+if TYPE_CHECKING:
+    from postfiat.nodes.task.models.messages import Message
+
+logger = logging.getLogger(__name__)
+
+class _DecodeClosed(Exception):
+    """Raised inside a worker when the consumer of its messages has gone away"""
+
+class _OffloadedDecode:
+    """
+    One codec stream decode running on a worker thread, in an event loop of
+    its own. The worker pulls transactions from the source on the caller's
+    loop up to `window` at a time, and hands decoded messages back through a
+    queue that holds at most `window` of them, so neither side buffers the
+    whole stream.
+    """
+
+    def __init__(
+        self,
+        decode_stream: DecodeStream,
+        txns: AsyncIterator[Any],
+        window: int,
+        run: Optional[IngestionRun],
+        kwargs: dict
+    ):
+        self.decode_stream = decode_stream
+        self.txns = txns.__aiter__()
+        self.window = window
+        self.run = run
+        self.kwargs = kwargs
+        self.loop = asyncio.get_running_loop()
+        self.output: asyncio.Queue = asyncio.Queue()
+        self.credits = threading.Semaphore(window)
+        self.closed = threading.Event()
+        self.pull: Optional[Future] = None
+        self.blocked = 0.0
+
+    def _emit(self, kind: str, value: Any = None) -> None:
+        """Queue an item for the consumer, waiting while `window` are already queued"""
+        wait_start = time.perf_counter()
+        self.credits.acquire()
+        self.blocked += time.perf_counter() - wait_start
+        if self.closed.is_set():
+            raise _DecodeClosed()
+        self.loop.call_soon_threadsafe(self.output.put_nowait, (kind, value))
+
+    async def _next_batch(self) -> List[Any]:
+        """Up to `window` transactions from the source; fewer only once it's exhausted"""
+        batch = []
+        while len(batch) < self.window:
+            try:
+                batch.append(await self.txns.__anext__())
+            except StopAsyncIteration:
+                break
+        return batch
+
+    async def _feed(self) -> AsyncIterator[Any]:
+        """The source transactions, read in batches on the caller's loop (runs on the worker)"""
+        while not self.closed.is_set():
+            wait_start = time.perf_counter()
+            self.pull = asyncio.run_coroutine_threadsafe(self._next_batch(), self.loop)
+            if self.closed.is_set():
+                self.pull.cancel()
+            try:
+                batch = self.pull.result()
+            finally:
+                self.blocked += time.perf_counter() - wait_start
+            for txn in batch:
+                yield txn
+            if len(batch) < self.window:
+                return
+
+    async def _decode(self) -> int:
+        messages = 0
+        async for msg in self.decode_stream(self._feed(), **self.kwargs):
+            self._emit("message", msg)
+            messages += 1
+        return messages
+
+    def work(self) -> None:
+        """Run the decode to completion (runs on a worker thread)"""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        messages = 0
+        try:
+            messages = asyncio.run(self._decode())
+            self._emit("done")
+        except _DecodeClosed:
+            pass
+        except BaseException as e:
+            if not self.closed.is_set():
+                logger.warning(f"Decoding with {self.decode_stream.__module__} failed: {e}", exc_info=True)
+                try:
+                    self._emit("error", e)
+                except _DecodeClosed:
+                    pass
+        finally:
+            if self.run is not None:
+                wall = time.perf_counter() - wall_start - self.blocked
+                self.run.add("decrypt", max(wall, 0.0), time.thread_time() - cpu_start, messages)
+
+    def close(self) -> None:
+        """Stop the worker: refuse further output and cancel a pending source read"""
+        self.closed.set()
+        self.credits.release()
+        if self.pull is not None:
+            self.pull.cancel()
+
+class DecodePool:
+    """
+    Runs the TaskNode SDK's message decoders on a bounded pool of worker
+    threads instead of the asyncio event loop, so CPU-heavy decoding (ECDH,
+    Fernet and brotli for remembrancer messages) doesn't stall other requests.
+
+    Each decode runs the codec's own decode_account_stream on a worker, so
+    chunked messages are reassembled exactly as the SDK does it, and messages
+    come back in the order the codec yields them.
+
+    The SDK reassembles and decrypts in that one pass and has no per-message
+    step to fan out, so one stream's messages decode in series on its worker;
+    max_workers bounds how many streams (e.g. accounts) decode at once.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, window: Optional[int] = None):
+        """
+        Args:
+            max_workers: Number of worker threads, i.e. decodes running at once
+                (defaults to DECODE.max_workers, or one per CPU core when that is 0)
+            window: Maximum number of decoded messages a worker runs ahead of
+                its consumer (defaults to DECODE.window)
+        """
+        if max_workers is None:
+            max_workers = settings.DECODE.get("max_workers", 0)
+        if not max_workers:
+            max_workers = os.cpu_count() or 1
+        if window is None:
+            window = settings.DECODE.get("window", 64)
+
+        self.max_workers = max_workers
+        self.window = max(window, 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Create the thread pool on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="postfiat-decode"
+            )
+        return self._executor
+
+    async def decode(
+        self,
+        decode_stream: DecodeStream,
+        txns: AsyncIterator[Any],
+        run: Optional[IngestionRun] = None,
+        **kwargs
+    ) -> AsyncIterator["Message"]:
+        """
+        Decode a transaction stream with a codec on the worker pool.
+
+        Args:
+            decode_stream: The codec's decode_account_stream function
+            txns: The transactions to decode; read on the caller's event loop
+            run: Optional IngestionRun to record the worker's decrypt time into
+            **kwargs: Passed to decode_stream (node_account, user_account)
+
+        Returns:
+            An async iterator of the decoded messages
+
+        Raises:
+            Exception: Whatever the codec raised, after logging it
+        """
+        job = _OffloadedDecode(decode_stream, txns, self.window, run, kwargs)
+        worker = self.executor.submit(job.work)
+        try:
+            while True:
+                if run is not None:
+                    run.stage("decrypt").sample_queue_depth(job.output.qsize())
+                kind, value = await job.output.get()
+                job.credits.release()
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            job.close()
+            # A decode still waiting for a worker never touches the source;
+            # otherwise wait for it to stop reading before the source is dropped
+            if not worker.cancel():
+                await asyncio.wrap_future(worker)
+
+    def offload(self, decode_stream: DecodeStream) -> DecodeStream:
+        """Wrap a codec's decode_account_stream so it decodes on the worker pool"""
+        def decode_on_pool(txns: AsyncIterator[Any], **kwargs) -> AsyncIterator["Message"]:
+            return self.decode(decode_stream, txns, **kwargs)
+        return decode_on_pool
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, if it was started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,135 @@
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from postfiat_wallet.utils.metrics import INGESTION_ROUTED
+from xrpl.wallet import Wallet
+import logging
+import asyncio
+
+if TYPE_CHECKING:
+    from postfiat.nodes.task.models.messages import Message
+
+logger = logging.getLogger(__name__)
+
+# decode_account_stream(txn_stream, node_account=..., user_account=...), as the
+# TaskNode SDK's codecs define it
+DecodeStream = Callable[..., AsyncIterator["Message"]]
+
+class CounterpartyDispatcher:
+    """
+    Splits one transaction stream into a stream per node account, holding
+    only the transactions sent to or from that account. Transactions that
+    involve none of the accounts are dropped on the spot.
+
+    The source is read lazily by whichever output stream runs out first, and
+    transactions it reads for the other streams are queued for them, so no
+    task is needed and a consumer that reads the streams in any order can't
+    deadlock. Queues grow only as far as one stream runs ahead of another.
+    """
+
+    def __init__(self, source: AsyncIterator[Any], node_accounts: Dict[str, str]):
+        """
+        Args:
+            source: The transactions to split
+            node_accounts: Name of each node account to split out, by address;
+                used as the metric label for its routing counts
+        """
+        self._source = source.__aiter__()
+        self._names = node_accounts
+        self._queues: Dict[str, Deque[Any]] = {account: deque() for account in node_accounts}
+        self._lock = asyncio.Lock()
+        self._exhausted = False
+        self.routed: Dict[str, int] = {account: 0 for account in node_accounts}
+        self.skipped = 0
+
+    async def _pull(self) -> None:
+        """Read one transaction from the source and queue it for each node account it involves"""
+        txn = await self._source.__anext__()
+        routed = False
+        for account in {txn.from_address, txn.to_address}:
+            queue = self._queues.get(account)
+            if queue is not None:
+                queue.append(txn)
+                self.routed[account] += 1
+                routed = True
+        if not routed:
+            self.skipped += 1
+
+    def _record(self) -> None:
+        """Publish the routing counts once the source is exhausted"""
+        for account, count in self.routed.items():
+            INGESTION_ROUTED.inc(count, decoder=self._names[account])
+        INGESTION_ROUTED.inc(self.skipped, decoder="skipped")
+        logger.debug(f"Routed {sum(self.routed.values())} transactions to decoders, skipped {self.skipped}")
+
+    async def stream(self, node_account: str) -> AsyncIterator[Any]:
+        """The source's transactions to or from node_account, in source order"""
+        queue = self._queues[node_account]
+        while True:
+            if not queue:
+                async with self._lock:
+                    while not queue and not self._exhausted:
+                        try:
+                            await self._pull()
+                        except StopAsyncIteration:
+                            self._exhausted = True
+                            self._record()
+                if not queue:
+                    return
+            yield queue.popleft()
+
+class DecoderRegistry:
+    """
+    The message decoders run during ingestion, keyed by the node account
+    whose transactions each one decodes.
+
+    decode() reads the account's transactions once and hands each decoder
+    only the transactions whose sender or receiver is its node account, so
+    adding a node type costs a decode of that node's traffic rather than
+    another pass over the account's whole history.
+    """
+
+    def __init__(self):
+        self._decoders: Dict[str, Tuple[str, DecodeStream]] = {}
+
+    def register(self, node_account: str, name: str, decode_stream: DecodeStream) -> None:
+        """
+        Args:
+            node_account: The node's XRPL address; transactions to or from it are decoded
+            name: Short name used for timing stages and metrics (e.g. "task")
+            decode_stream: The codec's decode_account_stream function
+
+        Raises:
+            ValueError: If a decoder is already registered for node_account
+        """
+        if node_account in self._decoders:
+            raise ValueError(f"A decoder is already registered for {node_account}")
+        self._decoders[node_account] = (name, decode_stream)
+
+    def decode(
+        self,
+        txn_stream: AsyncIterator[Any],
+        user_wallet: Optional[Wallet] = None,
+        timed: Optional[Callable[[AsyncIterator["Message"], str], AsyncIterator["Message"]]] = None,
+    ) -> List[AsyncIterator["Message"]]:
+        """
+        Route a transaction stream to the registered decoders in a single pass.
+
+        Args:
+            txn_stream: The account's transactions in ledger order
+            user_wallet: Wallet passed to decoders that decrypt messages
+            timed: Optional wrapper applied to each decoder's output, given the
+                stage name "decode_<name>"
+
+        Returns:
+            One decoded message stream per registered decoder
+        """
+        dispatcher = CounterpartyDispatcher(
+            txn_stream, {account: name for account, (name, _) in self._decoders.items()}
+        )
+        streams = []
+        for node_account, (name, decode_stream) in self._decoders.items():
+            stream = decode_stream(dispatcher.stream(node_account), node_account=node_account, user_account=user_wallet)
+            if timed is not None:
+                stream = timed(stream, f"decode_{name}")
+            streams.append(stream)
+        return streams
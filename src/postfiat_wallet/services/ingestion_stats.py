@@ -0,0 +1,165 @@
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, TypeVar
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import threading
+import time
+
+T = TypeVar("T")
+
+class StageStats:
+    """Accumulated wall time, CPU time and item count for one pipeline stage"""
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.items = 0
+        self.max_queue_depth = 0
+        self._queue_depth_total = 0
+        self._queue_samples = 0
+
+    def add(self, wall: float, cpu: float, items: int = 0) -> None:
+        self.wall += wall
+        self.cpu += cpu
+        self.items += items
+
+    def sample_queue_depth(self, depth: int) -> None:
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._queue_depth_total += depth
+        self._queue_samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = {
+            "wall_seconds": round(self.wall, 6),
+            "cpu_seconds": round(self.cpu, 6),
+            "items": self.items,
+            "items_per_second": round(self.items / self.wall, 2) if self.wall > 0 else None,
+        }
+        if self._queue_samples:
+            stats["max_queue_depth"] = self.max_queue_depth
+            stats["avg_queue_depth"] = round(self._queue_depth_total / self._queue_samples, 2)
+        return stats
+
+class IngestionRun:
+    """
+    Per-stage timings for a single pass of the ingestion pipeline
+    (initialization, a refresh tick, or a message history read).
+
+    Stages wrapping other stages (e.g. a decoder reading from a transaction
+    stream) report exclusive time: the time spent in the inner stage is
+    subtracted. CPU time is measured with the calling thread's CPU clock, so it
+    can include other coroutines that ran while a stage was awaiting I/O.
+    """
+
+    def __init__(self, account: str, kind: str):
+        self.account = account
+        self.kind = kind
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.messages = 0
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> StageStats:
+        with self._lock:
+            return self.stages.setdefault(name, StageStats())
+
+    def add(self, name: str, wall: float, cpu: float, items: int = 0) -> None:
+        stage = self.stage(name)
+        with self._lock:
+            stage.add(wall, cpu, items)
+
+    @contextmanager
+    def measure(self, name: str, items: int = 1):
+        """Time the with-block as part of the named stage"""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start, items)
+
+    async def timed(self, stream: AsyncIterator[T], name: str, inner: Optional[str] = None) -> AsyncIterator[T]:
+        """
+        Wrap an async iterator, attributing the time spent producing each item
+        to the named stage. If `inner` names the stage feeding this one, its
+        time is excluded so each stage reports only its own work.
+        """
+        stage = self.stage(name)
+        inner_stage = self.stage(inner) if inner else None
+        while True:
+            inner_wall = inner_stage.wall if inner_stage else 0.0
+            inner_cpu = inner_stage.cpu if inner_stage else 0.0
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                item = await stream.__anext__()
+            except StopAsyncIteration:
+                item = None
+                done = True
+            else:
+                done = False
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            if inner_stage:
+                wall -= inner_stage.wall - inner_wall
+                cpu -= inner_stage.cpu - inner_cpu
+            self.add(name, max(wall, 0.0), max(cpu, 0.0), 0 if done else 1)
+            if done:
+                return
+            yield item
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter() - self._start
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished if self.finished is not None else time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "account": self.account,
+            "kind": self.kind,
+            "started_at": self.started_at.isoformat(),
+            "elapsed_seconds": round(self.elapsed, 6),
+            "complete": self.finished is not None,
+            "messages": self.messages,
+            "messages_per_second": round(self.messages / self.elapsed, 2) if self.elapsed > 0 else None,
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+        }
+
+    def summary(self) -> str:
+        """One-line summary for the debug log"""
+        parts = [
+            f"{name}={stats.wall:.3f}s/{stats.cpu:.3f}cpu/{stats.items}"
+            for name, stats in self.stages.items()
+        ]
+        rate = self.messages / self.elapsed if self.elapsed > 0 else 0
+        return (
+            f"Ingestion {self.kind} for {self.account}: {self.messages} messages in "
+            f"{self.elapsed:.3f}s ({rate:.1f} msg/s); " + ", ".join(parts)
+        )
+
+class IngestionStats:
+    """Keeps the most recent ingestion runs for each account"""
+
+    def __init__(self, history: int = 10):
+        self.history = history
+        self._runs: Dict[str, Deque[IngestionRun]] = {}
+
+    def start(self, account: str, kind: str) -> IngestionRun:
+        run = IngestionRun(account, kind)
+        self._runs.setdefault(account, deque(maxlen=self.history)).append(run)
+        return run
+
+    def runs(self, account: Optional[str] = None) -> List[IngestionRun]:
+        if account is not None:
+            return list(self._runs.get(account, ()))
+        return [run for runs in self._runs.values() for run in runs]
+
+    def clear(self, account: Optional[str] = None) -> None:
+        if account is None:
+            self._runs.clear()
+        else:
+            self._runs.pop(account, None)
@@ -0,0 +1,64 @@
+from typing import Dict, Optional, Set, Tuple
+from collections import OrderedDict
+from postfiat_wallet.utils.metrics import CACHE_HITS, CACHE_MISSES
+import threading
+import hashlib
+
+class KeyCache:
+    """
+    Bounded, session-scoped cache of Ed25519 keypairs derived from wallet
+    seeds, keyed by local key fingerprint, in LRU order. Hits and misses are
+    counted in the postfiat_cache_*_total metrics.
+
+    Entries are associated with the account that derived them so they can be
+    evicted when that account logs out. Seeds themselves are never stored;
+    only a SHA-256 fingerprint of the seed entropy is used as a key.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._keypairs: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._account_fingerprints: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(seed_bytes: bytes) -> str:
+        """Return a stable, non-reversible identifier for seed entropy"""
+        return hashlib.sha256(seed_bytes).hexdigest()
+
+    def bind_account(self, account: Optional[str], fingerprint: str) -> None:
+        """Associate a key fingerprint with an account for logout eviction"""
+        if not account:
+            return
+        with self._lock:
+            self._account_fingerprints.setdefault(account, set()).add(fingerprint)
+
+    def get_keypair(self, fingerprint: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            keypair = self._keypairs.get(fingerprint)
+            if keypair is None:
+                CACHE_MISSES.inc(cache="ecdh_keypairs")
+                return None
+            self._keypairs.move_to_end(fingerprint)
+            CACHE_HITS.inc(cache="ecdh_keypairs")
+            return keypair
+
+    def put_keypair(self, fingerprint: str, keypair: Tuple[str, str]) -> None:
+        with self._lock:
+            self._keypairs[fingerprint] = keypair
+            self._keypairs.move_to_end(fingerprint)
+            while len(self._keypairs) > self.max_entries:
+                self._keypairs.popitem(last=False)
+
+    def evict_account(self, account: str) -> None:
+        """Drop every entry derived for the given account"""
+        with self._lock:
+            fingerprints = self._account_fingerprints.pop(account, set())
+            for fingerprint in fingerprints:
+                self._keypairs.pop(fingerprint, None)
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._keypairs.clear()
+            self._account_fingerprints.clear()
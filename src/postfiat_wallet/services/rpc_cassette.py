@@ -0,0 +1,166 @@
+from typing import Any, Deque, Dict, List, Optional
+from collections import deque
+from pathlib import Path
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import asyncio
+import hashlib
+import logging
+import random
+import gzip
+import json
+
+logger = logging.getLogger(__name__)
+
+# Request fields that differ between otherwise identical calls
+_VOLATILE_FIELDS = {"id"}
+
+def request_key(method: str, params: Dict[str, Any]) -> str:
+    """Stable identifier for a JSON-RPC call: its method plus canonicalized params"""
+    params = {k: v for k, v in params.items() if k not in _VOLATILE_FIELDS}
+    canonical = json.dumps({"method": method, "params": params}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+class Cassette:
+    """
+    Recorded XRPL JSON-RPC interactions, stored as gzip-compressed JSON lines
+    of {"key", "method", "params", "response"}.
+
+    Identical requests (e.g. polling the validated ledger) are replayed in the
+    order they were recorded; once a key's responses run out, the last one is
+    repeated.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._recorded: List[Dict[str, Any]] = []
+        self._responses: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> "Cassette":
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._responses.setdefault(entry["key"], deque()).append(entry["response"])
+        logger.info(f"Loaded {sum(map(len, self._responses.values()))} recorded RPC responses from {self.path}")
+        return self
+
+    def record(self, method: str, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+        self._recorded.append({
+            "key": request_key(method, params),
+            "method": method,
+            "params": params,
+            "response": response,
+        })
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for entry in self._recorded:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        logger.info(f"Saved {len(self._recorded)} RPC interactions to {self.path}")
+
+    def replay(self, method: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = request_key(method, params)
+        queue = self._responses.get(key)
+        if queue:
+            self._last[key] = queue.popleft()
+        return self._last.get(key)
+
+class CassetteTransport:
+    """
+    Handles XRPL JSON-RPC bodies by recording them from an upstream node or by
+    replaying a cassette, optionally injecting latency, jitter and errors.
+
+    Args:
+        cassette: Where interactions are recorded to or replayed from
+        mode: "record" or "replay"
+        upstream: Node to forward to when recording
+        latency: Mean seconds added to each replayed response
+        jitter: Standard deviation (seconds) of the added latency
+        error_rate: Fraction of replayed requests that fail
+        error_kind: "http" for a 503 response, "rpc" for a rippled slowDown error
+        seed: Seed for the latency and error draws, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        mode: str = "replay",
+        upstream: Optional[str] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_kind: str = "http",
+        seed: int = 0
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "record" and not upstream:
+            raise ValueError("Recording requires an upstream node URL")
+        if mode == "replay":
+            cassette.load()
+        self.cassette = cassette
+        self.mode = mode
+        self.upstream = upstream
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self._rng = random.Random(seed)
+        self._http = None
+
+    async def handle(self, body: Dict[str, Any]) -> tuple[int, Dict[str, Any]]:
+        """Return the HTTP status and JSON body answering a JSON-RPC request body"""
+        method = body.get("method", "")
+        params = (body.get("params") or [{}])[0]
+
+        if self.mode == "record":
+            response = await self._forward(body)
+            self.cassette.record(method, params, response)
+            return 200, response
+
+        delay = self._rng.gauss(self.latency, self.jitter) if self.jitter else self.latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            if self.error_kind == "rpc":
+                return 200, {"result": {"status": "error", "error": "slowDown", "error_message": "Injected error"}}
+            return 503, {"error": "Injected error"}
+
+        response = self.cassette.replay(method, params)
+        if response is None:
+            logger.warning(f"No recorded response for {method} {params}")
+            return 200, {"result": {
+                "status": "error",
+                "error": "cassetteMiss",
+                "error_message": f"No recorded response for {method}",
+            }}
+        return 200, response
+
+    async def _forward(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        import httpx
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=30)
+        response = await self._http.post(self.upstream, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    async def close(self) -> None:
+        if self.mode == "record":
+            self.cassette.save()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+def create_cassette_app(transport: CassetteTransport) -> FastAPI:
+    """JSON-RPC endpoint backed by a cassette; point XRPL.rpc_url at it"""
+    app = FastAPI()
+
+    @app.post("/")
+    async def rpc(request: Request):
+        status_code, body = await transport.handle(await request.json())
+        return JSONResponse(body, status_code=status_code)
+
+    app.add_event_handler("shutdown", transport.close)
+    return app
@@ -1,13 +1,48 @@
 from postfiat.rpc import CachingRpcClient
+from postfiat_wallet.utils.metrics import RPC_REQUEST_SECONDS, RPC_ERRORS, RPC_TRANSACTIONS
 import logging
 import asyncio
+import time
 from typing import Set, Dict, Any, AsyncGenerator, Optional
 
 logger = logging.getLogger(__name__)
 
-class LazyRpcClient(CachingRpcClient):
+class InstrumentedRpcClient(CachingRpcClient):
     """
-    Extends the SDK's CachingRpcClient to prevent automatic transaction fetching
+    Extends the SDK's CachingRpcClient to record call counts, fetch latency and
+    the number of transactions read from each account transaction stream.
+    Only time spent waiting on the underlying client is measured, not time the
+    consumer spends between items.
+    """
+
+    async def get_account_txns(self, account: str, start_ledger: int, end_ledger: int) -> AsyncGenerator[Dict[str, Any], None]:
+        stream = super().get_account_txns(account, start_ledger, end_ledger)
+        fetch_time = 0.0
+        count = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    txn = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    fetch_time += time.perf_counter() - started
+                count += 1
+                yield txn
+        except Exception:
+            RPC_ERRORS.inc(client="caching", method="get_account_txns")
+            raise
+        finally:
+            RPC_REQUEST_SECONDS.observe(fetch_time, client="caching", method="get_account_txns")
+            RPC_TRANSACTIONS.inc(count, client="caching")
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+class LazyRpcClient(InstrumentedRpcClient):
+    """
+    Extends the instrumented CachingRpcClient to prevent automatic transaction fetching
     until explicitly authorized for a specific account.
     """
     
@@ -24,6 +59,13 @@ class LazyRpcClient(CachingRpcClient):
             self._pending_authorizations[account].set_result(True)
             del self._pending_authorizations[account]
     
+    def is_authorized(self, account: str) -> bool:
+        return account in self._authorized_accounts
+
+    @property
+    def authorized_accounts(self) -> Set[str]:
+        return set(self._authorized_accounts)
+
     def deauthorize_account(self, account: str) -> None:
         """Remove authorization for an account"""
         if account in self._authorized_accounts:
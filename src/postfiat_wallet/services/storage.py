@@ -128,6 +128,29 @@ def save_state(state: Dict[str, Any]) -> None:
     with open(STATE_FILE, "w") as f:
         json.dump(state, f, indent=2)
 
+def load_signed_in_accounts() -> Dict[str, str]:
+    """
+    Accounts that signed in and haven't signed out since, mapped to when they
+    signed in (ISO timestamp). Kept on disk so a restart doesn't sign them out.
+    """
+    return load_state().get("signed_in", {})
+
+def mark_signed_in(address: str) -> None:
+    """
+    Record that the account signed in.
+    """
+    state = load_state()
+    state.setdefault("signed_in", {})[address] = datetime.datetime.utcnow().isoformat()
+    save_state(state)
+
+def mark_signed_out(address: str) -> None:
+    """
+    Forget that the account signed in, if it had.
+    """
+    state = load_state()
+    if state.get("signed_in", {}).pop(address, None) is not None:
+        save_state(state)
+
 # === Transactions caching and retrieval ===
 
 def load_tx_cache(wallet_address: str) -> List[Dict[str, Any]]:
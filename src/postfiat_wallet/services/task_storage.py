@@ -1,11 +1,21 @@
-from typing import List, Dict, Any, Optional
-from postfiat.rpc import CachingRpcClient
+from typing import List, Dict, Any, Optional, AsyncIterator, AbstractSet, Awaitable, Callable, Hashable
 from postfiat.nodes.task.models.messages import Message, Direction
 from postfiat.nodes.task.state import TaskStatus, UserState
 from postfiat.utils.streams import combine_streams
 from postfiat.nodes.task.codecs.v0.task import decode_account_stream as decode_task_stream
 from postfiat.nodes.task.codecs.v0.remembrancer import decode_account_stream as decode_remembrancer_stream
 from postfiat_wallet.config import settings
+from postfiat_wallet.services import storage
+from postfiat_wallet.services.decode_pool import DecodePool
+from postfiat_wallet.services.decoder_registry import DecoderRegistry
+from postfiat_wallet.services.backfill import partitioned_account_txns, validated_ledger_index
+from postfiat_wallet.services.rpc_client_wrapper import InstrumentedRpcClient, LazyRpcClient
+from postfiat_wallet.services.ingestion_stats import IngestionStats, IngestionRun
+from postfiat_wallet.utils.metrics import (
+    REGISTRY, REFRESH_LEDGERS_BEHIND, ACCOUNT_STATE_TASKS, ACCOUNT_STATE_MESSAGES, INGESTION_COALESCED
+)
+from postfiat_wallet.utils.loop_monitor import CURRENT_ACTIVITY
+from postfiat_wallet.utils.projection import TASK_FIELDS, project
 from pathlib import Path
 import logging
 import asyncio
@@ -43,14 +53,17 @@ class TaskStorage:
         cache_dir = Path(settings.PATHS["cache_dir"]) / "tasknode"
         logger.debug(f"TaskNode cache location: {cache_dir.resolve()}")
 
-        # Create the client that fetches & caches XRPL transactions
-        self.client = CachingRpcClient(
-            endpoint="https://xrpl.postfiat.org:6007",
+        # Create the client that fetches & caches XRPL transactions. The lazy
+        # client only fetches for accounts authorized at sign-in
+        client_class = LazyRpcClient if settings.PREFETCH.get("require_signin", True) else InstrumentedRpcClient
+        self.client = client_class(
+            endpoint=settings.XRPL.rpc_url,
             cache_dir=str(cache_dir)
         )
 
-        # UserState is a single aggregator for all user accounts in memory
-        self._state = UserState()
+        # One UserState per wallet address, so replaying or clearing one
+        # account never touches another's tasks
+        self._user_states: Dict[str, UserState] = {}
 
         # For each user (wallet address), track:
         #  - last processed ledger
@@ -60,6 +73,96 @@ class TaskStorage:
         self._is_refreshing: Dict[str, bool] = {}
         self._refresh_tasks: Dict[str, asyncio.Task] = {}
 
+        # History replays and tail fetches in progress, keyed by (kind, wallet address),
+        # so concurrent callers share one instead of each starting their own
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        # Whether each account's last full replay had a wallet to decrypt remembrancer messages
+        self._replayed_with_wallet: Dict[str, bool] = {}
+
+        # Background full-history replays of a progressive sync, and their progress
+        self._history_tasks: Dict[str, asyncio.Task] = {}
+        self._sync: Dict[str, Dict[str, Any]] = {}
+        # Account-level status last read from a complete history, reported
+        # while a progressive sync's partial state can't tell it
+        self._known_account_status: Dict[str, Dict[str, Any]] = {}
+
+        # Worker pool used to decrypt remembrancer messages off the event loop
+        self.decode_pool = DecodePool()
+
+        # Message decoders by node account; ingestion routes each transaction
+        # only to the decoders of its counterparties
+        self.decoders = DecoderRegistry()
+        self.decoders.register(TASK_NODE_ADDRESS, "task", decode_task_stream)
+        self.decoders.register(
+            REMEMBRANCER_ADDRESS, "remembrancer", self.decode_pool.offload(decode_remembrancer_stream)
+        )
+
+        # Per-stage timings of recent ingestion runs, per account
+        self.ingestion_stats = IngestionStats()
+
+        # Report in-memory state sizes whenever metrics are scraped
+        REGISTRY.add_collector(self._collect_state_metrics)
+
+    def _collect_state_metrics(self) -> None:
+        """Publish per-account in-memory state sizes to the metrics registry"""
+        ACCOUNT_STATE_TASKS.clear()
+        ACCOUNT_STATE_MESSAGES.clear()
+        for wallet_address, state in list(self._user_states.items()):
+            tasks = state.node_account.tasks if state.node_account else {}
+            ACCOUNT_STATE_TASKS.set(len(tasks), account=wallet_address)
+            ACCOUNT_STATE_MESSAGES.set(
+                sum(len(t.message_history or []) for t in tasks.values()),
+                account=wallet_address
+            )
+
+    def record_refresh_lag(self, validated_ledger: int) -> None:
+        """
+        Publish how far each refreshing account's last processed ledger is behind
+        the given validated ledger index.
+        """
+        REFRESH_LEDGERS_BEHIND.clear()
+        for wallet_address, refreshing in list(self._is_refreshing.items()):
+            if not refreshing:
+                continue
+            last_ledger = self._last_processed_ledger.get(wallet_address, EARLIEST_LEDGER_SEQ)
+            REFRESH_LEDGERS_BEHIND.set(max(validated_ledger - last_ledger, 0), account=wallet_address)
+
+    def authorize_account(self, wallet_address: str) -> None:
+        """Allow the account's history to be fetched (called at sign-in)"""
+        storage.mark_signed_in(wallet_address)
+        if isinstance(self.client, LazyRpcClient):
+            self.client.authorize_account(wallet_address)
+
+    def deauthorize_account(self, wallet_address: str) -> None:
+        """Stop fetching the account's history until it signs in again (called at sign-out)"""
+        storage.mark_signed_out(wallet_address)
+        if isinstance(self.client, LazyRpcClient):
+            self.client.deauthorize_account(wallet_address)
+
+    @property
+    def authorized_accounts(self) -> List[str]:
+        if isinstance(self.client, LazyRpcClient):
+            return list(self.client.authorized_accounts)
+        return []
+
+    def require_authorized(self, wallet_address: str) -> None:
+        """
+        Refuse to scan an account that hasn't signed in. The lazy client would
+        quietly return no transactions, which would look like an empty history.
+
+        Accounts that signed in before a server restart, and haven't signed out
+        since, are authorized again on first use, since the client only holds
+        authorization in memory.
+
+        Raises:
+            PermissionError: If the account isn't signed in
+        """
+        if not isinstance(self.client, LazyRpcClient) or self.client.is_authorized(wallet_address):
+            return
+        if wallet_address not in storage.load_signed_in_accounts():
+            raise PermissionError(f"Account {wallet_address} must sign in before its history can be loaded")
+        self.client.authorize_account(wallet_address)
+
     async def get_ledger_range(self, wallet_address: str) -> tuple[int, int]:
         """
         Get valid ledger range for an account. Defaults to the earliest PostFiat ledger
@@ -68,49 +171,332 @@ class TaskStorage:
         first_ledger = EARLIEST_LEDGER_SEQ
         return first_ledger, -1
 
-    async def initialize_user_tasks(self, wallet_address: str, user_wallet: Optional[Wallet] = None) -> None:
+    async def _validated_tip(self) -> Optional[int]:
+        """The latest validated ledger, or None when neither backfill nor progressive sync needs it or it can't be fetched"""
+        if not settings.BACKFILL.get("enabled", True) and not settings.PROGRESSIVE_SYNC.get("enabled", True):
+            return None
+        try:
+            return await validated_ledger_index(settings.XRPL.rpc_url)
+        except Exception as e:
+            logger.debug(f"No validated ledger, replaying sequentially from the start: {e}")
+            return None
+
+    def _backfill_tip(self, start_ledger: int, tip_ledger: Optional[int]) -> Optional[int]:
+        """
+        The tip to partition a replay from start_ledger against, or None when the
+        range should be fetched sequentially (backfill disabled, a short range, or
+        no known tip).
+        """
+        if tip_ledger is None or not settings.BACKFILL.get("enabled", True):
+            return None
+        if tip_ledger - start_ledger < settings.BACKFILL.get("min_ledgers", 100000):
+            return None
+        return tip_ledger
+
+    def _recent_window_start(self, tip_ledger: Optional[int]) -> Optional[int]:
+        """First ledger of the recent window a progressive sync ingests first, or None for a plain replay"""
+        if tip_ledger is None or not settings.PROGRESSIVE_SYNC.get("enabled", True):
+            return None
+        start_ledger = tip_ledger - settings.PROGRESSIVE_SYNC.get("recent_ledgers", 100000)
+        return start_ledger if start_ledger > EARLIEST_LEDGER_SEQ else None
+
+    def _account_txns(
+        self,
+        wallet_address: str,
+        start_ledger: int,
+        end_ledger: int,
+        tip_ledger: Optional[int] = None
+    ) -> AsyncIterator[Any]:
+        """The account's transactions in ledger order, fetched in parallel ranges when tip_ledger is given"""
+        if tip_ledger is None:
+            return self.client.get_account_txns(wallet_address, start_ledger, end_ledger)
+        return partitioned_account_txns(
+            self.client,
+            wallet_address,
+            start_ledger,
+            end_ledger,
+            tip_ledger,
+            partitions=settings.BACKFILL.get("partitions", 16),
+            parallelism=settings.BACKFILL.get("parallelism", 4),
+            buffer_size=settings.BACKFILL.get("buffer_size", 2000)
+        )
+
+    def _decoded_message_stream(
+        self,
+        run: IngestionRun,
+        wallet_address: str,
+        start_ledger: int,
+        end_ledger: int,
+        user_wallet: Optional[Wallet] = None,
+        tip_ledger: Optional[int] = None
+    ) -> AsyncIterator[Message]:
+        """
+        Build the ingestion pipeline for a ledger range: one pass over the
+        account's transactions, routed by counterparty to the registered
+        decoders and combined. Each stage is timed into the given IngestionRun.
+        With tip_ledger, transactions are backfilled in parallel ledger ranges.
+        """
+        txn_stream = run.timed(
+            self._account_txns(wallet_address, start_ledger, end_ledger, tip_ledger),
+            "fetch"
+        )
+        return combine_streams(*self.decoders.decode(
+            txn_stream,
+            user_wallet,
+            timed=lambda stream, name: run.timed(stream, name, inner="fetch")
+        ))
+
+    async def _coalesced(self, key: Hashable, factory: Optional[Callable[[], Awaitable[Any]]]) -> Any:
+        """
+        Await the operation in flight under key, or start factory() under it.
+        The operation is shielded: a cancelled caller doesn't cancel it for the
+        others. With factory None, only joins an operation already in flight.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            INGESTION_COALESCED.inc(kind=key[0])
+        elif factory is None:
+            return None
+        else:
+            future = asyncio.ensure_future(factory())
+            self._in_flight[key] = future
+
+            def done(f: asyncio.Future) -> None:
+                if self._in_flight.get(key) is f:
+                    del self._in_flight[key]
+                if not f.cancelled():
+                    f.exception()  # Retrieved here in case every caller was cancelled
+
+            future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+    async def initialize_user_tasks(
+        self,
+        wallet_address: str,
+        user_wallet: Optional[Wallet] = None,
+        full: bool = False
+    ) -> None:
+        """
+        Bring the state for the user up to date. The first call replays every
+        transaction/message from the earliest ledger to the latest; later calls
+        only fetch the tail after the last processed ledger, unless full is set or
+        a wallet is given for the first time (so earlier remembrancer messages get
+        decrypted). Concurrent calls for the same account share one replay.
+
+        Raises:
+            PermissionError: If the account hasn't signed in
+        """
+        self.require_authorized(wallet_address)
+        replay_key = ("replay", wallet_address)
+        if replay_key in self._in_flight:
+            await self._coalesced(replay_key, None)
+            if user_wallet is None or self._replayed_with_wallet.get(wallet_address):
+                return
+            # The replay we joined couldn't decrypt; run one that can
+            full = True
+
+        needs_replay = (
+            full
+            or wallet_address not in self._last_processed_ledger
+            or (user_wallet is not None and not self._replayed_with_wallet.get(wallet_address))
+        )
+        if needs_replay:
+            await self._coalesced(replay_key, lambda: self._replay_history(wallet_address, user_wallet))
+        else:
+            await self.refresh_once(wallet_address, user_wallet)
+
+    async def _replay_into(
+        self,
+        state: UserState,
+        run: IngestionRun,
+        wallet_address: str,
+        start_ledger: int,
+        user_wallet: Optional[Wallet] = None,
+        tip_ledger: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> Optional[int]:
+        """
+        Apply every message from start_ledger to the latest ledger to state.
+        Returns the newest ledger seen, or None if there were no messages.
+        """
+        newest_ledger_seen = None
+        try:
+            tip_ledger = self._backfill_tip(start_ledger, tip_ledger)
+            async for msg in self._decoded_message_stream(run, wallet_address, start_ledger, -1, user_wallet, tip_ledger):
+                with run.measure("state_update"):
+                    state.update(msg)
+                newest_ledger_seen = msg.ledger_seq
+                run.messages += 1
+                if progress is not None:
+                    progress(newest_ledger_seen)
+        finally:
+            run.finish()
+            logger.debug(run.summary())
+        return newest_ledger_seen
+
+    async def _replay_history(self, wallet_address: str, user_wallet: Optional[Wallet] = None) -> None:
         """
         Fetches all existing transactions/messages for the user from the earliest ledger
         to the latest, updating the state.
+
+        With progressive sync, only the recent window (PROGRESSIVE_SYNC.recent_ledgers)
+        is replayed here, so current tasks are queryable quickly; the full history is
+        then replayed in the background into a fresh state that replaces this one when
+        complete. get_sync_status reports how far that has got.
         """
         logger.debug(f"Initializing state for {wallet_address}")
 
-        start_ledger = EARLIEST_LEDGER_SEQ
-        end_ledger = -1
+        # A newer replay supersedes any history backfill still running; keep
+        # what the state it replaces knew about the account
+        if wallet_address not in self._sync:
+            self._remember_account_status(wallet_address)
+        self.stop_history_backfill(wallet_address)
 
-        newest_ledger_seen = None
-        message_count = 0
+        tip_ledger = await self._validated_tip()
+        recent_start = self._recent_window_start(tip_ledger)
+        start_ledger = recent_start if recent_start is not None else EARLIEST_LEDGER_SEQ
 
+        state = UserState()
+        run = self.ingestion_stats.start(wallet_address, "initialize")
         try:
-            # Fetch transactions only once
-            txn_stream = self.client.get_account_txns(wallet_address, start_ledger, end_ledger)
-            
-            # Create a copy of the transaction stream for remembrancer decoder
-            remembrancer_txn_stream = self.client.get_account_txns(wallet_address, start_ledger, end_ledger)
-            
-            # Decode the transactions using both decoders and combine the streams
-            combined_stream = combine_streams(
-                decode_task_stream(txn_stream, node_account=TASK_NODE_ADDRESS, user_account=user_wallet),
-                decode_remembrancer_stream(remembrancer_txn_stream, node_account=REMEMBRANCER_ADDRESS, user_account=user_wallet)
+            newest_ledger_seen = await self._replay_into(
+                state, run, wallet_address, start_ledger, user_wallet, tip_ledger
             )
-            
-            async for msg in combined_stream:
-                self._state.update(msg)
-                newest_ledger_seen = msg.ledger_seq
-                message_count += 1
-
-            # Store the last processed ledger
-            if newest_ledger_seen is not None:
-                self._last_processed_ledger[wallet_address] = newest_ledger_seen
-                logger.debug(f"Processed {message_count} messages, newest ledger: {newest_ledger_seen}")
-            else:
-                # If no messages found, at least set them to the earliest ledger
-                self._last_processed_ledger[wallet_address] = start_ledger
-                logger.debug("No messages found during initialization")
-
         except Exception as e:
             logger.error(f"Error during initialization: {str(e)}", exc_info=True)
             raise
+        self._user_states[wallet_address] = state
+
+        # Store the last processed ledger
+        if newest_ledger_seen is not None:
+            self._last_processed_ledger[wallet_address] = newest_ledger_seen
+            logger.debug(f"Processed {run.messages} messages, newest ledger: {newest_ledger_seen}")
+        else:
+            # If no messages found, at least set them to the first ledger replayed
+            self._last_processed_ledger[wallet_address] = start_ledger
+            logger.debug("No messages found during initialization")
+        self._replayed_with_wallet[wallet_address] = user_wallet is not None
+
+        if recent_start is not None:
+            self._start_history_backfill(wallet_address, user_wallet, recent_start, tip_ledger)
+
+    def _start_history_backfill(
+        self,
+        wallet_address: str,
+        user_wallet: Optional[Wallet],
+        recent_start: int,
+        tip_ledger: Optional[int]
+    ) -> None:
+        """Replay the full history in the background and swap it in once complete"""
+        self._sync[wallet_address] = {
+            "recent_from_ledger": recent_start,
+            "complete_up_to_ledger": EARLIEST_LEDGER_SEQ - 1,
+            "error": None
+        }
+
+        sync = self._sync[wallet_address]
+
+        def progress(ledger: int) -> None:
+            sync["complete_up_to_ledger"] = ledger
+
+        async def _backfill():
+            CURRENT_ACTIVITY.set(f"history_backfill:{wallet_address}")
+            state = UserState()
+            run = self.ingestion_stats.start(wallet_address, "history_backfill")
+            try:
+                newest_ledger_seen = await self._replay_into(
+                    state, run, wallet_address, EARLIEST_LEDGER_SEQ, user_wallet, tip_ledger, progress
+                )
+                # Let a tail fetch into the provisional state finish, then swap
+                # without yielding so nothing lands in the state being replaced
+                await self._coalesced(("tail", wallet_address), None)
+                self._user_states[wallet_address] = state
+                self._last_processed_ledger[wallet_address] = newest_ledger_seen or EARLIEST_LEDGER_SEQ
+                self._sync.pop(wallet_address, None)
+                logger.info(f"History for {wallet_address} complete up to ledger {newest_ledger_seen}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"History backfill for {wallet_address} failed: {e}", exc_info=True)
+                sync["error"] = str(e)
+                return
+            finally:
+                if self._history_tasks.get(wallet_address) is asyncio.current_task():
+                    del self._history_tasks[wallet_address]
+
+            # Catch up on anything the provisional state had already applied;
+            # on failure the refresh loop catches up on its next pass instead
+            try:
+                await self.refresh_once(wallet_address, user_wallet)
+            except Exception as e:
+                logger.warning(f"Catch-up refresh after history backfill for {wallet_address} failed: {e}")
+
+        self._history_tasks[wallet_address] = asyncio.create_task(
+            _backfill(), name=f"history_backfill:{wallet_address}"
+        )
+
+    def stop_history_backfill(self, wallet_address: str) -> None:
+        """Cancel the background history replay for the wallet address, if one is running"""
+        task = self._history_tasks.pop(wallet_address, None)
+        if task is not None:
+            logger.debug(f"Stopping history backfill for {wallet_address}")
+            task.cancel()
+        self._sync.pop(wallet_address, None)
+
+    def get_sync_status(self, wallet_address: str) -> Dict[str, Any]:
+        """
+        How much of the account's history the in-memory state covers.
+        complete_up_to_ledger is the ledger through which all history has been
+        applied; while a progressive sync is backfilling, only the ledgers from
+        recent_from_ledger on are also covered.
+        """
+        latest_ledger = self._last_processed_ledger.get(wallet_address)
+        sync = self._sync.get(wallet_address)
+        if sync is None:
+            return {
+                "complete": latest_ledger is not None,
+                "complete_up_to_ledger": latest_ledger,
+                "recent_from_ledger": None,
+                "latest_ledger": latest_ledger,
+                "error": None
+            }
+        return {
+            "complete": False,
+            "complete_up_to_ledger": sync["complete_up_to_ledger"],
+            "recent_from_ledger": sync["recent_from_ledger"],
+            "latest_ledger": latest_ledger,
+            "error": sync["error"]
+        }
+
+    async def refresh_once(self, wallet_address: str, user_wallet: Optional[Wallet] = None) -> int:
+        """
+        Run a single refresh tick: fetch and apply every message after the last
+        processed ledger. Returns the number of messages applied. Joins a replay
+        or tail fetch already running for the account instead of starting another.
+        """
+        self.require_authorized(wallet_address)
+        replay_key = ("replay", wallet_address)
+        if replay_key in self._in_flight:
+            await self._coalesced(replay_key, None)
+            return 0
+        return await self._coalesced(("tail", wallet_address), lambda: self._fetch_tail(wallet_address, user_wallet))
+
+    async def _fetch_tail(self, wallet_address: str, user_wallet: Optional[Wallet] = None) -> int:
+        """Fetch and apply every message after the last processed ledger"""
+        start_ledger = self._last_processed_ledger.get(wallet_address, EARLIEST_LEDGER_SEQ)
+        state = self._user_states.setdefault(wallet_address, UserState())
+        run = self.ingestion_stats.start(wallet_address, "refresh")
+        try:
+            async for msg in self._decoded_message_stream(run, wallet_address, start_ledger + 1, -1, user_wallet):
+                with run.measure("state_update"):
+                    state.update(msg)
+                self._last_processed_ledger[wallet_address] = msg.ledger_seq
+                run.messages += 1
+        finally:
+            run.finish()
+            if run.messages:
+                logger.debug(run.summary())
+        return run.messages
 
     async def start_refresh_loop(self, wallet_address: str, user_wallet: Optional[Wallet] = None) -> None:
         """
@@ -126,36 +512,16 @@ class TaskStorage:
         self._is_refreshing[wallet_address] = True
 
         async def _refresh():
+            # Attribute any event loop stalls in here to the refresh loop
+            CURRENT_ACTIVITY.set(f"refresh_loop:{wallet_address}")
             # Periodically poll for new messages until asked to stop
             while self._is_refreshing.get(wallet_address, False):
                 try:
-                    # Grab the last processed ledger for this user
-                    start_ledger = self._last_processed_ledger.get(wallet_address)
-                    if start_ledger is None:
+                    if wallet_address not in self._last_processed_ledger:
                         # If the user wasn't initialized, do it now automatically
                         await self.initialize_user_tasks(wallet_address, user_wallet)
-                        start_ledger = self._last_processed_ledger.get(wallet_address, EARLIEST_LEDGER_SEQ)
-
-                    # Get a single transaction stream and make a copy
-                    txn_stream = self.client.get_account_txns(
-                        wallet_address, 
-                        start_ledger + 1, 
-                        -1
-                    )
-                    
-                    # Make a copy for the remembrancer decoder
-                    remembrancer_txn_stream = self.client.get_account_txns(
-                        wallet_address, 
-                        start_ledger + 1, 
-                        -1
-                    )
-
-                    async for msg in combine_streams(
-                        decode_task_stream(txn_stream, node_account=TASK_NODE_ADDRESS, user_account=user_wallet),
-                        decode_remembrancer_stream(remembrancer_txn_stream, node_account=REMEMBRANCER_ADDRESS, user_account=user_wallet),
-                    ):
-                        self._state.update(msg)
-                        self._last_processed_ledger[wallet_address] = msg.ledger_seq
+
+                    await self.refresh_once(wallet_address, user_wallet)
 
                     # Sleep 30s between polls
                     await asyncio.sleep(30)
@@ -163,6 +529,10 @@ class TaskStorage:
                 except asyncio.CancelledError:
                     logger.debug(f"Refresh loop task cancelled for {wallet_address}")
                     break
+                except PermissionError as e:
+                    logger.warning(f"Stopping refresh loop for {wallet_address}: {e}")
+                    self._is_refreshing[wallet_address] = False
+                    break
                 except Exception as e:
                     logger.error(f"Error in refresh loop for {wallet_address}: {e}")
                     # Wait 5s to avoid infinite spin if there's an error
@@ -171,7 +541,9 @@ class TaskStorage:
             logger.debug(f"Exiting refresh loop for {wallet_address}")
 
         # Start the refresh loop as a Task
-        self._refresh_tasks[wallet_address] = asyncio.create_task(_refresh())
+        self._refresh_tasks[wallet_address] = asyncio.create_task(
+            _refresh(), name=f"refresh_loop:{wallet_address}"
+        )
 
     def stop_refresh_loop(self, wallet_address: str) -> None:
         """
@@ -185,148 +557,177 @@ class TaskStorage:
             self._refresh_tasks[wallet_address].cancel()
             del self._refresh_tasks[wallet_address]
 
-    async def get_tasks_by_state(
+    @staticmethod
+    def _format_message_history(history: List[Any]) -> List[Dict[str, Any]]:
+        """Convert a task's SDK message history into {timestamp, direction, data} dicts"""
+        message_history = []
+        for msg_item in history:
+            try:
+                # New SDK format (each message_history item is a tuple of (timestamp, direction, raw_data))
+                if isinstance(msg_item, tuple):
+                    if len(msg_item) == 3:  # New format: (timestamp, direction, raw_data)
+                        timestamp, direction, raw_data = msg_item
+                        message_history.append({
+                            "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else str(timestamp),
+                            "direction": direction.name.lower() if hasattr(direction, "name") else str(direction),
+                            "data": raw_data
+                        })
+                    elif len(msg_item) == 2:  # Old format: (direction, data)
+                        direction, data = msg_item
+                        message_history.append({
+                            "timestamp": None,
+                            "direction": direction.name.lower() if hasattr(direction, "name") else str(direction),
+                            "data": data
+                        })
+                # Object-based format
+                elif hasattr(msg_item, "direction") and (hasattr(msg_item, "raw_data") or hasattr(msg_item, "data")):
+                    direction = msg_item.direction
+                    data = getattr(msg_item, "raw_data", None) or getattr(msg_item, "data", "")
+                    timestamp = getattr(msg_item, "timestamp", None)
+                    
+                    message_history.append({
+                        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else 
+                                    (str(timestamp) if timestamp else None),
+                        "direction": direction.name.lower() if hasattr(direction, "name") else str(direction),
+                        "data": data
+                    })
+                else:
+                    # Fallback for unknown formats
+                    message_history.append({
+                        "timestamp": None,
+                        "direction": "unknown",
+                        "data": str(msg_item)
+                    })
+            except Exception as e:
+                logger.error(f"Error processing message history item: {e}", exc_info=True)
+                message_history.append({
+                    "timestamp": None,
+                    "direction": "error",
+                    "data": f"Error processing message item: {str(e)}"
+                })
+        return message_history
+
+    async def iter_tasks_by_state(
         self,
         wallet_address: str,
-        status: Optional[TaskStatus] = None
-    ) -> List[dict]:
+        status: Optional[TaskStatus] = None,
+        fields: Optional[AbstractSet[str]] = None
+    ) -> AsyncIterator[dict]:
         """
-        Return tasks from in-memory state for the specified wallet, optionally filtered
-        by TaskStatus.
+        Yield tasks from in-memory state for the specified wallet one at a time,
+        optionally filtered by TaskStatus.
+
+        Args:
+            wallet_address: The user's account
+            status: Only yield tasks in this status
+            fields: Only materialize these TASK_FIELDS (all when None); leaving out
+                message_history skips formatting it entirely
         """
-        logger.debug(f"Getting tasks by state for {wallet_address} (status filter: {status})")
+        logger.debug(f"Iterating tasks by state for {wallet_address} (status filter: {status}, fields: {fields})")
         
         # Ensure we have initialized state
-        if not self._state.node_account or wallet_address not in self._last_processed_ledger:
+        if not self.has_account_state(wallet_address) or wallet_address not in self._last_processed_ledger:
             logger.debug(f"State not initialized for {wallet_address}, initializing now")
             await self.initialize_user_tasks(wallet_address)
         
         # Grab the user's in-memory AccountState
-        account_state = self._state.node_account
+        state = self._user_states.get(wallet_address)
+        account_state = state.node_account if state else None
         if not account_state: 
             logger.debug(f"No AccountState found for {wallet_address} after initialization")
-            return []
+            return
 
         # Log the available tasks
         logger.debug(f"Found {len(account_state.tasks)} tasks in account state")
+
+        selected = TASK_FIELDS if fields is None else [f for f in TASK_FIELDS if f in fields]
         
         # Filter tasks if a status is specified
-        tasks = []
-        for task_id, tstate in account_state.tasks.items():
+        for task_id, tstate in list(account_state.tasks.items()):
             if status is None or tstate.status == status:
-                # Handle message history with updated SDK structure
-                message_history = []
-                
-                # Check first message to understand format
-                if tstate.message_history and len(tstate.message_history) > 0:
-                    sample_msg = tstate.message_history[0]
-                    
-                    # Log structure of the message history item for debugging
-                    if len(tasks) == 0:  # Only log for first task
-                        logger.debug(f"Message history item type: {type(sample_msg)}")
-                        if hasattr(sample_msg, 'timestamp'):
-                            logger.debug(f"Sample message timestamp: {sample_msg.timestamp}")
-                        if hasattr(sample_msg, 'direction'):
-                            logger.debug(f"Sample message direction: {sample_msg.direction}")
-                        if hasattr(sample_msg, 'raw_data'):
-                            logger.debug(f"Sample message has raw_data attribute")
+                # Build the task object with only the requested fields
+                task_dict = {}
+                for field in selected:
+                    if field == "id":
+                        task_dict["id"] = task_id
+                    elif field == "status":
+                        task_dict["status"] = tstate.status.name.lower()
+                    elif field in ("pft_offered", "pft_rewarded"):
+                        value = getattr(tstate, field)
+                        task_dict[field] = str(value) if value else None
+                    elif field == "message_history":
+                        task_dict["message_history"] = self._format_message_history(tstate.message_history)
+                    elif field == "timestamp":
+                        task_dict["timestamp"] = None  # Legacy field
+                    else:
+                        task_dict[field] = getattr(tstate, field)
                 
-                # Process all messages in the history
-                for msg_item in tstate.message_history:
-                    try:
-                        # New SDK format (each message_history item is a tuple of (timestamp, direction, raw_data))
-                        if isinstance(msg_item, tuple):
-                            if len(msg_item) == 3:  # New format: (timestamp, direction, raw_data)
-                                timestamp, direction, raw_data = msg_item
-                                message_history.append({
-                                    "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else str(timestamp),
-                                    "direction": direction.name.lower() if hasattr(direction, "name") else str(direction),
-                                    "data": raw_data
-                                })
-                            elif len(msg_item) == 2:  # Old format: (direction, data)
-                                direction, data = msg_item
-                                message_history.append({
-                                    "timestamp": None,
-                                    "direction": direction.name.lower() if hasattr(direction, "name") else str(direction),
-                                    "data": data
-                                })
-                        # Object-based format
-                        elif hasattr(msg_item, "direction") and (hasattr(msg_item, "raw_data") or hasattr(msg_item, "data")):
-                            direction = msg_item.direction
-                            data = getattr(msg_item, "raw_data", None) or getattr(msg_item, "data", "")
-                            timestamp = getattr(msg_item, "timestamp", None)
-                            
-                            message_history.append({
-                                "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else 
-                                            (str(timestamp) if timestamp else None),
-                                "direction": direction.name.lower() if hasattr(direction, "name") else str(direction),
-                                "data": data
-                            })
-                        else:
-                            # Fallback for unknown formats
-                            message_history.append({
-                                "timestamp": None,
-                                "direction": "unknown",
-                                "data": str(msg_item)
-                            })
-                    except Exception as e:
-                        logger.error(f"Error processing message history item: {e}", exc_info=True)
-                        message_history.append({
-                            "timestamp": None,
-                            "direction": "error",
-                            "data": f"Error processing message item: {str(e)}"
-                        })
-                
-                # Build the task object
-                task_dict = {
-                    "id": task_id,
-                    "status": tstate.status.name.lower(),
-                    "pft_offered": str(tstate.pft_offered) if tstate.pft_offered else None,
-                    "pft_rewarded": str(tstate.pft_rewarded) if tstate.pft_rewarded else None,
-                    "message_history": message_history,
-                    "task_request": tstate.task_request,
-                    "task_statement": tstate.task_statement,
-                    "completion_statement": tstate.completion_statement,
-                    "challenge_statement": tstate.challenge_statement,
-                    "challenge_response": tstate.challenge_response,
-                    "timestamp": None,  # Legacy field
-                }
-                
-                tasks.append(task_dict)
+                yield task_dict
+
+    async def get_tasks_by_state(
+        self,
+        wallet_address: str,
+        status: Optional[TaskStatus] = None,
+        fields: Optional[AbstractSet[str]] = None
+    ) -> List[dict]:
+        """
+        Return tasks from in-memory state for the specified wallet, optionally filtered
+        by TaskStatus and projected to the given fields.
+        """
+        logger.debug(f"Getting tasks by state for {wallet_address} (status filter: {status})")
+        tasks = [task async for task in self.iter_tasks_by_state(wallet_address, status, fields)]
 
         logger.debug(f"Returning {len(tasks)} tasks after filtering")
         return tasks
 
-    async def get_tasks_by_ui_section(self, wallet_address: str) -> Dict[str, List[dict]]:
+    async def get_tasks_by_ui_section(
+        self,
+        wallet_address: str,
+        fields: Optional[AbstractSet[str]] = None
+    ) -> Dict[str, List[dict]]:
         """
-        Organize tasks from the in-memory state into their respective status sections.
+        Organize tasks from the in-memory state into their respective status sections,
+        optionally projected to the given fields.
         """
-        # Fetch all tasks from in-memory state
-        tasks = await self.get_tasks_by_state(wallet_address)
+        # Sections are keyed by status, so fetch it even when it wasn't asked for
+        drop_status = fields is not None and "status" not in fields
+        tasks = await self.get_tasks_by_state(wallet_address, fields=fields | {"status"} if drop_status else fields)
 
         # Initialize sections for each possible TaskStatus
         sections = {s.name.lower(): [] for s in TaskStatus}
 
         for t in tasks:
-            sections[t["status"]].append(t)
+            section = t.pop("status") if drop_status else t["status"]
+            sections[section].append(t)
 
         return sections
 
+    def has_account_state(self, wallet_address: str) -> bool:
+        """Whether the wallet address has node account state in memory"""
+        state = self._user_states.get(wallet_address)
+        return state is not None and state.node_account is not None
+
     def clear_user_state(self, wallet_address: str) -> None:
         """
         Clear all state related to a specific wallet address when they log out.
         """
         logger.debug(f"Clearing state for {wallet_address}")
         
-        # Stop any running refresh loop
+        # Stop any running refresh loop and history backfill
         self.stop_refresh_loop(wallet_address)
+        self.stop_history_backfill(wallet_address)
         
         # Clear the last processed ledger
         if wallet_address in self._last_processed_ledger:
             del self._last_processed_ledger[wallet_address]
+        self._replayed_with_wallet.pop(wallet_address, None)
+        self._known_account_status.pop(wallet_address, None)
+
+        # Drop recorded ingestion timings
+        self.ingestion_stats.clear(wallet_address)
         
-        # Create a completely fresh UserState instead of reusing the existing one
-        self._state = UserState()
+        # Drop this account's state; other accounts keep theirs
+        self._user_states.pop(wallet_address, None)
         
         # Also clear any refresh flags
         if wallet_address in self._is_refreshing:
@@ -334,25 +735,26 @@ class TaskStorage:
         
         logger.debug(f"State cleared for {wallet_address}")
 
-    async def get_user_payments(
+    async def iter_user_payments(
         self,
         wallet_address: str,
         start_ledger: Optional[int] = None,
-        end_ledger: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+        end_ledger: Optional[int] = None,
+        fields: Optional[AbstractSet[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Fetch all user Payment-type transactions for the given wallet_address,
-        excluding those with the node address (TASK_NODE_ADDRESS). This uses
-        the postfiat-sdk's CachingRpcClient to retrieve the transactions directly
-        from the XRPL (with caching).
+        Yield user Payment-type transactions for the given wallet_address as they
+        are read from the transaction stream, excluding those with the node address
+        (TASK_NODE_ADDRESS). This uses the postfiat-sdk's CachingRpcClient to
+        retrieve the transactions directly from the XRPL (with caching).
         """
+        self.require_authorized(wallet_address)
         if start_ledger is None:
             start_ledger = EARLIEST_LEDGER_SEQ
         if end_ledger is None:
             end_ledger = -1
 
         logger.info(f"Fetching user payments for {wallet_address} from {start_ledger} to {end_ledger}")
-        payments = []
 
         async for txn in self.client.get_account_txns(wallet_address, start_ledger, end_ledger):
             # Only consider Payment transactions
@@ -380,7 +782,7 @@ class TaskStorage:
                 except (ValueError, TypeError):
                     xrp_amount = 0
 
-            payments.append({
+            yield project({
                 "ledger_index": txn.ledger_index,
                 "timestamp": txn.timestamp.isoformat() if txn.timestamp else None,
                 "hash": txn.hash,
@@ -389,33 +791,137 @@ class TaskStorage:
                 "amount_xrp": xrp_amount,
                 "amount_pft": float(txn.amount_pft),
                 "memo_data": txn.memo_data,
-            })
+            }, fields)
+
+    async def get_user_payments(
+        self,
+        wallet_address: str,
+        start_ledger: Optional[int] = None,
+        end_ledger: Optional[int] = None,
+        fields: Optional[AbstractSet[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch all user Payment-type transactions for the given wallet_address,
+        excluding those with the node address (TASK_NODE_ADDRESS).
+        """
+        return [
+            payment async for payment in
+            self.iter_user_payments(wallet_address, start_ledger, end_ledger, fields)
+        ]
 
-        return payments
+    def _remember_account_status(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """
+        Record the account-level status of the account's state, which must cover
+        its full history. Returns it, or None if the account has no node state.
+        """
+        state = self._user_states.get(wallet_address)
+        account_state = state.node_account if state else None
+        if not account_state:
+            return None
+        status = {
+            "init_rite_status": account_state.init_rite_status.name,
+            "context_doc_link": account_state.context_doc_link,
+            "is_blacklisted": account_state.is_blacklisted,
+            "init_rite_statement": account_state.init_rite_statement,
+        }
+        self._known_account_status[wallet_address] = status
+        return status
 
     async def get_account_status(self, wallet_address: str) -> Dict[str, Any]:
         """
         Get account status information including initiation rite status,
         context document link, and blacklist status.
+
+        While a progressive sync is still backfilling, the state only covers
+        recent ledgers, so the status last read from the full history is
+        reported instead, or UNKNOWN if there is none yet.
         """
         logger.debug(f"Fetching account status for {wallet_address}")
-        
-        if not self._state.node_account:
-            return {
-                "init_rite_status": "UNSTARTED",
-                "context_doc_link": None,
-                "is_blacklisted": False,
-                "init_rite_statement": None
-            }
-        
+
+        if wallet_address in self._sync:
+            status = self._known_account_status.get(wallet_address)
+            if status is None:
+                status = {
+                    "init_rite_status": "UNKNOWN",
+                    "context_doc_link": None,
+                    "is_blacklisted": False,
+                    "init_rite_statement": None,
+                }
+        else:
+            status = self._remember_account_status(wallet_address)
+            if status is None:
+                status = {
+                    "init_rite_status": "UNSTARTED",
+                    "context_doc_link": None,
+                    "is_blacklisted": False,
+                    "init_rite_statement": None,
+                }
+
+        return {**status, "history": self.get_sync_status(wallet_address)}
+
+    @staticmethod
+    def _format_node_message(msg: Message) -> Dict[str, Any]:
+        """Format a decoded node message for the frontend"""
+        is_from_user = msg.direction == Direction.USER_TO_NODE
         return {
-            "init_rite_status": self._state.node_account.init_rite_status.name,
-            "context_doc_link": self._state.node_account.context_doc_link,
-            "is_blacklisted": self._state.node_account.is_blacklisted,
-            "init_rite_statement": self._state.node_account.init_rite_statement
+            "message_id": msg.message_id,
+            "direction": "USER_TO_NODE" if is_from_user else "NODE_TO_USER",
+            "message": msg.message,
+            "timestamp": msg.timestamp.timestamp() if hasattr(msg, 'timestamp') and msg.timestamp else 0,
+            "amount_pft": msg.amount_pft if hasattr(msg, 'amount_pft') else 0
         }
 
-    async def get_user_node_messages(self, user_account: str, node_account: str, user_wallet: Wallet = None):
+    async def iter_user_node_messages(
+        self,
+        user_account: str,
+        node_account: str,
+        user_wallet: Wallet = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield formatted messages between a user and a specific node as they are
+        decoded, in ledger order.
+        
+        Args:
+            user_account: User account address
+            node_account: Node account address
+            user_wallet: Optional wallet instance for decrypting messages
+        """
+        self.require_authorized(user_account)
+
+        # Get the transaction stream once
+        txn_stream = self.client.get_account_txns(
+            user_account,
+            EARLIEST_LEDGER_SEQ,
+            -1
+        )
+        
+        run = self.ingestion_stats.start(user_account, "messages")
+        txn_stream = run.timed(txn_stream, "fetch")
+
+        # Use the proper decoder based on the node account
+        if node_account == REMEMBRANCER_ADDRESS:
+            # Use the remembrancer decoder with the wallet for decryption, on the decode pool
+            msg_stream = self.decode_pool.decode(
+                decode_remembrancer_stream, txn_stream, run=run, node_account=node_account, user_account=user_wallet
+            )
+        else:
+            # For other node types, use the task decoder
+            msg_stream = decode_task_stream(txn_stream, node_account=node_account, user_account=user_wallet)
+
+        try:
+            async for msg in run.timed(msg_stream, "decode", inner="fetch"):
+                run.messages += 1
+                yield self._format_node_message(msg)
+        finally:
+            run.finish()
+            logger.debug(run.summary())
+
+    async def get_user_node_messages(
+        self,
+        user_account: str,
+        node_account: str,
+        user_wallet: Wallet = None
+    ):
         """
         Get all messages between a user and a specific node
         
@@ -437,40 +943,9 @@ class TaskStorage:
         
         messages = []
         
-        # Get the transaction stream once
-        txn_stream = self.client.get_account_txns(
-            user_account,
-            EARLIEST_LEDGER_SEQ,
-            -1
-        )
-        
         try:
-            # Use the proper decoder based on the node account
-            if node_account == REMEMBRANCER_ADDRESS:
-                # Use the remembrancer decoder with the wallet for decryption
-                async for msg in decode_remembrancer_stream(txn_stream, node_account=node_account, user_account=user_wallet):
-                    # Format the message for the frontend
-                    is_from_user = msg.direction == Direction.USER_TO_NODE
-                    
-                    messages.append({
-                        "message_id": msg.message_id,
-                        "direction": "USER_TO_NODE" if is_from_user else "NODE_TO_USER",
-                        "message": msg.message,
-                        "timestamp": msg.timestamp.timestamp() if hasattr(msg, 'timestamp') and msg.timestamp else 0,
-                        "amount_pft": msg.amount_pft if hasattr(msg, 'amount_pft') else 0
-                    })
-            else:
-                # For other node types, use the task decoder
-                async for msg in decode_task_stream(txn_stream, node_account=node_account, user_account=user_wallet):
-                    is_from_user = msg.direction == Direction.USER_TO_NODE
-                    
-                    messages.append({
-                        "message_id": msg.message_id,
-                        "direction": "USER_TO_NODE" if is_from_user else "NODE_TO_USER",
-                        "message": msg.message,
-                        "timestamp": msg.timestamp.timestamp() if hasattr(msg, 'timestamp') and msg.timestamp else 0,
-                        "amount_pft": msg.amount_pft if hasattr(msg, 'amount_pft') else 0
-                    })
+            async for message in self.iter_user_node_messages(user_account, node_account, user_wallet):
+                messages.append(message)
         except Exception as e:
             logger.error(f"Error processing messages: {str(e)}", exc_info=True)
         
@@ -478,4 +953,3 @@ class TaskStorage:
         messages.sort(key=lambda x: x["timestamp"])
         
         return messages
-    
@@ -8,6 +8,7 @@ import hashlib
 
 from cryptography.fernet import Fernet
 from xrpl.wallet import Wallet
+from postfiat_wallet.config import settings
 
 # If you have a separate ECDH utility class or handshake logic, import it here.
 # For example:
@@ -23,7 +24,7 @@ class TransactionBuilder:
     
     def __init__(self):
         self.node_address = 'r4yc85M1hwsegVGZ1pawpZPwj65SVs8PzD'  # Post Fiat Node address
-        self.client_url = "https://xrpl.postfiat.org:6007"
+        self.client_url = settings.XRPL.rpc_url
         self.pft_issuer = 'rnQUEEg8yyjrwk9FhyXpKavHyCRJM9BDMW'  # PFT token issuer
     
     def _to_hex(self, string: str) -> str:
@@ -0,0 +1,101 @@
+from typing import Dict, Optional
+from xrpl.wallet import Wallet
+from postfiat_wallet.config import settings
+from postfiat_wallet.utils.metrics import CACHE_HITS, CACHE_MISSES
+import logging
+import secrets
+import hashlib
+import hmac
+import time
+
+logger = logging.getLogger(__name__)
+
+class WalletSession:
+    """An unlocked wallet held in memory for an authenticated user"""
+
+    def __init__(self, token: str, account: str, wallet: Wallet, password: str):
+        self.token = token
+        self.account = account
+        self.wallet = wallet
+        # A salted digest of the password the wallet was unlocked with, so
+        # requests can still be checked against it without re-running PBKDF2
+        self._salt = secrets.token_bytes(16)
+        self._password_digest = self._digest(password)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def _digest(self, password: str) -> bytes:
+        return hmac.new(self._salt, password.encode(), hashlib.sha256).digest()
+
+    def check_password(self, password: str) -> bool:
+        """Whether password is the one the wallet was unlocked with"""
+        return hmac.compare_digest(self._digest(password), self._password_digest)
+
+class WalletSessionManager:
+    """
+    Keeps unlocked xrpl Wallet objects in memory, keyed by an opaque session
+    token, so signed requests don't have to re-run PBKDF2 and key derivation.
+    Requests still send the wallet password, which is checked against the
+    session's instead of being used to decrypt the seed.
+
+    A session expires after `idle_timeout` seconds without use and is revoked
+    when its account signs out.
+    """
+
+    def __init__(self, idle_timeout: Optional[float] = None):
+        if idle_timeout is None:
+            idle_timeout = settings.SESSION.get("idle_timeout", 900)
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, WalletSession] = {}
+
+    def create(self, account: str, wallet: Wallet, password: str) -> str:
+        """Register a wallet unlocked with password and return its session token"""
+        self.purge_expired()
+        token = secrets.token_urlsafe(32)
+        self._sessions[token] = WalletSession(token, account, wallet, password)
+        logger.debug(f"Created wallet session for {account}")
+        return token
+
+    def get(self, token: Optional[str], account: str) -> Optional[WalletSession]:
+        """
+        Return the live session for a token if it belongs to the given account,
+        refreshing its idle timer. Returns None for unknown or expired tokens.
+        """
+        if not token:
+            return None
+        session = self._sessions.get(token)
+        if session is None:
+            CACHE_MISSES.inc(cache="wallet_sessions")
+            return None
+
+        now = time.monotonic()
+        if now - session.last_used > self.idle_timeout:
+            logger.debug(f"Wallet session for {session.account} expired")
+            del self._sessions[token]
+            CACHE_MISSES.inc(cache="wallet_sessions")
+            return None
+        if session.account != account:
+            return None
+
+        session.last_used = now
+        CACHE_HITS.inc(cache="wallet_sessions")
+        return session
+
+    def revoke(self, token: str) -> None:
+        self._sessions.pop(token, None)
+
+    def revoke_account(self, account: str) -> None:
+        """Revoke every session belonging to an account (e.g. on logout)"""
+        for token in [t for t, s in self._sessions.items() if s.account == account]:
+            del self._sessions[token]
+
+    def purge_expired(self) -> None:
+        now = time.monotonic()
+        for token in [t for t, s in self._sessions.items() if now - s.last_used > self.idle_timeout]:
+            del self._sessions[token]
+
+    def clear(self) -> None:
+        self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
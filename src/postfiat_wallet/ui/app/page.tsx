@@ -205,12 +205,12 @@ export default function Home() {
     // Don't try to clear state if there's no connection
     if (auth.address && isServerAvailable) {
       try {
-        // Use the full server reset endpoint
-        const resetResponse = await fetch('/api/debug/reset', {
+        // Sign the account out on the server, dropping its state and sessions
+        const signoutResponse = await fetch(`/api/auth/signout/${auth.address}`, {
           method: 'POST',
         });
-        const resetData = await resetResponse.json();
-        console.log("Server state reset complete on logout:", resetData);
+        const signoutData = await signoutResponse.json();
+        console.log("Server sign out complete:", signoutData);
       } catch (error) {
         console.error("Error during sign out cleanup:", error);
       }
@@ -232,6 +232,7 @@ export default function Home() {
     
     // Set API service as not authenticated
     apiService.setAuthenticated(false);
+    apiService.setSessionToken(null);
     apiService.clearAllCache();
     
     // Force a page reload to completely reset React application state
@@ -267,7 +268,8 @@ export default function Home() {
 
   // Update the onboarding check logic
   if (initStatus) {
-    // Only show onboarding for these specific statuses AND if user has no PFT
+    // Only show onboarding for these specific statuses AND if user has no PFT.
+    // UNKNOWN means the account's history is still loading, so it never does
     const needsOnboarding = ['UNSTARTED', 'PENDING_INITIATION', 'PENDING'].includes(initStatus);
     const hasPft = userBalance && parseFloat(userBalance.pft) > 0;
     
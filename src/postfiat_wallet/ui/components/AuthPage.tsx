@@ -4,6 +4,7 @@ import { apiService } from '../services/apiService';
 // Add this interface near the top of the file
 interface AuthResponse {
   address: string;
+  session_token?: string;  // Returned by signin; sent back as X-Session-Token
   // Add other fields returned by the API as needed
 }
 
@@ -74,6 +75,9 @@ export default function AuthPage({ onAuth }: { onAuth: (address: string, usernam
 
       console.log("Auth data:", data);
       
+      // Signed requests reuse the wallet unlocked at sign-in
+      apiService.setSessionToken(data.session_token ?? null);
+      
       // First complete authentication with the server response values
       // to set auth state properly before making other API calls
       onAuth(data.address, username, password);
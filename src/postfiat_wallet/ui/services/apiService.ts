@@ -105,6 +105,10 @@ export class ApiService {
   // Track if app is authenticated
   private isAuthenticated: boolean = false;
   
+  // Wallet session from sign-in, sent as X-Session-Token so the server can
+  // reuse the unlocked wallet instead of decrypting the seed on every request
+  private sessionToken: string | null = null;
+  
   private static logAllRequests = true;
   
   private constructor() {
@@ -136,6 +140,13 @@ export class ApiService {
     console.log(`API Service: Authentication state set to ${value}`);
   }
   
+  /**
+   * Set the wallet session token returned by sign-in (null to drop it)
+   */
+  public setSessionToken(token: string | null): void {
+    this.sessionToken = token;
+  }
+  
   /**
    * Check if endpoint should be allowed without authentication
    */
@@ -249,6 +260,7 @@ export class ApiService {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...(this.sessionToken ? { 'X-Session-Token': this.sessionToken } : {}),
         },
         credentials: 'include', // Include cookies in the request
         body: data ? JSON.stringify(data) : undefined,
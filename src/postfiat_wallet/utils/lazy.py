@@ -0,0 +1,47 @@
+from typing import Any, Callable, Generic, Optional, TypeVar
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class LazyService(Generic[T]):
+    """
+    Stands in for a service object that is only constructed (and its module
+    only imported) on first attribute access. Module-level singletons can be
+    wrapped without touching their call sites:
+
+        blockchain = LazyService(_create_blockchain_service)
+        await blockchain.get_xrp_balance(account)  # constructs on first use
+    """
+
+    def __init__(self, factory: Callable[[], T], name: Optional[str] = None):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_name", name or getattr(factory, "__name__", "service"))
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        """Return the service, constructing it if needed"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    started = time.perf_counter()
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+                    logger.debug(f"Constructed {self._name} in {time.perf_counter() - started:.3f}s")
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.get(), name, value)
@@ -0,0 +1,143 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import random
+import time
+
+# What one open wallet UI polls, and how often (seconds), mirroring the
+# intervals in the UI components: connectionManager (health), page.tsx
+# (status), Onboarding (balance), SummaryPage (tasks), PaymentsPage and
+# MemosPage (payments, ODV messages)
+UI_POLLING: Dict[str, Tuple[str, str, float]] = {
+    "health": ("GET", "/api/health", 5),
+    "status": ("GET", "/api/account/{account}/status?refresh=true", 10),
+    "balance": ("GET", "/api/balance/{account}", 10),
+    "tasks": ("GET", "/api/tasks/{account}", 30),
+    "payments": ("GET", "/api/payments/{account}", 30),
+    "odv_messages": ("GET", "/api/odv/messages/{account}", 30),
+}
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(p / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, latency: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def to_dict(self, duration: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        return {
+            "requests": requests,
+            "requests_per_second": round(requests / duration, 2) if duration > 0 else 0,
+            "error_rate": round(self.errors / requests, 4) if requests else 0,
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            "statuses": self.statuses,
+        }
+
+class LoadTest:
+    """
+    Drives a running wallet server with simulated UI sessions. Each session
+    polls every endpoint in its mix at that endpoint's interval, starting at a
+    random offset so sessions don't poll in lockstep.
+
+    Args:
+        base_url: Server to load, e.g. http://localhost:28080
+        accounts: Accounts to simulate; sessions are spread across them
+        sessions: Number of concurrent UI sessions
+        duration: Seconds to run for
+        mix: Polling interval per endpoint name (0 disables it); defaults to UI_POLLING
+        time_scale: Divides every interval, to poll faster than a real UI
+        session_token: If given, ODV messages are read decrypted via POST, as the UI does
+        seed: Seed for the start offsets
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        accounts: List[str],
+        sessions: int = 10,
+        duration: float = 60,
+        mix: Optional[Dict[str, float]] = None,
+        time_scale: float = 1.0,
+        session_token: Optional[str] = None,
+        seed: int = 0
+    ):
+        if not accounts:
+            raise ValueError("At least one account is required")
+        if time_scale <= 0:
+            raise ValueError(f"time_scale must be positive, got {time_scale}")
+        intervals = {name: interval for name, (_, _, interval) in UI_POLLING.items()}
+        for name, interval in (mix or {}).items():
+            if name not in UI_POLLING:
+                raise ValueError(f"Unknown endpoint '{name}', expected one of {', '.join(UI_POLLING)}")
+            if interval < 0:
+                raise ValueError(f"Interval for '{name}' must not be negative, got {interval}")
+            intervals[name] = interval
+        self.intervals = {name: i / time_scale for name, i in intervals.items() if i > 0}
+        self.base_url = base_url.rstrip("/")
+        self.accounts = accounts
+        self.sessions = sessions
+        self.duration = duration
+        self.session_token = session_token
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in self.intervals}
+        self._rng = random.Random(seed)
+
+    def _request_args(self, name: str, account: str) -> Tuple[str, str, Dict[str, Any]]:
+        method, path, _ = UI_POLLING[name]
+        kwargs: Dict[str, Any] = {}
+        if name == "odv_messages" and self.session_token:
+            method = "POST"
+            kwargs = {"json": {}, "headers": {"x-session-token": self.session_token}}
+        return method, self.base_url + path.format(account=account), kwargs
+
+    async def _poll(self, client, name: str, account: str, deadline: float) -> None:
+        interval = self.intervals[name]
+        method, url, kwargs = self._request_args(name, account)
+        await asyncio.sleep(self._rng.uniform(0, interval))
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                self.stats[name].record(time.perf_counter() - started, str(response.status_code), response.is_success)
+            except Exception as e:
+                self.stats[name].record(time.perf_counter() - started, type(e).__name__, False)
+            await asyncio.sleep(max(interval - (time.perf_counter() - started), 0))
+
+    async def run(self) -> Dict[str, Any]:
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.sessions * len(self.intervals))
+        started = time.perf_counter()
+        deadline = started + self.duration
+        async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+            pollers = [
+                self._poll(client, name, self.accounts[i % len(self.accounts)], deadline)
+                for i in range(self.sessions)
+                for name in self.intervals
+            ]
+            await asyncio.gather(*pollers)
+        elapsed = time.perf_counter() - started
+
+        total = sum(len(s.latencies) for s in self.stats.values())
+        errors = sum(s.errors for s in self.stats.values())
+        return {
+            "sessions": self.sessions,
+            "duration_seconds": round(elapsed, 2),
+            "requests": total,
+            "requests_per_second": round(total / elapsed, 2) if elapsed > 0 else 0,
+            "error_rate": round(errors / total, 4) if total else 0,
+            "endpoints": {name: stats.to_dict(elapsed) for name, stats in self.stats.items()},
+        }
@@ -0,0 +1,165 @@
+from typing import Any, Deque, Dict, List, Optional
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from postfiat_wallet.config import settings
+from postfiat_wallet.utils.metrics import REGISTRY
+import traceback
+import threading
+import logging
+import asyncio
+import time
+import sys
+
+logger = logging.getLogger(__name__)
+
+# What the current task is working on: an ASGI scope for HTTP requests, or a
+# short label for background work (e.g. "refresh_loop:<account>")
+CURRENT_ACTIVITY: ContextVar[Any] = ContextVar("postfiat_activity", default=None)
+
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "postfiat_event_loop_lag_seconds",
+    "How late the event loop lag sampler woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKED = REGISTRY.counter(
+    "postfiat_event_loop_blocked_total",
+    "Times the event loop was blocked beyond the threshold, by the activity that was running",
+    ("activity",),
+)
+
+def describe_activity(activity: Any) -> Optional[str]:
+    """Turn a CURRENT_ACTIVITY value into a label, preferring route templates over raw paths"""
+    if activity is None:
+        return None
+    if isinstance(activity, dict):
+        route = activity.get("route")
+        path = getattr(route, "path", None) or activity.get("path", "?")
+        return f"{activity.get('method', '')} {path}".strip()
+    return str(activity)
+
+class LoopMonitor:
+    """
+    Detects event loop stalls and attributes them to the code that caused them.
+
+    A sampler coroutine wakes every `interval` seconds and records how late it
+    was. A watchdog thread watches the sampler's heartbeat; if it goes quiet for
+    longer than `threshold`, the loop is blocked right now, so the watchdog
+    captures the running task, its CURRENT_ACTIVITY and the loop thread's stack.
+    When the loop recovers the sampler completes the event with the measured lag.
+    """
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        threshold: Optional[float] = None,
+        history: int = 50
+    ):
+        config = settings.get("LOOP_MONITOR", {})
+        self.interval = interval if interval is not None else config.get("interval", 0.1)
+        self.threshold = threshold if threshold is not None else config.get("threshold", 0.25)
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=history)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._sampler: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._heartbeat = time.perf_counter()
+        self._current_event: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None and not self._sampler.done()
+
+    def start(self) -> None:
+        """Start sampling the running event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stop.clear()
+        self._sampler = self._loop.create_task(self._sample(), name="loop_monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="postfiat-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.debug(f"Loop monitor started (interval={self.interval}s, threshold={self.threshold}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+
+    async def _sample(self) -> None:
+        CURRENT_ACTIVITY.set("loop_monitor")
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(now - expected, 0.0)
+            LOOP_LAG_SECONDS.observe(lag)
+
+            with self._lock:
+                self._heartbeat = now
+                event, self._current_event = self._current_event, None
+
+            if lag < self.threshold:
+                continue
+            if event is None:
+                # Blocked for less than a watchdog tick; we only know it happened
+                event = self._new_event(None, None, [])
+                self.events.append(event)
+            event["lag_seconds"] = round(lag, 4)
+            LOOP_BLOCKED.inc(activity=event["activity"] or "unattributed")
+            logger.debug(f"Event loop blocked for {lag:.3f}s by {event['activity'] or 'unknown'}")
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                stalled = time.perf_counter() - self._heartbeat
+                if stalled < self.threshold or self._current_event is not None:
+                    continue
+                self._current_event = self._capture()
+                self.events.append(self._current_event)
+
+    def _capture(self) -> Dict[str, Any]:
+        """Snapshot what the loop thread is doing (runs on the watchdog thread)"""
+        task = None
+        activity = None
+        try:
+            task = asyncio.current_task(self._loop)
+            if task is not None:
+                activity = describe_activity(task.get_context().get(CURRENT_ACTIVITY))
+        except Exception:
+            pass
+
+        stack: List[str] = []
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is not None:
+            stack = [
+                f"{f.filename}:{f.lineno} {f.name}"
+                for f in traceback.extract_stack(frame)[-8:]
+            ]
+        return self._new_event(activity, task.get_name() if task is not None else None, stack)
+
+    @staticmethod
+    def _new_event(activity: Optional[str], task_name: Optional[str], stack: List[str]) -> Dict[str, Any]:
+        return {
+            "detected_at": datetime.now(timezone.utc).isoformat(),
+            "activity": activity,
+            "task": task_name,
+            "stack": stack,
+            "lag_seconds": None,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "events": list(self.events),
+        }
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,264 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from contextlib import contextmanager
+from abc import ABC, abstractmethod
+import threading
+import time
+import math
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class _Metric(ABC):
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(name suffix, rendered labels, value) for each sample line"""
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The TYPE line and the samples share one name, which for a counter
+        # must carry the _total suffix
+        if not self.name.endswith("_total"):
+            raise ValueError(f"Counter names must end in _total, got {self.name}")
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _format_labels(self.labelnames, k), v) for k, v in items]
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _format_labels(self.labelnames, k), v) for k, v in items]
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time spent inside the with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        counts = self._counts.get(self._key(labels))
+        return counts[-1] if counts else 0
+
+    def samples(self):
+        out = []
+        with self._lock:
+            items = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        for key, counts, total in items:
+            for bound, count in zip(self.buckets, counts):
+                names = self.labelnames + ("le",)
+                values = key + (_format_value(bound),)
+                out.append(("_bucket", _format_labels(names, values), count))
+            out.append(("_sum", _format_labels(self.labelnames, key), total))
+            out.append(("_count", _format_labels(self.labelnames, key), counts[-1]))
+        return out
+
+class MetricsRegistry:
+    """
+    Holds all metrics for the process. Collectors are callables run just
+    before rendering, used for values that are cheaper to read on scrape
+    than to keep up to date (e.g. in-memory state sizes).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Metrics shared across modules
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "postfiat_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+RPC_REQUEST_SECONDS = REGISTRY.histogram(
+    "postfiat_rpc_request_duration_seconds",
+    "XRPL RPC call latency",
+    ("client", "method"),
+)
+RPC_ERRORS = REGISTRY.counter(
+    "postfiat_rpc_errors_total",
+    "XRPL RPC calls that raised or returned an error",
+    ("client", "method"),
+)
+RPC_TRANSACTIONS = REGISTRY.counter(
+    "postfiat_rpc_transactions_fetched_total",
+    "Transactions read from account transaction streams",
+    ("client",),
+)
+CACHE_HITS = REGISTRY.counter(
+    "postfiat_cache_hits_total",
+    "Cache lookups served from memory",
+    ("cache",),
+)
+CACHE_MISSES = REGISTRY.counter(
+    "postfiat_cache_misses_total",
+    "Cache lookups that had to compute or fetch the value",
+    ("cache",),
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "postfiat_cache_hit_ratio",
+    "Fraction of cache lookups served from memory since startup",
+    ("cache",),
+)
+
+REFRESH_LEDGERS_BEHIND = REGISTRY.gauge(
+    "postfiat_refresh_ledgers_behind",
+    "Ledgers between the latest validated ledger and the last processed ledger, per refreshing account",
+    ("account",),
+)
+INGESTION_COALESCED = REGISTRY.counter(
+    "postfiat_ingestion_coalesced_total",
+    "Initialization and refresh calls that joined a history replay or tail fetch already in flight",
+    ("kind",),
+)
+INGESTION_ROUTED = REGISTRY.counter(
+    "postfiat_ingestion_routed_transactions_total",
+    "Ingested transactions by the decoder they were routed to; \"skipped\" counts those no decoder handles",
+    ("decoder",),
+)
+ACCOUNT_STATE_TASKS = REGISTRY.gauge(
+    "postfiat_account_state_tasks",
+    "Tasks held in memory per account",
+    ("account",),
+)
+ACCOUNT_STATE_MESSAGES = REGISTRY.gauge(
+    "postfiat_account_state_messages",
+    "Task message history entries held in memory per account",
+    ("account",),
+)
+
+def _collect_cache_hit_ratio() -> None:
+    for key, hits in list(CACHE_HITS._values.items()):
+        total = hits + CACHE_MISSES._values.get(key, 0)
+        if total:
+            CACHE_HIT_RATIO.set(hits / total, cache=key[0])
+
+REGISTRY.add_collector(_collect_cache_hit_ratio)
@@ -0,0 +1,76 @@
+"""
+Build-time compression of the static UI.
+
+Writes .br and .gz variants next to the UI files so the static file server
+can send them as-is. Run it on the static directory before building the
+package (the publish workflow does):
+
+    python src/postfiat_wallet/utils/precompress.py src/postfiat_wallet/static
+
+Only the standard library (and brotli, when installed) is needed, so it
+runs without the package's dependencies.
+"""
+import os
+import sys
+import gzip
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # gzip variants are still written without it
+    brotli = None
+
+# Only text-like assets are worth compressing; images and fonts already are
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".css", ".json", ".txt", ".svg", ".map", ".xml", ".ico"}
+VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+def precompress_directory(directory: Path, min_size: int = 256) -> int:
+    """
+    Write .br and .gz variants next to every compressible file that lacks an
+    up-to-date one. Variants that don't save at least 10% are skipped.
+    Returns the number of variants written.
+    """
+    written = 0
+    for path in Path(directory).rglob("*"):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        stat = path.stat()
+        if stat.st_size < min_size:
+            continue
+        data = None
+        for coding, suffix in VARIANT_SUFFIXES.items():
+            if coding == "br" and brotli is None:
+                continue
+            variant = path.with_name(path.name + suffix)
+            if variant.exists() and variant.stat().st_mtime_ns >= stat.st_mtime_ns:
+                continue
+            data = data if data is not None else path.read_bytes()
+            if coding == "br":
+                compressed = brotli.compress(data, quality=11)
+            else:
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) > len(data) * 0.9:
+                continue
+            tmp = variant.with_name(variant.name + ".tmp")
+            tmp.write_bytes(compressed)
+            os.replace(tmp, variant)
+            written += 1
+    return written
+
+def remove_variants(path: Path) -> None:
+    """Delete the .br and .gz variants of a file, e.g. once it has been replaced"""
+    for suffix in VARIANT_SUFFIXES.values():
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+def main(argv: list) -> int:
+    if len(argv) != 2:
+        print(f"usage: {argv[0]} STATIC_DIR", file=sys.stderr)
+        return 2
+    if brotli is None:
+        print("brotli is not installed; writing gzip variants only", file=sys.stderr)
+    written = precompress_directory(Path(argv[1]))
+    print(f"Wrote {written} compressed variants in {argv[1]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,218 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter
+import tracemalloc
+import threading
+import logging
+import time
+import sys
+import os
+
+logger = logging.getLogger(__name__)
+
+# Allocation sites are attributed to the first subsystem whose path fragment
+# appears in their traceback, innermost frame first
+MEMORY_SUBSYSTEMS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("caches", (
+        os.path.join("postfiat_wallet", "services", "key_cache.py"),
+        os.path.join("postfiat_wallet", "services", "wallet_sessions.py"),
+        os.path.join("postfiat_wallet", "services", "rpc_client_wrapper.py"),
+        os.path.join("postfiat", "rpc"),
+    )),
+    ("user_state", (
+        os.path.join("postfiat", "nodes", "task", "state"),
+    )),
+    ("message_logs", (
+        os.path.join("postfiat", "nodes", "task", "models"),
+        os.path.join("postfiat", "nodes", "task", "codecs"),
+        os.path.join("postfiat_wallet", "services", "ingestion_stats.py"),
+    )),
+    ("xrpl", (
+        os.path.join("site-packages", "xrpl"),
+    )),
+    ("web", (
+        os.path.join("site-packages", "fastapi"),
+        os.path.join("site-packages", "starlette"),
+        os.path.join("site-packages", "uvicorn"),
+        os.path.join("site-packages", "pydantic"),
+    )),
+]
+
+def _frame_label(frame) -> str:
+    """Label a frame by its function, not the line executing, so each function is one flamegraph node"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for every thread in the process.
+
+    A background thread wakes every `interval` seconds, reads the current stack
+    of each other thread and counts it. The result is in the collapsed-stack
+    format understood by flamegraph.pl and speedscope, one line per unique
+    stack: "thread;outer;...;inner count". Nothing is traced between samples,
+    so the overhead stays small enough to run against a live server.
+    """
+
+    def __init__(self):
+        self._stacks: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.interval = 0.005
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.005, max_seconds: float = 300) -> None:
+        """
+        Start sampling, discarding any previous profile.
+
+        Args:
+            interval: Seconds between samples
+            max_seconds: Sampling stops on its own after this long
+
+        Raises:
+            ValueError: If a profile is already being recorded
+        """
+        if self.running:
+            raise ValueError("Profiler is already running")
+        with self._lock:
+            self._stacks.clear()
+        self.interval = interval
+        self.samples = 0
+        self.started_at = time.perf_counter()
+        self.stopped_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(max_seconds,), name="postfiat-profiler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Sampling profiler started (interval={interval}s, max={max_seconds}s)")
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks"""
+        if self._thread is None:
+            raise ValueError("Profiler is not running")
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        logger.info(f"Sampling profiler stopped after {self.samples} samples")
+        return self.collapsed()
+
+    def _run(self, max_seconds: float) -> None:
+        own_ident = threading.get_ident()
+        deadline = time.perf_counter() + max_seconds
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            sample = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                sample.append(";".join(reversed(stack)))
+            with self._lock:
+                self._stacks.update(sample)
+                self.samples += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.stopped_at = time.perf_counter()
+
+    def collapsed(self) -> str:
+        with self._lock:
+            items = sorted(self._stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def status(self) -> Dict[str, Any]:
+        end = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "seconds": round(end - self.started_at, 3) if self.started_at is not None else 0,
+        }
+
+def _subsystem(trace: tracemalloc.Traceback) -> str:
+    for frame in trace:
+        for name, fragments in MEMORY_SUBSYSTEMS:
+            if any(fragment in frame.filename for fragment in fragments):
+                return name
+    return "other"
+
+class MemoryProfiler:
+    """tracemalloc snapshots grouped by wallet subsystem"""
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25) -> None:
+        """Start tracing allocations. Only allocations made from now on are seen."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logger.info(f"tracemalloc started with {frames} frames per allocation")
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._previous = None
+
+    def snapshot(self, top: int = 20, compare: bool = False) -> Dict[str, Any]:
+        """
+        Take a snapshot and summarize it.
+
+        Args:
+            top: Number of largest allocation sites to list
+            compare: Also report growth per subsystem since the previous snapshot
+
+        Raises:
+            ValueError: If tracing has not been started
+        """
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not tracing")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        by_subsystem = self._group(snapshot)
+
+        result: Dict[str, Any] = {
+            "traced_bytes": sum(s["bytes"] for s in by_subsystem.values()),
+            "subsystems": by_subsystem,
+            "top": [
+                {
+                    "site": str(stat.traceback[0]),
+                    "subsystem": _subsystem(stat.traceback),
+                    "bytes": stat.size,
+                    "blocks": stat.count,
+                }
+                for stat in snapshot.statistics("traceback")[:top]
+            ],
+        }
+        if compare and self._previous is not None:
+            before = self._group(self._previous)
+            result["growth"] = {
+                name: stats["bytes"] - before.get(name, {}).get("bytes", 0)
+                for name, stats in by_subsystem.items()
+            }
+        self._previous = snapshot
+        return result
+
+    @staticmethod
+    def _group(snapshot: tracemalloc.Snapshot) -> Dict[str, Dict[str, int]]:
+        groups: Dict[str, Dict[str, int]] = {}
+        for stat in snapshot.statistics("traceback"):
+            entry = groups.setdefault(_subsystem(stat.traceback), {"bytes": 0, "blocks": 0})
+            entry["bytes"] += stat.size
+            entry["blocks"] += stat.count
+        return groups
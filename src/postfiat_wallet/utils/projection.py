@@ -0,0 +1,67 @@
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, Optional
+
+# Fields of the objects the task, payment and message endpoints return, in
+# response order. Kept here rather than in the services so the API can
+# validate a projection without importing them.
+TASK_FIELDS = (
+    "id",
+    "status",
+    "pft_offered",
+    "pft_rewarded",
+    "message_history",
+    "task_request",
+    "task_statement",
+    "completion_statement",
+    "challenge_statement",
+    "challenge_response",
+    "timestamp",
+)
+PAYMENT_FIELDS = (
+    "ledger_index",
+    "timestamp",
+    "hash",
+    "from_address",
+    "to_address",
+    "amount_xrp",
+    "amount_pft",
+    "memo_data",
+)
+MESSAGE_FIELDS = ("id", "from", "to", "content", "timestamp", "amount_pft")
+
+def parse_fields(
+    fields: Optional[str],
+    allowed: Iterable[str],
+    exclude: Iterable[str] = (),
+) -> Optional[FrozenSet[str]]:
+    """
+    Turn a `fields=` query value into the set of fields to return.
+
+    Args:
+        fields: Comma-separated field names, or None/empty for all fields
+        allowed: The fields the endpoint can return
+        exclude: Fields to leave out even if requested (e.g. message_history for include_history=false)
+
+    Returns:
+        The selected fields, or None when every field is wanted
+
+    Raises:
+        ValueError: If a requested field doesn't exist
+    """
+    allowed = tuple(allowed)
+    exclude = frozenset(exclude)
+    if fields:
+        selected = frozenset(f.strip() for f in fields.split(",") if f.strip())
+        unknown = selected - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(allowed)}")
+    elif exclude:
+        selected = frozenset(allowed)
+    else:
+        return None
+    return selected - exclude
+
+def project(item: Dict[str, Any], fields: Optional[AbstractSet[str]]) -> Dict[str, Any]:
+    """Return only the selected fields of item, keeping its key order"""
+    if fields is None:
+        return item
+    return {k: v for k, v in item.items() if k in fields}
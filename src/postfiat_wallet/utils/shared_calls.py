@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+# Calls made within the current shared_calls() scope, keyed by the caller's key
+_SHARED: ContextVar[Optional[Dict[Hashable, "asyncio.Future[Any]"]]] = ContextVar("postfiat_shared_calls", default=None)
+
+@contextmanager
+def shared_calls() -> Iterator[None]:
+    """
+    Within this scope (and tasks started from it), calls to shared() with the
+    same key run once and every caller gets the same result. Used by
+    /api/batch so sub-requests don't repeat each other's lookups.
+    """
+    token = _SHARED.set({})
+    try:
+        yield
+    finally:
+        _SHARED.reset(token)
+
+async def shared(key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+    """Await factory(), or the result of an identical call already made in this shared_calls() scope"""
+    calls = _SHARED.get()
+    if calls is None:
+        return await factory()
+    future = calls.get(key)
+    if future is None:
+        future = calls[key] = asyncio.ensure_future(factory())
+    return await future
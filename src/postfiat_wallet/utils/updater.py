@@ -1,64 +1,291 @@
-# src/postfiat_wallet/utils/updater.py
-import boto3
 import json
+import os
+import asyncio
+import shutil
+import hashlib
+import logging
 from pathlib import Path
 from importlib import resources
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from ..config import settings
+from .precompress import precompress_directory, remove_variants
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+LOCAL_MANIFEST_NAME = '.manifest.json'
+
+def file_hash(path: Path, algorithm: str = 'sha256') -> str:
+    """Hex digest of a file, read in chunks"""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_manifest(directory: Path, version: str) -> Dict[str, Any]:
+    """
+    Build the manifest published next to the UI files in S3:
+    {"version": ..., "files": {"<relative path>": {"hash", "algorithm", "size"}}}
+    """
+    files = {}
+    for path in sorted(Path(directory).rglob('*')):
+        if path.is_file() and path.name not in (MANIFEST_NAME, LOCAL_MANIFEST_NAME):
+            files[path.relative_to(directory).as_posix()] = {
+                'hash': file_hash(path),
+                'algorithm': 'sha256',
+                'size': path.stat().st_size,
+            }
+    return {'version': version, 'files': files}
+
+def newer_package_version(timeout: float = 2) -> Optional[str]:
+    """Return the latest version on PyPI if it is newer than the installed package"""
+    import importlib.metadata
+    import requests
+    from packaging import version
+
+    try:
+        current = importlib.metadata.version('postfiat-wallet')
+        pypi_response = requests.get('https://pypi.org/pypi/postfiat-wallet/json', timeout=timeout)
+        latest = version.parse(pypi_response.json()['info']['version'])
+        if version.parse(current) < latest:
+            return str(latest)
+    except Exception as e:
+        logger.debug(f"Failed to check for package updates: {e}")
+    return None
+
+def safe_relative_path(base: Path, relative: str) -> Path:
+    """
+    Resolve a manifest path under base.
+
+    Raises:
+        ValueError: If the path is absolute or resolves outside base
+    """
+    if not relative or Path(relative).is_absolute() or '..' in Path(relative).parts:
+        raise ValueError(f"Unsafe path in UI manifest: {relative!r}")
+    base = Path(base).resolve()
+    target = (base / relative).resolve()
+    if not target.is_relative_to(base):
+        raise ValueError(f"Unsafe path in UI manifest: {relative!r}")
+    return target
+
+def validate_manifest(manifest: Dict[str, Any]) -> None:
+    """
+    Check that every manifest entry is a safe relative path with a hash to
+    verify the download against.
+
+    Raises:
+        ValueError: On the first unsafe path or missing hash
+    """
+    for relative, entry in manifest['files'].items():
+        safe_relative_path(Path('.'), relative)
+        if not entry.get('hash') or not entry.get('algorithm'):
+            raise ValueError(f"UI manifest entry {relative!r} has no hash")
+
+def _version_key(value: str):
+    from packaging import version
+    try:
+        return version.parse(value)
+    except version.InvalidVersion:
+        return version.parse('0')
 
 class UIUpdater:
-    def __init__(self):
-        self.s3 = boto3.client('s3')
-        self.static_dir = Path(resources.files('postfiat_wallet').joinpath('static'))
+    """
+    Keeps the bundled UI in sync with the copy published in S3.
+
+    Updates are delta-only: the remote manifest lists every file with its hash,
+    only files whose hash differs from the local copy are downloaded (in
+    parallel, bounded by S3.max_concurrency), each download is verified against
+    its manifest hash, and the verified files are moved into place one by one.
+    Without a remote manifest, the object listing's ETags (MD5 for objects
+    uploaded in one part) stand in for it. A manifest with any path outside
+    the UI directory or any entry without a hash is rejected outright.
+
+    S3.endpoint_url points the client at an S3-compatible stand-in (e.g. MinIO
+    or moto) for testing.
+    """
+
+    def __init__(self, s3_client=None, static_dir: Optional[Path] = None):
+        if s3_client is None:
+            import boto3
+            s3_client = boto3.client(
+                's3',
+                region_name=settings.S3.get("region"),
+                endpoint_url=settings.S3.get("endpoint_url") or None
+            )
+        self.s3 = s3_client
+        self.bucket = settings.S3["bucket"]
+        self.prefix = settings.S3["ui_prefix"]
+        self.max_concurrency = settings.S3.get("max_concurrency", 8)
+        self.static_dir = Path(static_dir or resources.files('postfiat_wallet').joinpath('static'))
         self.temp_dir = Path(settings.PATHS["cache_dir"]) / 'ui_updates'
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self._remote_manifest: Optional[Dict[str, Any]] = None
 
-    def check_for_updates(self):
-        """Check S3 for newer UI version"""
+    def _key(self, relative_path: str) -> str:
+        return f"{self.prefix}/{relative_path}"
+
+    def local_manifest(self) -> Dict[str, Any]:
+        """Manifest of the installed UI, from the last update or hashed from disk"""
+        path = self.static_dir / LOCAL_MANIFEST_NAME
+        if path.exists():
+            return json.loads(path.read_text())
+        version_file = self.static_dir / 'version.json'
+        version = json.loads(version_file.read_text())['version'] if version_file.exists() else '0.0.0'
+        if not self.static_dir.exists():
+            return {'version': version, 'files': {}}
+        return build_manifest(self.static_dir, version)
+
+    def remote_manifest(self) -> Dict[str, Any]:
+        """Fetch the published manifest, falling back to the object listing"""
         try:
-            # Get current version from packaged manifest
-            current_manifest = self.static_dir / 'version.json'
-            current_version = '0.0.0'
-            if current_manifest.exists():
-                current_version = json.loads(current_manifest.read_text())['version']
-
-            # Get latest version from S3
-            response = self.s3.get_object(
-                Bucket=settings.S3["bucket"],
-                Key=f"{settings.S3['ui_prefix']}/version.json"
-            )
-            latest_version = json.loads(response['Body'].read())['version']
+            response = self.s3.get_object(Bucket=self.bucket, Key=self._key(MANIFEST_NAME))
+            return json.loads(response['Body'].read())
+        except Exception as e:
+            logger.debug(f"No UI manifest in S3 ({e}), falling back to the object listing")
 
-            return latest_version > current_version
+        response = self.s3.get_object(Bucket=self.bucket, Key=self._key('version.json'))
+        manifest = {'version': json.loads(response['Body'].read())['version'], 'files': {}}
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{self.prefix}/"):
+            for obj in page.get('Contents', []):
+                relative = obj['Key'][len(self.prefix) + 1:]
+                if not relative or relative.endswith('/'):
+                    continue
+                etag = obj.get('ETag', '').strip('"')
+                manifest['files'][relative] = {
+                    # Multipart ETags aren't content hashes, so validate_manifest
+                    # rejects a listing with any; publish manifest.json instead
+                    'hash': etag if '-' not in etag else None,
+                    'algorithm': 'md5',
+                    'size': obj.get('Size'),
+                }
+        return manifest
+
+    def changed_files(self, remote: Dict[str, Any], local: Dict[str, Any]) -> List[str]:
+        """Relative paths whose remote hash differs from the installed file"""
+        changed = []
+        for relative, entry in remote['files'].items():
+            local_path = safe_relative_path(self.static_dir, relative)
+            if not local_path.exists():
+                changed.append(relative)
+                continue
+            local_entry = local['files'].get(relative)
+            if local_entry and local_entry.get('algorithm') == entry['algorithm']:
+                local_hash = local_entry['hash']
+            else:
+                local_hash = file_hash(local_path, entry['algorithm'])
+            if local_hash != entry['hash']:
+                changed.append(relative)
+        return changed
+
+    @property
+    def remote_version(self) -> Optional[str]:
+        """Version of the remote UI found by the last check_for_updates"""
+        return self._remote_manifest['version'] if self._remote_manifest else None
+
+    def check_for_updates(self) -> bool:
+        """Check S3 for a UI version newer than the installed one"""
+        try:
+            self._remote_manifest = self.remote_manifest()
+            current_version = self.local_manifest()['version']
+            return _version_key(self._remote_manifest['version']) > _version_key(current_version)
         except Exception as e:
-            print(f"Failed to check for UI updates: {e}")
+            logger.warning(f"Failed to check for UI updates: {e}")
             return False
 
-    def download_update(self):
-        """Download and apply UI update from S3"""
+    def _download(self, relative: str, entry: Dict[str, Any]) -> Path:
+        target = safe_relative_path(self.temp_dir, relative)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        self.s3.download_file(self.bucket, self._key(relative), str(target))
+        actual = file_hash(target, entry['algorithm'])
+        if actual != entry['hash']:
+            raise ValueError(f"Hash mismatch for {relative}: expected {entry['hash']}, got {actual}")
+        return target
+
+    def download_update(self) -> bool:
+        """Download, verify and install the files that changed since the installed UI"""
         try:
-            # Clear temp directory
-            for file in self.temp_dir.glob('*'):
-                file.unlink()
-
-            # Download all UI files
-            paginator = self.s3.get_paginator('list_objects_v2')
-            for page in paginator.paginate(Bucket=settings.S3["bucket"], Prefix=settings.S3["ui_prefix"]):
-                for obj in page.get('Contents', []):
-                    local_path = self.temp_dir / Path(obj['Key']).relative_to(settings.S3["ui_prefix"])
-                    local_path.parent.mkdir(parents=True, exist_ok=True)
-                    self.s3.download_file(settings.S3["bucket"], obj['Key'], str(local_path))
-
-            # Validate downloaded files (e.g., check index.html exists)
-            if not (self.temp_dir / 'index.html').exists():
-                raise ValueError("Downloaded UI files are invalid")
-
-            # Replace current UI files
-            for file in self.static_dir.glob('*'):
-                file.unlink()
-            for file in self.temp_dir.glob('*'):
-                file.rename(self.static_dir / file.name)
+            remote = self._remote_manifest or self.remote_manifest()
+            local = self.local_manifest()
+            if 'index.html' not in remote['files']:
+                raise ValueError("Remote UI manifest has no index.html")
+            validate_manifest(remote)
+
+            changed = self.changed_files(remote, local)
+            logger.info(
+                f"UI update {local['version']} -> {remote['version']}: "
+                f"{len(changed)} of {len(remote['files'])} files changed"
+            )
+
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+            # Download and verify everything before touching the installed UI
+            with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="postfiat-ui-update") as pool:
+                futures = {pool.submit(self._download, r, remote['files'][r]): r for r in changed}
+                for future in as_completed(futures):
+                    future.result()
 
+            for relative in changed:
+                destination = safe_relative_path(self.static_dir, relative)
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(safe_relative_path(self.temp_dir, relative), destination)
+                # The old file's compressed variants would otherwise still be served
+                remove_variants(destination)
+
+            # Remove files that are no longer part of the UI
+            for relative in set(local['files']) - set(remote['files']):
+                path = safe_relative_path(self.static_dir, relative)
+                path.unlink(missing_ok=True)
+                remove_variants(path)
+
+            installed = {'version': remote['version'], 'files': dict(remote['files'])}
+            (self.static_dir / LOCAL_MANIFEST_NAME).write_text(json.dumps(installed, indent=2))
+
+            # Rebuild the compressed variants the static file server prefers
+            precompress_directory(self.static_dir)
+
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
             return True
         except Exception as e:
-            print(f"Failed to download UI update: {e}")
-            return False
\ No newline at end of file
+            logger.error(f"Failed to download UI update: {e}")
+            return False
+
+    def update_if_available(self) -> bool:
+        """Check for and install a UI update. Returns True if one was installed."""
+        if not self.check_for_updates():
+            return False
+        return self.download_update()
+
+async def background_update_check(
+    delay: float = 1.0,
+    install_ui: bool = False,
+    on_ui_update: Optional[Callable[[], None]] = None
+) -> None:
+    """
+    Check PyPI and S3 for updates once the server is up, without blocking it:
+    all network and file work runs on worker threads. A newer UI is only
+    reported unless install_ui is set, in which case it is installed and
+    on_ui_update is called afterwards.
+    """
+    await asyncio.sleep(delay)
+    latest = await asyncio.to_thread(newer_package_version)
+    if latest:
+        logger.info(f"New version {latest} available. Run 'pip install --upgrade postfiat-wallet' to update.")
+
+    try:
+        updater = await asyncio.to_thread(UIUpdater)
+        if not await asyncio.to_thread(updater.check_for_updates):
+            return
+        version = updater.remote_version
+        if not install_ui:
+            logger.info(f"UI version {version} available. Run 'postfiat-wallet update' to install it.")
+            return
+        logger.warning(f"Installing UI version {version} from s3://{updater.bucket}/{updater.prefix} in the background")
+        if await asyncio.to_thread(updater.download_update):
+            if on_ui_update is not None:
+                await asyncio.to_thread(on_ui_update)
+            logger.warning(f"UI updated to version {version}; reload the page to use it")
+    except Exception as e:
+        logger.warning(f"Background UI update failed: {e}")
@@ -0,0 +1,14 @@
+import pytest
+from postfiat_wallet.config import settings
+
+@pytest.fixture
+def task_storage(monkeypatch, tmp_path):
+    """A TaskStorage with its RPC cache in a temporary directory; needs the TaskNode SDK"""
+    pytest.importorskip("postfiat")
+    from postfiat_wallet.services.task_storage import TaskStorage
+
+    monkeypatch.setitem(settings.PATHS, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setitem(settings.PREFETCH, "require_signin", True)
+    storage = TaskStorage()
+    yield storage
+    storage.decode_pool.shutdown()
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+ACCOUNT = "rAccount"
+
+def account_state(status):
+    return SimpleNamespace(node_account=SimpleNamespace(
+        init_rite_status=SimpleNamespace(name=status),
+        context_doc_link="https://example.com/doc",
+        is_blacklisted=False,
+        init_rite_statement="statement",
+    ))
+
+def start_backfill(task_storage):
+    task_storage._sync[ACCOUNT] = {"recent_from_ledger": 100, "complete_up_to_ledger": 0, "error": None}
+
+async def test_complete_history_reports_its_status(task_storage):
+    task_storage._user_states[ACCOUNT] = account_state("COMPLETED")
+    status = await task_storage.get_account_status(ACCOUNT)
+    assert status["init_rite_status"] == "COMPLETED"
+    assert status["history"]["recent_from_ledger"] is None
+
+async def test_partial_history_reports_unknown(task_storage):
+    task_storage._user_states[ACCOUNT] = account_state("UNSTARTED")
+    start_backfill(task_storage)
+    status = await task_storage.get_account_status(ACCOUNT)
+    assert status["init_rite_status"] == "UNKNOWN"
+    assert status["history"]["complete"] is False
+
+async def test_partial_history_keeps_the_known_status(task_storage):
+    task_storage._user_states[ACCOUNT] = account_state("COMPLETED")
+    await task_storage.get_account_status(ACCOUNT)
+
+    # A new progressive replay's recent window hasn't seen the init rite
+    task_storage._user_states[ACCOUNT] = account_state("UNSTARTED")
+    start_backfill(task_storage)
+    status = await task_storage.get_account_status(ACCOUNT)
+    assert status["init_rite_status"] == "COMPLETED"
+    assert status["context_doc_link"] == "https://example.com/doc"
+
+async def test_clearing_state_forgets_the_known_status(task_storage):
+    task_storage._user_states[ACCOUNT] = account_state("COMPLETED")
+    await task_storage.get_account_status(ACCOUNT)
+    task_storage.clear_user_state(ACCOUNT)
+
+    task_storage._user_states[ACCOUNT] = account_state("UNSTARTED")
+    start_backfill(task_storage)
+    status = await task_storage.get_account_status(ACCOUNT)
+    assert status["init_rite_status"] == "UNKNOWN"
@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from postfiat_wallet.services.backfill import ledger_partitions, partitioned_account_txns
+
+class FakeClient:
+    """Serves one transaction per ledger, with an optional failing range"""
+
+    def __init__(self, tip: int, fail_from: int = None, delay: float = 0):
+        self.tip = tip
+        self.fail_from = fail_from
+        self.delay = delay
+        self.ranges = []
+
+    async def get_account_txns(self, account, low, high):
+        self.ranges.append((low, high))
+        high = self.tip if high == -1 else high
+        for ledger in range(low, high + 1):
+            if self.fail_from is not None and ledger >= self.fail_from:
+                raise ConnectionError(f"ledger {ledger} unavailable")
+            # Later partitions answer faster, so arrival order differs from ledger order
+            await asyncio.sleep(self.delay / (low + 1))
+            yield SimpleNamespace(ledger_index=ledger)
+
+@pytest.mark.parametrize("start,tip,partitions", [(1, 100, 4), (1, 10, 3), (5, 5, 16), (1, 7, 16), (0, 999, 7)])
+def test_partitions_cover_the_range_without_overlap(start, tip, partitions):
+    ranges = ledger_partitions(start, tip, partitions)
+    assert ranges[0][0] == start
+    assert ranges[-1][1] == tip
+    for (_, high), (low, _) in zip(ranges, ranges[1:]):
+        assert low == high + 1
+    assert all(low <= high for low, high in ranges)
+    assert len(ranges) == min(partitions, tip - start + 1)
+
+def test_partitions_are_near_equal():
+    sizes = [high - low + 1 for low, high in ledger_partitions(1, 103, 4)]
+    assert max(sizes) - min(sizes) <= 1
+
+async def test_transactions_come_back_in_ledger_order():
+    client = FakeClient(tip=60, delay=0.001)
+    txns = [t async for t in partitioned_account_txns(client, "rAccount", 1, -1, 60, partitions=6, parallelism=3, buffer_size=2)]
+    assert [t.ledger_index for t in txns] == list(range(1, 61))
+    assert len(client.ranges) == 6
+
+async def test_last_partition_runs_past_the_tip():
+    client = FakeClient(tip=50)
+    txns = [t async for t in partitioned_account_txns(client, "rAccount", 1, -1, 40, partitions=4)]
+    assert client.ranges[-1][1] == -1
+    assert [t.ledger_index for t in txns] == list(range(1, 51))
+
+async def test_partition_error_is_raised_after_earlier_transactions():
+    client = FakeClient(tip=40, fail_from=25)
+    seen = []
+    with pytest.raises(ConnectionError):
+        async for txn in partitioned_account_txns(client, "rAccount", 1, -1, 40, partitions=4, parallelism=4):
+            seen.append(txn.ledger_index)
+    assert seen == list(range(1, 25))
+
+async def test_closing_early_cancels_producers():
+    client = FakeClient(tip=1000, delay=0.001)
+    stream = partitioned_account_txns(client, "rAccount", 1, -1, 1000, partitions=8, parallelism=2, buffer_size=4)
+    async for _ in stream:
+        break
+    await stream.aclose()
+    producers = [t for t in asyncio.all_tasks() if t.get_name().startswith("backfill:rAccount")]
+    assert producers == []
@@ -0,0 +1,72 @@
+import pytest
+from fastapi import FastAPI, Header, HTTPException
+from postfiat_wallet.server.batch import run_batch
+
+PARENT = {
+    "type": "http",
+    "headers": [(b"host", b"localhost"), (b"x-session-token", b"token-1"), (b"cookie", b"dropped")],
+}
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.state.calls = []
+
+    @app.get("/api/echo/{value}")
+    async def echo(value: str, x_session_token: str = Header(None)):
+        app.state.calls.append(value)
+        return {"value": value, "token": x_session_token}
+
+    @app.get("/api/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    @app.get("/api/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    return app
+
+async def test_results_follow_request_order(app):
+    results = await run_batch(app, PARENT, ["/api/echo/b", "/api/echo/a", "/api/missing"])
+    assert [status for status, _ in results] == [200, 200, 404]
+    assert results[0][1]["value"] == "b"
+    assert results[1][1]["value"] == "a"
+
+async def test_identical_paths_are_dispatched_once(app):
+    results = await run_batch(app, PARENT, ["/api/echo/a", "/api/echo/a"])
+    assert results[0] == results[1]
+    assert app.state.calls == ["a"]
+
+async def test_session_token_is_forwarded(app):
+    [(status, body)] = await run_batch(app, PARENT, ["/api/echo/a"])
+    assert status == 200
+    assert body["token"] == "token-1"
+
+async def test_failing_sub_request_reports_500(app):
+    results = await run_batch(app, PARENT, ["/api/broken", "/api/echo/a"])
+    assert results[0][0] == 500
+    assert results[1][0] == 200
+
+async def test_preload_runs_once_per_key_before_dispatch(app):
+    loads = []
+
+    async def load():
+        assert app.state.calls == []
+        loads.append("account")
+
+    def preload(template, path_params):
+        if template == "/api/echo/{value}":
+            return ("account", path_params["value"][0]), load
+        return None
+
+    await run_batch(app, PARENT, ["/api/echo/a", "/api/echo/ab", "/api/missing"], preload=preload)
+    assert loads == ["account"]
+    assert sorted(app.state.calls) == ["a", "ab"]
+
+async def test_failed_preload_does_not_fail_the_batch(app):
+    async def load():
+        raise ValueError("preload failed")
+
+    results = await run_batch(app, PARENT, ["/api/echo/a"], preload=lambda template, params: ("k", load))
+    assert results[0][0] == 200
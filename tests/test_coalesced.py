@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from postfiat_wallet.utils.metrics import INGESTION_COALESCED
+
+class Operation:
+    """A factory whose calls block until released"""
+
+    def __init__(self, result="done", error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+async def test_concurrent_callers_share_one_operation(task_storage):
+    operation = Operation()
+    before = INGESTION_COALESCED.get(kind="replay")
+    callers = [asyncio.create_task(task_storage._coalesced(("replay", "rA"), operation)) for _ in range(3)]
+    await asyncio.sleep(0)
+    operation.release.set()
+    assert await asyncio.gather(*callers) == ["done"] * 3
+    assert operation.calls == 1
+    assert INGESTION_COALESCED.get(kind="replay") == before + 2
+
+async def test_different_keys_run_separately(task_storage):
+    first, second = Operation("first"), Operation("second")
+    callers = [
+        asyncio.create_task(task_storage._coalesced(("replay", "rA"), first)),
+        asyncio.create_task(task_storage._coalesced(("replay", "rB"), second)),
+    ]
+    await asyncio.sleep(0)
+    first.release.set()
+    second.release.set()
+    assert await asyncio.gather(*callers) == ["first", "second"]
+
+async def test_finished_operation_is_not_reused(task_storage):
+    operation = Operation()
+    operation.release.set()
+    await task_storage._coalesced(("tail", "rA"), operation)
+    await task_storage._coalesced(("tail", "rA"), operation)
+    assert operation.calls == 2
+    assert task_storage._in_flight == {}
+
+async def test_cancelled_caller_does_not_cancel_the_operation(task_storage):
+    operation = Operation()
+    cancelled = asyncio.create_task(task_storage._coalesced(("replay", "rA"), operation))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(task_storage._coalesced(("replay", "rA"), operation))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    operation.release.set()
+    assert await waiting == "done"
+    assert operation.calls == 1
+
+async def test_error_reaches_every_caller(task_storage):
+    operation = Operation(error=ConnectionError("rpc down"))
+    callers = [asyncio.create_task(task_storage._coalesced(("replay", "rA"), operation)) for _ in range(2)]
+    await asyncio.sleep(0)
+    operation.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert ("replay", "rA") not in task_storage._in_flight
+
+async def test_join_only_waits_for_an_operation_in_flight(task_storage):
+    assert await task_storage._coalesced(("tail", "rA"), None) is None
+
+    operation = Operation()
+    running = asyncio.create_task(task_storage._coalesced(("tail", "rA"), operation))
+    await asyncio.sleep(0)
+    joined = asyncio.create_task(task_storage._coalesced(("tail", "rA"), None))
+    await asyncio.sleep(0)
+    assert not joined.done()
+    operation.release.set()
+    assert await joined == "done"
+    await running
+    assert operation.calls == 1
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import pytest
+from postfiat_wallet.services.decode_pool import DecodePool
+from postfiat_wallet.services.ingestion_stats import IngestionRun
+
+class Source:
+    """An async transaction stream that counts how far it has been read"""
+
+    def __init__(self, count):
+        self.count = count
+        self.read = 0
+
+    async def __aiter__(self):
+        for i in range(self.count):
+            self.read += 1
+            yield i
+
+async def decode_pairs(txns, node_account=None, user_account=None):
+    """A codec joining each pair of transactions into one message, like chunked messages"""
+    pending = []
+    async for txn in txns:
+        pending.append(txn)
+        if len(pending) == 2:
+            yield (node_account, user_account, tuple(pending), threading.current_thread().name)
+            pending = []
+
+async def decode_failing(txns, **kwargs):
+    async for txn in txns:
+        if txn == 2:
+            raise ValueError("bad chunk")
+        yield txn
+
+@pytest.fixture
+def pool():
+    pool = DecodePool(max_workers=2, window=1)
+    yield pool
+    pool.shutdown()
+
+async def collect(stream):
+    return [msg async for msg in stream]
+
+async def test_messages_come_back_in_codec_order(pool):
+    messages = await collect(pool.decode(decode_pairs, Source(6), node_account="rNode", user_account="rUser"))
+    assert [msg[2] for msg in messages] == [(0, 1), (2, 3), (4, 5)]
+    assert all(msg[:2] == ("rNode", "rUser") for msg in messages)
+
+async def test_codec_runs_on_a_worker_thread(pool):
+    messages = await collect(pool.decode(decode_pairs, Source(2)))
+    assert messages[0][3].startswith("postfiat-decode")
+
+async def test_offload_wraps_a_codec(pool):
+    decode = pool.offload(decode_pairs)
+    messages = await collect(decode(Source(4), node_account="rNode", user_account=None))
+    assert [msg[2] for msg in messages] == [(0, 1), (2, 3)]
+
+async def test_codec_error_reaches_the_consumer(pool):
+    stream = pool.decode(decode_failing, Source(5))
+    with pytest.raises(ValueError, match="bad chunk"):
+        await collect(stream)
+
+async def test_concurrent_decodes_stay_separate(pool):
+    first, second = await asyncio.gather(
+        collect(pool.decode(decode_pairs, Source(4), node_account="rA")),
+        collect(pool.decode(decode_pairs, Source(2), node_account="rB")),
+    )
+    assert [msg[:3] for msg in first] == [("rA", None, (0, 1)), ("rA", None, (2, 3))]
+    assert [msg[:3] for msg in second] == [("rB", None, (0, 1))]
+
+async def test_closing_early_stops_reading_the_source(pool):
+    source = Source(1000)
+    stream = pool.decode(decode_pairs, source)
+    await stream.__anext__()
+    await stream.aclose()
+    read = source.read
+    assert read < 10
+    await asyncio.sleep(0.05)
+    assert source.read == read
+
+async def test_decrypt_stage_is_recorded(pool):
+    run = IngestionRun("rUser", "test")
+    await collect(pool.decode(decode_pairs, Source(6), run=run))
+    stage = run.stage("decrypt")
+    assert stage.items == 3
+    assert stage.wall >= 0
+
+async def test_streams_decode_at_the_same_time(pool):
+    # Each codec waits for the other inside its decode, so this only
+    # finishes if both decodes run at once on separate workers
+    barrier = threading.Barrier(2, timeout=5)
+
+    async def decode_meeting(txns, **kwargs):
+        async for txn in txns:
+            barrier.wait()
+            yield txn
+
+    first, second = await asyncio.gather(
+        collect(pool.decode(decode_meeting, Source(3))),
+        collect(pool.decode(decode_meeting, Source(3))),
+    )
+    assert first == second == [0, 1, 2]
+
+async def test_a_partial_last_batch_ends_the_stream():
+    pool = DecodePool(max_workers=1, window=4)
+    try:
+        messages = await collect(pool.decode(decode_pairs, Source(10)))
+    finally:
+        pool.shutdown()
+    assert [msg[2] for msg in messages] == [(0, 1), (2, 3), (4, 5), (6, 7), (8, 9)]
@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from postfiat_wallet.services.decoder_registry import CounterpartyDispatcher, DecoderRegistry
+from postfiat_wallet.utils.metrics import INGESTION_ROUTED
+
+USER, TASK_NODE, REMEMBRANCER, OTHER = "rUser", "rTaskNode", "rRemembrancer", "rOther"
+
+def txn(index, from_address, to_address):
+    return SimpleNamespace(index=index, from_address=from_address, to_address=to_address)
+
+TXNS = [
+    txn(0, USER, TASK_NODE),
+    txn(1, REMEMBRANCER, USER),
+    txn(2, USER, OTHER),
+    txn(3, TASK_NODE, USER),
+    txn(4, TASK_NODE, REMEMBRANCER),
+    txn(5, USER, REMEMBRANCER),
+]
+
+async def source(txns=TXNS):
+    for t in txns:
+        await asyncio.sleep(0)
+        yield t
+
+def indexes(txns):
+    return [t.index for t in txns]
+
+async def test_streams_hold_only_their_counterparty_in_order():
+    dispatcher = CounterpartyDispatcher(source(), {TASK_NODE: "task", REMEMBRANCER: "remembrancer"})
+    task = [t async for t in dispatcher.stream(TASK_NODE)]
+    remembrancer = [t async for t in dispatcher.stream(REMEMBRANCER)]
+    assert indexes(task) == [0, 3, 4]
+    assert indexes(remembrancer) == [1, 4, 5]
+    assert dispatcher.routed == {TASK_NODE: 3, REMEMBRANCER: 3}
+    assert dispatcher.skipped == 1
+
+async def test_concurrent_readers_get_the_same_split():
+    dispatcher = CounterpartyDispatcher(source(), {TASK_NODE: "task", REMEMBRANCER: "remembrancer"})
+
+    async def read(account):
+        return indexes([t async for t in dispatcher.stream(account)])
+
+    task, remembrancer = await asyncio.gather(read(TASK_NODE), read(REMEMBRANCER))
+    assert task == [0, 3, 4]
+    assert remembrancer == [1, 4, 5]
+
+async def test_source_is_read_once():
+    reads = []
+
+    async def counted():
+        async for t in source():
+            reads.append(t.index)
+            yield t
+
+    dispatcher = CounterpartyDispatcher(counted(), {TASK_NODE: "task", REMEMBRANCER: "remembrancer"})
+    [t async for t in dispatcher.stream(REMEMBRANCER)]
+    [t async for t in dispatcher.stream(TASK_NODE)]
+    assert reads == list(range(len(TXNS)))
+
+async def test_routing_counts_are_published_once_exhausted():
+    before = INGESTION_ROUTED.get(decoder="dispatch-test")
+    dispatcher = CounterpartyDispatcher(source(), {TASK_NODE: "dispatch-test"})
+    stream = dispatcher.stream(TASK_NODE)
+    await stream.__anext__()
+    assert INGESTION_ROUTED.get(decoder="dispatch-test") == before
+    [t async for t in stream]
+    assert INGESTION_ROUTED.get(decoder="dispatch-test") == before + 3
+
+async def test_source_error_reaches_the_reader():
+    async def failing():
+        yield TXNS[0]
+        raise ConnectionError("rpc down")
+
+    dispatcher = CounterpartyDispatcher(failing(), {TASK_NODE: "task"})
+    with pytest.raises(ConnectionError):
+        [t async for t in dispatcher.stream(TASK_NODE)]
+
+async def test_registry_hands_each_decoder_its_traffic():
+    seen = {}
+
+    def decoder(name):
+        async def decode_account_stream(txns, node_account, user_account):
+            seen[name] = (node_account, user_account)
+            async for t in txns:
+                yield (name, t.index)
+        return decode_account_stream
+
+    registry = DecoderRegistry()
+    registry.register(TASK_NODE, "task", decoder("task"))
+    registry.register(REMEMBRANCER, "remembrancer", decoder("remembrancer"))
+    stages = []
+
+    def timed(stream, name):
+        stages.append(name)
+        return stream
+
+    streams = registry.decode(source(), user_wallet="wallet", timed=timed)
+    assert stages == ["decode_task", "decode_remembrancer"]
+    task, remembrancer = [[m async for m in stream] for stream in streams]
+    assert task == [("task", 0), ("task", 3), ("task", 4)]
+    assert remembrancer == [("remembrancer", 1), ("remembrancer", 4), ("remembrancer", 5)]
+    assert seen == {"task": (TASK_NODE, "wallet"), "remembrancer": (REMEMBRANCER, "wallet")}
+
+def test_registering_a_node_account_twice_is_rejected():
+    registry = DecoderRegistry()
+    registry.register(TASK_NODE, "task", lambda txns, **kwargs: txns)
+    with pytest.raises(ValueError):
+        registry.register(TASK_NODE, "other", lambda txns, **kwargs: txns)
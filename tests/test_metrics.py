@@ -0,0 +1,29 @@
+import importlib
+import pytest
+from postfiat_wallet.utils.metrics import REGISTRY, Counter
+
+# Modules that register metrics at import time
+METRIC_MODULES = [
+    "postfiat_wallet.utils.metrics",
+    "postfiat_wallet.utils.loop_monitor",
+]
+
+@pytest.mark.parametrize("module", METRIC_MODULES)
+def test_metric_modules_import(module):
+    importlib.import_module(module)
+
+def test_create_app_imports():
+    pytest.importorskip("postfiat")
+    from postfiat_wallet.server.app import create_app
+    assert callable(create_app)
+
+def test_counter_names_end_in_total():
+    with pytest.raises(ValueError):
+        Counter("postfiat_things", "Things")
+
+def test_registered_metrics_render():
+    for module in METRIC_MODULES:
+        importlib.import_module(module)
+    rendered = REGISTRY.render()
+    assert "postfiat_event_loop_blocked_total" in rendered
+    assert "postfiat_http_request_duration_seconds" in rendered
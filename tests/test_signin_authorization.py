@@ -0,0 +1,108 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from xrpl.wallet import Wallet
+from postfiat_wallet.config import settings
+from postfiat_wallet.services import storage
+
+USERNAME = "alice"
+PASSWORD = "correct horse"
+
+@pytest.fixture
+def data_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "WALLETS_FILE", tmp_path / "wallets.json")
+    monkeypatch.setattr(storage, "STATE_FILE", tmp_path / "state.json")
+
+@pytest.fixture
+def stored_wallet(data_files):
+    wallet = Wallet.create()
+    storage.add_wallet(wallet.address, wallet.seed, USERNAME, PASSWORD)
+    return wallet
+
+@pytest.fixture
+def api(monkeypatch, task_storage):
+    """The API module using a fresh TaskStorage and no sign-in warm-up"""
+    api = pytest.importorskip("postfiat_wallet.server.api")
+    monkeypatch.setattr(api, "task_storage", task_storage)
+    monkeypatch.setitem(settings.PREFETCH, "enabled", False)
+    yield api
+    api.wallet_sessions.clear()
+
+@pytest.fixture
+def client(api):
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    return TestClient(app)
+
+def test_unknown_account_is_refused(task_storage, data_files):
+    with pytest.raises(PermissionError):
+        task_storage.require_authorized(Wallet.create().address)
+
+def test_stored_wallet_needs_a_signin(task_storage, stored_wallet):
+    with pytest.raises(PermissionError):
+        task_storage.require_authorized(stored_wallet.address)
+
+def test_signin_survives_a_restart(task_storage, stored_wallet):
+    task_storage.authorize_account(stored_wallet.address)
+    # A restart loses the client's in-memory authorization
+    task_storage.client.deauthorize_account(stored_wallet.address)
+
+    task_storage.require_authorized(stored_wallet.address)
+    assert stored_wallet.address in task_storage.authorized_accounts
+
+def test_clearing_state_keeps_authorization(task_storage, data_files):
+    address = Wallet.create().address
+    task_storage.authorize_account(address)
+    task_storage.clear_user_state(address)
+    task_storage.require_authorized(address)
+
+    task_storage.deauthorize_account(address)
+    with pytest.raises(PermissionError):
+        task_storage.require_authorized(address)
+
+def test_signin_authorizes_and_opens_a_session(api, client, stored_wallet):
+    response = client.post("/api/auth/signin", json={"username": USERNAME, "password": PASSWORD})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["address"] == stored_wallet.address
+    assert stored_wallet.address in api.task_storage.authorized_accounts
+    assert api.wallet_sessions.get(body["session_token"], stored_wallet.address) is not None
+
+def test_signin_with_wrong_password_is_refused(api, client, stored_wallet):
+    response = client.post("/api/auth/signin", json={"username": USERNAME, "password": "wrong"})
+    assert response.status_code == 401
+    assert stored_wallet.address not in api.task_storage.authorized_accounts
+    assert len(api.wallet_sessions) == 0
+
+def test_clear_state_keeps_the_account_signed_in(api, client, stored_wallet):
+    token = client.post("/api/auth/signin", json={"username": USERNAME, "password": PASSWORD}).json()["session_token"]
+    assert client.post(f"/api/tasks/clear-state/{stored_wallet.address}").status_code == 200
+    assert stored_wallet.address in api.task_storage.authorized_accounts
+    assert api.wallet_sessions.get(token, stored_wallet.address) is not None
+
+def test_signout_revokes_authorization_and_sessions(api, client, stored_wallet):
+    token = client.post("/api/auth/signin", json={"username": USERNAME, "password": PASSWORD}).json()["session_token"]
+    assert client.post(f"/api/auth/signout/{stored_wallet.address}").status_code == 200
+    assert stored_wallet.address not in api.task_storage.authorized_accounts
+    assert api.wallet_sessions.get(token, stored_wallet.address) is None
+
+def test_signed_out_stored_wallet_stays_blocked(api, client, stored_wallet):
+    client.post("/api/auth/signin", json={"username": USERNAME, "password": PASSWORD})
+    client.post(f"/api/auth/signout/{stored_wallet.address}")
+    with pytest.raises(PermissionError):
+        api.task_storage.require_authorized(stored_wallet.address)
+    assert stored_wallet.address not in storage.load_signed_in_accounts()
+
+def test_session_backed_requests_check_the_password(api, client, stored_wallet):
+    from fastapi import HTTPException
+
+    token = client.post("/api/auth/signin", json={"username": USERNAME, "password": PASSWORD}).json()["session_token"]
+    assert api.unlock_wallet(stored_wallet.address, PASSWORD, token).address == stored_wallet.address
+    with pytest.raises(HTTPException) as excinfo:
+        api.unlock_wallet(stored_wallet.address, "wrong", token)
+    assert excinfo.value.status_code == 401
+
+def test_odv_messages_refuse_unauthorized_accounts(api, client, data_files):
+    address = Wallet.create().address
+    assert client.get(f"/api/odv/messages/{address}").status_code == 403
+    assert client.get(f"/api/odv/messages/{address}/stream").status_code == 403
@@ -0,0 +1,40 @@
+import gzip
+import os
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+from postfiat_wallet.server.static import PrecompressedStaticFiles
+from postfiat_wallet.utils.precompress import remove_variants
+
+SCRIPT = b"console.log('postfiat');\n" * 100
+
+def write_asset(directory, name, data, mtime_ns):
+    path = directory / name
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+def get(static_files, path):
+    app = Starlette(routes=[Mount("/", app=static_files)])
+    return TestClient(app).get(path, headers={"accept-encoding": "gzip"})
+
+def test_fresh_variant_is_served(tmp_path):
+    write_asset(tmp_path, "app.js", SCRIPT, 1_000_000_000)
+    write_asset(tmp_path, "app.js.gz", gzip.compress(SCRIPT), 2_000_000_000)
+    response = get(PrecompressedStaticFiles(directory=tmp_path), "/app.js")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == SCRIPT
+
+def test_variant_older_than_its_file_is_not_served(tmp_path):
+    write_asset(tmp_path, "app.js.gz", gzip.compress(b"console.log('old');\n"), 1_000_000_000)
+    write_asset(tmp_path, "app.js", SCRIPT, 2_000_000_000)
+    response = get(PrecompressedStaticFiles(directory=tmp_path), "/app.js")
+    assert "content-encoding" not in response.headers
+    assert response.content == SCRIPT
+
+def test_remove_variants(tmp_path):
+    path = write_asset(tmp_path, "app.js", SCRIPT, 1_000_000_000)
+    write_asset(tmp_path, "app.js.gz", gzip.compress(SCRIPT), 1_000_000_000)
+    write_asset(tmp_path, "app.js.br", b"br", 1_000_000_000)
+    remove_variants(path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app.js"]
@@ -0,0 +1,86 @@
+import asyncio
+import gc
+import pytest
+
+pytest.importorskip("postfiat")
+
+from postfiat_wallet.services.blockchain import BlockchainService
+
+ACCOUNT = "rAccount"
+
+def raw_tx(i):
+    return {
+        "tx_json": {"TransactionType": "Payment", "hash": f"H{i}", "Fee": "10", "Account": ACCOUNT, "Amount": "1000000"},
+        "meta": {"TransactionResult": "tesSUCCESS"},
+    }
+
+class Pages:
+    """Fake account_tx pages of page_size transactions, chained by marker"""
+
+    def __init__(self, total, fail_after=None):
+        self.total = total
+        self.fail_after = fail_after
+        self.requests = []
+
+    async def __call__(self, account, page_size, ledger_index_min, ledger_index_max, forward, marker):
+        start = marker or 0
+        self.requests.append(start)
+        if self.fail_after is not None and start >= self.fail_after:
+            raise ConnectionError("rpc down")
+        end = min(start + page_size, self.total)
+        return {
+            "transactions": [raw_tx(i) for i in range(start, end)],
+            "marker": end if end < self.total else None,
+        }
+
+@pytest.fixture
+def service():
+    return BlockchainService("http://localhost:5005")
+
+async def test_pages_follow_the_marker(service):
+    service._fetch_transaction_page = pages = Pages(5)
+    markers = []
+    async for page in service.iter_transaction_pages(ACCOUNT, page_size=2):
+        markers.append(page["marker"])
+    assert markers == [2, 4, None]
+    assert pages.requests == [0, 2, 4]
+
+async def test_history_stops_at_the_limit(service):
+    service._fetch_transaction_page = pages = Pages(10)
+    transactions = await service.get_transaction_history(ACCOUNT, limit=3)
+    assert [tx["hash"] for tx in transactions] == ["H0", "H1", "H2"]
+    assert pages.requests == [0]
+
+async def test_zero_limit_fetches_nothing(service):
+    service._fetch_transaction_page = pages = Pages(10)
+    assert await service.get_transaction_history(ACCOUNT, limit=0) == []
+    assert pages.requests == []
+
+async def test_no_prefetch_past_the_limit(service):
+    service._fetch_transaction_page = pages = Pages(10)
+    async for _ in service.iter_transaction_pages(ACCOUNT, page_size=2, limit=4):
+        pass
+    assert pages.requests == [0, 2]
+
+async def test_closing_cancels_the_prefetch(service):
+    service._fetch_transaction_page = pages = Pages(10)
+    iterator = service.iter_transaction_pages(ACCOUNT, page_size=2)
+    await iterator.__anext__()
+    await iterator.aclose()
+    await asyncio.sleep(0)
+    assert pages.requests == [0]
+
+async def test_failed_prefetch_is_not_left_unretrieved(service):
+    service._fetch_transaction_page = Pages(10, fail_after=2)
+    errors = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+
+    iterator = service.iter_transaction_pages(ACCOUNT, page_size=2)
+    await iterator.__anext__()
+    # Let the prefetch of the next page fail before the caller closes
+    await asyncio.sleep(0)
+    await iterator.aclose()
+    await asyncio.sleep(0)
+    gc.collect()
+    assert errors == []
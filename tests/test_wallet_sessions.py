@@ -0,0 +1,73 @@
+import pytest
+from xrpl.wallet import Wallet
+from postfiat_wallet.services import wallet_sessions as wallet_sessions_module
+from postfiat_wallet.services.wallet_sessions import WalletSessionManager
+
+ACCOUNT = "rAccount"
+PASSWORD = "correct horse"
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(wallet_sessions_module.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def wallet():
+    return Wallet.create()
+
+def test_session_returns_the_unlocked_wallet(clock, wallet):
+    sessions = WalletSessionManager(idle_timeout=60)
+    token = sessions.create(ACCOUNT, wallet, PASSWORD)
+    assert sessions.get(token, ACCOUNT).wallet is wallet
+
+def test_session_expires_after_idle_timeout(clock, wallet):
+    sessions = WalletSessionManager(idle_timeout=60)
+    token = sessions.create(ACCOUNT, wallet, PASSWORD)
+    clock.now += 61
+    assert sessions.get(token, ACCOUNT) is None
+    assert len(sessions) == 0
+
+def test_use_refreshes_the_idle_timer(clock, wallet):
+    sessions = WalletSessionManager(idle_timeout=60)
+    token = sessions.create(ACCOUNT, wallet, PASSWORD)
+    for _ in range(3):
+        clock.now += 50
+        assert sessions.get(token, ACCOUNT) is not None
+
+def test_token_only_unlocks_its_own_account(clock, wallet):
+    sessions = WalletSessionManager(idle_timeout=60)
+    token = sessions.create(ACCOUNT, wallet, PASSWORD)
+    assert sessions.get(token, "rSomeoneElse") is None
+    assert sessions.get(None, ACCOUNT) is None
+    assert sessions.get("unknown", ACCOUNT) is None
+
+def test_creating_a_session_purges_expired_ones(clock, wallet):
+    sessions = WalletSessionManager(idle_timeout=60)
+    sessions.create(ACCOUNT, wallet, PASSWORD)
+    clock.now += 61
+    sessions.create("rOther", wallet, PASSWORD)
+    assert len(sessions) == 1
+
+def test_revoke_account_drops_only_that_account(clock, wallet):
+    sessions = WalletSessionManager(idle_timeout=60)
+    first = sessions.create(ACCOUNT, wallet, PASSWORD)
+    second = sessions.create(ACCOUNT, wallet, PASSWORD)
+    other = sessions.create("rOther", wallet, PASSWORD)
+    sessions.revoke_account(ACCOUNT)
+    assert sessions.get(first, ACCOUNT) is None
+    assert sessions.get(second, ACCOUNT) is None
+    assert sessions.get(other, "rOther") is not None
+
+def test_session_checks_the_password(clock, wallet):
+    sessions = WalletSessionManager(idle_timeout=60)
+    session = sessions.get(sessions.create(ACCOUNT, wallet, PASSWORD), ACCOUNT)
+    assert session.check_password(PASSWORD)
+    assert not session.check_password("wrong")